@@ -8,16 +8,49 @@ import os
 import json
 from flask import Flask, request, jsonify, render_template
 import anthropic
+from api_auth import authenticated_user
+from ai_cost_ledger import FEATURE_AI_RECOMMENDATIONS, FEATURE_CONTENT_GENERATION, FEATURE_SUPPORT_TICKETS, metered_call
+from quota_limiter import GPUQuotaLimiter
+from reporting import reports_api, configure_reports
+from ticket_api import tickets_api
 
 app = Flask(__name__)
+app.register_blueprint(tickets_api)
+app.register_blueprint(reports_api)
 
 # Initialize Anthropic client
 try:
-    client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+    # ANTHROPIC_BASE_URL lets load tests point at mock_model_server.py
+    client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'),
+                                 base_url=os.getenv('ANTHROPIC_BASE_URL') or None)
 except Exception as e:
     print(f"Failed to initialize Anthropic client: {e}")
     client = None
 
+# Enforce the per-plan AI limits before any model call; plans are mirrored in
+# memory and lapsed subscriptions are expired in the background
+quota_limiter = GPUQuotaLimiter()
+quota_limiter.start_plan_sync()
+quota_limiter.engine.start_expiry_scheduler()
+configure_reports(quota_limiter.engine)
+
+def check_ai_quota(feature_name):
+    """Return a 429 response if the caller has used up their plan quota, otherwise None."""
+    # Only a verified API key names a plan's bucket; emails in the body or headers
+    # are client-chosen, so everyone else shares a per-address free bucket
+    quota_key = authenticated_user() or f"anonymous:{request.remote_addr}"
+    
+    allowed, retry_after = quota_limiter.consume(quota_key, feature_name)
+    if allowed:
+        return None
+    
+    response = jsonify({
+        'success': False,
+        'error': "You've reached your plan's limit for this AI feature. Upgrade your plan or try again later."
+    })
+    response.headers['Retry-After'] = str(int(retry_after) + 1)
+    return response, 429
+
 @app.route('/')
 def index():
     """Serve the AI dashboard."""
@@ -46,6 +79,10 @@ def analyze_gpu():
                 'error': 'AI analysis service is currently unavailable. Please try again later or contact support if the issue persists.'
             }), 503
         
+        quota_response = check_ai_quota(FEATURE_AI_RECOMMENDATIONS)
+        if quota_response:
+            return quota_response
+        
         # Create analysis prompt
         prompt = f"""You are a GPU performance analyst with expertise in hardware diagnostics, thermal management, and performance optimization. You analyze real-time GPU telemetry data to provide actionable insights.
 
@@ -79,7 +116,7 @@ def analyze_gpu():
 - Keep response between 120-200 words
 - Use technical precision but remain accessible"""
         
-        response = client.messages.create(
+        response = metered_call("analyze_gpu", FEATURE_AI_RECOMMENDATIONS, client.messages.create,
             model="claude-3-haiku-20240307",
             max_tokens=300,
             messages=[{"role": "user", "content": prompt}]
@@ -116,6 +153,10 @@ def recommend_upgrade():
                 'error': 'AI recommendation service is currently unavailable. Please try again later or contact support if the issue persists.'
             }), 503
         
+        quota_response = check_ai_quota(FEATURE_AI_RECOMMENDATIONS)
+        if quota_response:
+            return quota_response
+        
         prompt = f"""You are an expert GPU hardware consultant with deep knowledge of graphics cards, performance characteristics, and real-world usage patterns.
 
 **Task:** Provide intelligent GPU advice based on the following inputs:
@@ -147,7 +188,7 @@ def recommend_upgrade():
 - Keep response between 150-250 words
 - Use technical accuracy but avoid jargon overload"""
         
-        response = client.messages.create(
+        response = metered_call("recommend_upgrade", FEATURE_AI_RECOMMENDATIONS, client.messages.create,
             model="claude-3-haiku-20240307",
             max_tokens=400,
             messages=[{"role": "user", "content": prompt}]
@@ -177,6 +218,10 @@ def ai_support():
         subject = data.get('subject', '')
         message = data.get('message', '')
         
+        quota_response = check_ai_quota(FEATURE_SUPPORT_TICKETS)
+        if quota_response:
+            return quota_response
+        
         prompt = f"""
         You are a GPU expert support agent. Respond to this support ticket:
         
@@ -191,7 +236,7 @@ def ai_support():
         Keep it professional and actionable.
         """
         
-        response = client.chat.completions.create(
+        response = metered_call("ai_support", FEATURE_SUPPORT_TICKETS, client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=300
@@ -220,6 +265,10 @@ def generate_content():
         content_type = data.get('content_type', 'blog_post')
         audience = data.get('target_audience', 'gaming enthusiasts')
         
+        quota_response = check_ai_quota(FEATURE_CONTENT_GENERATION)
+        if quota_response:
+            return quota_response
+        
         prompt = f"""
         Create {content_type} content about: {topic}
         Target audience: {audience}
@@ -232,7 +281,7 @@ def generate_content():
         Keep it structured and engaging.
         """
         
-        response = client.chat.completions.create(
+        response = metered_call("generate_content", FEATURE_CONTENT_GENERATION, client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=400
@@ -8,8 +8,15 @@ import os
 import json
 from flask import Flask, request, jsonify, render_template_string
 import anthropic
+from api_auth import authenticated_user
+from ai_cost_ledger import FEATURE_AI_RECOMMENDATIONS, metered_call
+from quota_limiter import GPUQuotaLimiter
+from reporting import reports_api, configure_reports
+from ticket_api import tickets_api
 
 app = Flask(__name__)
+app.register_blueprint(tickets_api)
+app.register_blueprint(reports_api)
 
 # Initialize Anthropic client
 try:
@@ -17,7 +24,8 @@ try:
     print(f"API Key found: {api_key[:10] if api_key else 'None'}...")
     if api_key and api_key != "your-api-key-here":
         print("Initializing Anthropic client...")
-        client = anthropic.Anthropic(api_key=api_key)
+        # ANTHROPIC_BASE_URL lets load tests point at mock_model_server.py
+        client = anthropic.Anthropic(api_key=api_key, base_url=os.getenv('ANTHROPIC_BASE_URL') or None)
         print("✅ Anthropic client initialized successfully")
     else:
         print("❌ No valid API key found")
@@ -384,6 +392,30 @@ AI_DASHBOARD_HTML = """
 </html>
 """
 
+# Enforce the per-plan AI limits before any model call; plans are mirrored in
+# memory and lapsed subscriptions are expired in the background
+quota_limiter = GPUQuotaLimiter()
+quota_limiter.start_plan_sync()
+quota_limiter.engine.start_expiry_scheduler()
+configure_reports(quota_limiter.engine)
+
+def check_ai_quota(feature_name):
+    """Return a 429 response if the caller has used up their plan quota, otherwise None."""
+    # Only a verified API key names a plan's bucket; emails in the body or headers
+    # are client-chosen, so everyone else shares a per-address free bucket
+    quota_key = authenticated_user() or f"anonymous:{request.remote_addr}"
+    
+    allowed, retry_after = quota_limiter.consume(quota_key, feature_name)
+    if allowed:
+        return None
+    
+    response = jsonify({
+        'success': False,
+        'error': "You've reached your plan's limit for this AI feature. Upgrade your plan or try again later."
+    })
+    response.headers['Retry-After'] = str(int(retry_after) + 1)
+    return response, 429
+
 @app.route('/')
 def index():
     """Serve the AI dashboard."""
@@ -407,6 +439,10 @@ def analyze_gpu():
                 'error': 'AI analysis service is currently unavailable. Please try again later or contact support if the issue persists.'
             }), 503
         
+        quota_response = check_ai_quota(FEATURE_AI_RECOMMENDATIONS)
+        if quota_response:
+            return quota_response
+        
         # Create analysis prompt
         prompt = f"""You are a GPU performance analyst with expertise in hardware diagnostics, thermal management, and performance optimization. You analyze real-time GPU telemetry data to provide actionable insights.
 
@@ -440,7 +476,7 @@ def analyze_gpu():
 - Keep response between 120-200 words
 - Use technical precision but remain accessible"""
         
-        response = client.completions.create(
+        response = metered_call("analyze_gpu", FEATURE_AI_RECOMMENDATIONS, client.completions.create,
             model="claude-3-haiku-20240307",
             max_tokens_to_sample=300,
             prompt=f"\n\nHuman: {prompt}\n\nAssistant:"
@@ -477,6 +513,10 @@ def recommend_upgrade():
                 'error': 'AI recommendation service is currently unavailable. Please try again later or contact support if the issue persists.'
             }), 503
         
+        quota_response = check_ai_quota(FEATURE_AI_RECOMMENDATIONS)
+        if quota_response:
+            return quota_response
+        
         # Create recommendation prompt
         prompt = f"""You are an expert GPU hardware consultant with deep knowledge of graphics cards, performance characteristics, and real-world usage patterns.
 
@@ -509,7 +549,7 @@ def recommend_upgrade():
 - Keep response between 150-250 words
 - Use technical accuracy but avoid jargon overload"""
         
-        response = client.completions.create(
+        response = metered_call("recommend_upgrade", FEATURE_AI_RECOMMENDATIONS, client.completions.create,
             model="claude-3-haiku-20240307",
             max_tokens_to_sample=400,
             prompt=f"\n\nHuman: {prompt}\n\nAssistant:"
@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import List, Dict
 import logging
 
+from ai_cost_ledger import FEATURE_CONTENT_GENERATION, metered_call
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -49,7 +51,7 @@ class GPUContentGenerator:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("content.generate_blog_post", FEATURE_CONTENT_GENERATION, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7
@@ -89,7 +91,7 @@ class GPUContentGenerator:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("content.generate_gpu_comparison", FEATURE_CONTENT_GENERATION, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5
@@ -118,7 +120,7 @@ class GPUContentGenerator:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("content.generate_troubleshooting_guide", FEATURE_CONTENT_GENERATION, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.6
@@ -147,7 +149,7 @@ class GPUContentGenerator:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("content.generate_seo_content_plan", FEATURE_CONTENT_GENERATION, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8
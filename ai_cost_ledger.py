@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+AI Cost Ledger
+Records token usage, latency and cost of every model call into hourly per-endpoint rollups.
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from storage import get_storage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (input, output). Models are matched by longest prefix.
+MODEL_PRICES = {
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (5.00, 15.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-instant-1": (0.80, 2.40),
+    "claude-2": (8.00, 24.00),
+}
+# Unknown models are priced like the most expensive common one rather than as free
+DEFAULT_PRICE = (30.00, 60.00)
+
+# Metered AI features. Plan ai_limits, quota buckets, usage tracking and ledger rows
+# all key on these names, so ROI can join usage revenue with model spend.
+FEATURE_AI_RECOMMENDATIONS = "ai_recommendations"
+FEATURE_SUPPORT_TICKETS = "support_tickets"
+FEATURE_CONTENT_GENERATION = "content_generation"
+FEATURE_ADVANCED_ANALYSIS = "advanced_analysis"
+FEATURES = (FEATURE_AI_RECOMMENDATIONS, FEATURE_SUPPORT_TICKETS, FEATURE_CONTENT_GENERATION,
+            FEATURE_ADVANCED_ANALYSIS)
+
+# Rough size of a token in English text, for responses that carry no usage data
+CHARS_PER_TOKEN = 4
+
+SCHEMA_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS ai_cost_hourly (
+           hour TEXT NOT NULL,
+           endpoint TEXT NOT NULL,
+           model TEXT NOT NULL,
+           feature TEXT NOT NULL,
+           calls INTEGER NOT NULL,
+           errors INTEGER NOT NULL,
+           estimated_calls INTEGER NOT NULL,
+           input_tokens INTEGER NOT NULL,
+           output_tokens INTEGER NOT NULL,
+           cost REAL NOT NULL,
+           latency_ms REAL NOT NULL,
+           PRIMARY KEY (hour, endpoint, model, feature)
+       ) WITHOUT ROWID''',
+]
+
+def model_price(model: str) -> Tuple[float, float]:
+    """(input, output) USD per million tokens for a model name."""
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return DEFAULT_PRICE
+    return MODEL_PRICES[max(matches, key=len)]
+
+def _field(obj, *names):
+    """First present attribute or key among names (SDK objects and plain dicts alike)."""
+    for name in names:
+        value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+        if value is not None:
+            return value
+    return None
+
+def _prompt_text(kwargs: Dict) -> str:
+    if "prompt" in kwargs:
+        return str(kwargs["prompt"])
+    return " ".join(str(message.get("content", "")) for message in kwargs.get("messages", []))
+
+def _response_text(response) -> str:
+    """Generated text from an OpenAI chat, Anthropic messages or legacy completions response."""
+    completion = _field(response, "completion")
+    if completion is not None:
+        return completion
+    content = _field(response, "content")
+    if content:
+        return " ".join(str(_field(block, "text") or "") for block in content)
+    choices = _field(response, "choices")
+    if choices:
+        message = _field(choices[0], "message")
+        return str((_field(message, "content") if message is not None else _field(choices[0], "text")) or "")
+    return ""
+
+def extract_usage(response, kwargs: Dict) -> Tuple[int, int, bool]:
+    """(input_tokens, output_tokens, estimated) for a model response.
+
+    Falls back to a character-based estimate when the response carries no usage
+    block, as with the legacy Anthropic completions API.
+    """
+    usage = _field(response, "usage")
+    if usage is not None:
+        input_tokens = _field(usage, "input_tokens", "prompt_tokens")
+        output_tokens = _field(usage, "output_tokens", "completion_tokens")
+        if input_tokens is not None and output_tokens is not None:
+            return int(input_tokens), int(output_tokens), False
+
+    return (len(_prompt_text(kwargs)) // CHARS_PER_TOKEN,
+            len(_response_text(response)) // CHARS_PER_TOKEN, True)
+
+class AICostLedger:
+    def __init__(self, db_path: str = "gpu_monetization.db", flush_interval: float = 2.0):
+        """Aggregate model calls in memory per (hour, endpoint, model, feature) and flush periodically."""
+        self.storage = get_storage(db_path)
+        self.storage.migrate("ai_cost_ledger", SCHEMA_MIGRATIONS)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # key -> [calls, errors, estimated_calls, input_tokens, output_tokens, cost, latency_ms]
+        self._pending: Dict[Tuple[str, str, str, str], List[float]] = {}
+        self._hour_index = None
+        self._hour = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="ai-cost-ledger-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, endpoint: str, feature: str, model: str, input_tokens: int, output_tokens: int,
+               latency_s: float, error: bool = False, estimated: bool = False) -> float:
+        """Record one model call and return its cost in USD."""
+        input_price, output_price = model_price(model)
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+        key = (self._current_hour(), endpoint, model, feature or "")
+
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = [0, 0, 0, 0, 0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += error
+            entry[2] += estimated
+            entry[3] += input_tokens
+            entry[4] += output_tokens
+            entry[5] += cost
+            entry[6] += latency_s * 1000
+        return cost
+
+    def _current_hour(self) -> str:
+        hour_index = int(time.time() // 3600)
+        if hour_index != self._hour_index:
+            self._hour = datetime.fromtimestamp(hour_index * 3600, timezone.utc).strftime('%Y-%m-%d %H:00')
+            self._hour_index = hour_index
+        return self._hour
+
+    def call(self, endpoint: str, feature: str, create: Callable, **kwargs):
+        """Invoke an SDK create() method and record its usage, latency and cost.
+
+        Failed calls are recorded as errors with the estimated prompt size and
+        the exception is re-raised unchanged.
+        """
+        model = kwargs.get("model", "unknown")
+        started = time.perf_counter()
+        try:
+            response = create(**kwargs)
+        except Exception:
+            self.record(endpoint, feature, model, len(_prompt_text(kwargs)) // CHARS_PER_TOKEN, 0,
+                        time.perf_counter() - started, error=True, estimated=True)
+            raise
+
+        latency = time.perf_counter() - started
+        try:
+            input_tokens, output_tokens, estimated = extract_usage(response, kwargs)
+            self.record(endpoint, feature, model, input_tokens, output_tokens, latency, estimated=estimated)
+        except Exception as e:
+            # Accounting must never break the request it is measuring
+            logger.error(f"Error recording AI cost for {endpoint}: {e}")
+        return response
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing AI cost ledger: {e}")
+
+    def flush(self) -> int:
+        """Write pending aggregates in one transaction. Returns the number of rows upserted."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                self.storage.executemany('''
+                    INSERT INTO ai_cost_hourly
+                    (hour, endpoint, model, feature, calls, errors, estimated_calls,
+                     input_tokens, output_tokens, cost, latency_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(hour, endpoint, model, feature) DO UPDATE SET
+                        calls = calls + excluded.calls,
+                        errors = errors + excluded.errors,
+                        estimated_calls = estimated_calls + excluded.estimated_calls,
+                        input_tokens = input_tokens + excluded.input_tokens,
+                        output_tokens = output_tokens + excluded.output_tokens,
+                        cost = cost + excluded.cost,
+                        latency_ms = latency_ms + excluded.latency_ms
+                ''', [key + tuple(values) for key, values in pending.items()])
+            except Exception:
+                with self._lock:
+                    for key, values in pending.items():
+                        entry = self._pending.setdefault(key, [0, 0, 0, 0, 0, 0.0, 0.0])
+                        for index, value in enumerate(values):
+                            entry[index] += value
+                raise
+            return len(pending)
+
+    def cost_by_endpoint(self, hours: int = 24) -> List[Dict]:
+        """Per hour, endpoint and model: calls, tokens, cost and average latency."""
+        self.flush()
+        rows = self.storage.fetchall('''
+            SELECT hour, endpoint, model, SUM(calls), SUM(errors), SUM(input_tokens), SUM(output_tokens),
+                   SUM(cost), SUM(latency_ms) / SUM(calls)
+            FROM ai_cost_hourly
+            WHERE hour >= strftime('%Y-%m-%d %H:00', 'now', ?)
+            GROUP BY hour, endpoint, model
+            ORDER BY hour, endpoint, model
+        ''', (f'-{int(hours)} hours',))
+        return [
+            {
+                "hour": row[0], "endpoint": row[1], "model": row[2], "calls": row[3], "errors": row[4],
+                "input_tokens": row[5], "output_tokens": row[6], "cost": round(row[7], 6),
+                "avg_latency_ms": round(row[8], 1)
+            }
+            for row in rows
+        ]
+
+    def feature_cost(self, feature: str, days: int = 30) -> Tuple[int, float]:
+        """(calls, cost in USD) attributed to a feature over the last N days."""
+        self.flush()
+        row = self.storage.fetchone('''
+            SELECT IFNULL(SUM(calls), 0), IFNULL(SUM(cost), 0)
+            FROM ai_cost_hourly
+            WHERE hour >= strftime('%Y-%m-%d %H:00', 'now', ?) AND feature = ?
+        ''', (f'-{int(days)} days', feature))
+        return row[0], row[1]
+
+    def close(self):
+        """Stop the flusher and write whatever is still pending (runs at interpreter exit)."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing AI cost ledger at shutdown: {e}")
+
+_ledger: Optional[AICostLedger] = None
+_ledger_lock = threading.Lock()
+
+def get_ledger() -> AICostLedger:
+    """Process-wide ledger shared by every model client."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = AICostLedger()
+        return _ledger
+
+def metered_call(endpoint: str, feature: str, create: Callable, **kwargs):
+    """Shorthand for get_ledger().call(...)."""
+    return get_ledger().call(endpoint, feature, create, **kwargs)
+
+# Example usage
+if __name__ == "__main__":
+    ledger = get_ledger()
+    ledger.record("analyze_gpu", FEATURE_AI_RECOMMENDATIONS, "claude-3-haiku-20240307", 850, 240, 1.2)
+    ledger.record("analyzer.analyze_gpu_performance", FEATURE_ADVANCED_ANALYSIS, "gpt-4", 1200, 600, 6.5)
+
+    for row in ledger.cost_by_endpoint(hours=1):
+        print(f"{row['hour']} {row['endpoint']:<36} {row['model']:<26} "
+              f"calls={row['calls']} cost=${row['cost']:.4f} avg={row['avg_latency_ms']}ms")
@@ -9,6 +9,8 @@ import json
 from typing import Dict, List, Tuple
 import logging
 
+from ai_cost_ledger import FEATURE_ADVANCED_ANALYSIS, metered_call
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,7 +40,7 @@ class GPUAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("analyzer.analyze_performance_data", FEATURE_ADVANCED_ANALYSIS, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3
@@ -71,7 +73,7 @@ class GPUAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("analyzer.recommend_gpu_upgrade", FEATURE_ADVANCED_ANALYSIS, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5
@@ -103,7 +105,7 @@ class GPUAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("analyzer.diagnose_performance_issues", FEATURE_ADVANCED_ANALYSIS, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.4
@@ -135,7 +137,7 @@ class GPUAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("analyzer.generate_optimization_plan", FEATURE_ADVANCED_ANALYSIS, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.6
@@ -168,7 +170,7 @@ class GPUAnalyzer:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("analyzer.predict_gpu_lifespan", FEATURE_ADVANCED_ANALYSIS, self.client.chat.completions.create,
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3
@@ -6,48 +6,173 @@ Automates customer support using AI to categorize, prioritize, and respond to GP
 
 import openai
 import json
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from ai_cost_ledger import FEATURE_SUPPORT_TICKETS, metered_call
+from storage import get_storage
+from ticket_cache import TicketResponseCache
+from ticket_classifier import TicketClassifier, CATEGORIES, PRIORITIES
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _ticket_stats_delta(row: str, sign: str) -> str:
+    """Trigger body statements adding (+) or removing (-) one ticket row (NEW/OLD) from ticket_stats."""
+    hours = f"(julianday({row}.resolved_at) - julianday({row}.created_at)) * 24"
+    return f"""
+        INSERT INTO ticket_stats (dimension, value, ticket_count, total_hours)
+        VALUES ('category', IFNULL({row}.category, ''), {sign}1, 0),
+               ('priority', IFNULL({row}.priority, ''), {sign}1, 0)
+        ON CONFLICT(dimension, value) DO UPDATE SET ticket_count = ticket_count + excluded.ticket_count;
+        INSERT INTO ticket_stats (dimension, value, ticket_count, total_hours)
+        SELECT 'resolution', '', {sign}1, {sign}{hours} WHERE {hours} IS NOT NULL
+        ON CONFLICT(dimension, value) DO UPDATE SET ticket_count = ticket_count + excluded.ticket_count,
+                                                    total_hours = total_hours + excluded.total_hours;
+    """
+
+def _create_ticket_stats(cursor):
+    """Materialize get_ticket_stats into a few rows kept current by triggers."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ticket_stats (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            ticket_count INTEGER NOT NULL,
+            total_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_stats_insert AFTER INSERT ON support_tickets
+        BEGIN {_ticket_stats_delta("NEW", "+")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_stats_delete AFTER DELETE ON support_tickets
+        BEGIN {_ticket_stats_delta("OLD", "-")} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_ticket_stats_update
+        AFTER UPDATE OF category, priority, created_at, resolved_at ON support_tickets
+        BEGIN {_ticket_stats_delta("OLD", "-")} {_ticket_stats_delta("NEW", "+")} END
+    ''')
+    
+    # Seed from existing tickets; the migration's write lock keeps inserts out until the triggers exist
+    cursor.execute('DELETE FROM ticket_stats')
+    cursor.execute('''
+        INSERT INTO ticket_stats (dimension, value, ticket_count, total_hours)
+        SELECT 'category', IFNULL(category, ''), COUNT(*), 0 FROM support_tickets GROUP BY 2
+        UNION ALL
+        SELECT 'priority', IFNULL(priority, ''), COUNT(*), 0 FROM support_tickets GROUP BY 2
+        UNION ALL
+        SELECT 'resolution', '', COUNT(hours), IFNULL(SUM(hours), 0)
+        FROM (SELECT (julianday(resolved_at) - julianday(created_at)) * 24 AS hours
+              FROM support_tickets WHERE resolved_at IS NOT NULL)
+    ''')
+
+# Append-only; see SQLiteStorage.migrate
+SCHEMA_MIGRATIONS = [
+    # get_ticket_stats: category / priority distributions answered from the index alone
+    'CREATE INDEX IF NOT EXISTS idx_support_tickets_category ON support_tickets (category)',
+    'CREATE INDEX IF NOT EXISTS idx_support_tickets_priority ON support_tickets (priority)',
+    # get_ticket_stats: resolution time reads only resolved tickets
+    'CREATE INDEX IF NOT EXISTS idx_support_tickets_resolved ON support_tickets (resolved_at, created_at)',
+    # get_ticket_stats: read a handful of pre-aggregated rows instead of scanning tickets
+    _create_ticket_stats,
+    # Ticket lifecycle: who is working on a ticket
+    'ALTER TABLE support_tickets ADD COLUMN assignee TEXT',
+    # list_tickets: newest first by id within each filter (secondary indexes end in the rowid)
+    'CREATE INDEX IF NOT EXISTS idx_support_tickets_status ON support_tickets (status)',
+    'CREATE INDEX IF NOT EXISTS idx_support_tickets_status_priority ON support_tickets (status, priority)',
+    # Who assigned each label, so the local classifier only learns from real labels
+    'ALTER TABLE support_tickets ADD COLUMN label_source TEXT',
+]
+
+TICKET_STATUSES = ["open", "resolved", "closed"]
+MAX_PAGE_SIZE = 200
+
+TICKET_COLUMNS = "id, user_email, subject, category, priority, status, assignee, created_at, resolved_at"
+
+# Queries on the request path; check_query_plans.py asserts none of them scans a table
+HOT_QUERIES = {
+    "ticket_stats": ('''
+        SELECT dimension, value, ticket_count, total_hours FROM ticket_stats
+        WHERE dimension IN ('category', 'priority', 'resolution')
+    ''', ()),
+    "ticket_cache_hit": ('UPDATE ticket_response_cache SET hits = hits + 1 WHERE id = ?', (1,)),
+    "list_tickets": (f'''
+        SELECT {TICKET_COLUMNS} FROM support_tickets
+        WHERE id < ? ORDER BY id DESC LIMIT ?
+    ''', (1 << 62, 50)),
+    "list_tickets_status": (f'''
+        SELECT {TICKET_COLUMNS} FROM support_tickets
+        WHERE status = ? AND id < ? ORDER BY id DESC LIMIT ?
+    ''', ("open", 1 << 62, 50)),
+    "list_tickets_priority": (f'''
+        SELECT {TICKET_COLUMNS} FROM support_tickets
+        WHERE priority = ? AND id < ? ORDER BY id DESC LIMIT ?
+    ''', ("High", 1 << 62, 50)),
+    "list_tickets_status_priority": (f'''
+        SELECT {TICKET_COLUMNS} FROM support_tickets
+        WHERE status = ? AND priority = ? AND id < ? ORDER BY id DESC LIMIT ?
+    ''', ("open", "High", 1 << 62, 50)),
+}
+
+FALLBACK_RESPONSE = "Thank you for contacting GPU Benchmark Tool support. We're experiencing technical difficulties. Please try again later or contact us directly."
+
 class GPUSupportAI:
-    def __init__(self, openai_api_key: str):
+    def __init__(self, openai_api_key: str, speculation_workers: int = 16):
         """Initialize the AI support system."""
         self.client = openai.OpenAI(api_key=openai_api_key)
         self.db_path = "gpu_support.db"
+        self.storage = get_storage(self.db_path)
+        # Response drafts started before categorization finishes run here
+        self._speculation_pool = ThreadPoolExecutor(max_workers=speculation_workers,
+                                                    thread_name_prefix="ticket-draft")
         self.init_database()
+        self.response_cache = TicketResponseCache(self.db_path)
+        self.classifier = TicketClassifier(self.db_path)
+        self.classifier.start_background_retraining()
         
     def init_database(self):
         """Initialize SQLite database for support tickets."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS support_tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_email TEXT,
-                subject TEXT,
-                message TEXT,
-                category TEXT,
-                priority TEXT,
-                ai_response TEXT,
-                status TEXT DEFAULT 'open',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                resolved_at TIMESTAMP
-            )
-        ''')
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS support_tickets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_email TEXT,
+                    subject TEXT,
+                    message TEXT,
+                    category TEXT,
+                    priority TEXT,
+                    ai_response TEXT,
+                    status TEXT DEFAULT 'open',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    resolved_at TIMESTAMP
+                )
+            ''')
+        
+        self.storage.migrate("support_tickets", SCHEMA_MIGRATIONS)
         
-        conn.commit()
-        conn.close()
         logger.info("Database initialized successfully")
     
     def categorize_ticket(self, subject: str, message: str) -> Tuple[str, str]:
-        """Use AI to categorize and prioritize support tickets."""
+        """Categorize and prioritize a support ticket."""
+        category, priority, _ = self._categorize(subject, message)
+        return category, priority
+    
+    def _categorize(self, subject: str, message: str, prediction: Dict = None) -> Tuple[str, str, str]:
+        """Classify locally, falling back to the model only when confidence is low.
+        
+        Returns (category, priority, label_source).
+        """
+        prediction = prediction or self.classifier.predict(subject, message)
+        if self.classifier.is_confident(prediction):
+            return prediction["category"], prediction["priority"], "classifier"
         
         prompt = f"""
         Analyze this GPU support ticket and categorize it:
@@ -67,18 +192,22 @@ class GPUSupportAI:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("support.categorize", FEATURE_SUPPORT_TICKETS, self.client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3
             )
             
             result = json.loads(response.choices[0].message.content)
-            return result["category"], result["priority"]
+            if result["category"] in CATEGORIES and result["priority"] in PRIORITIES:
+                return result["category"], result["priority"], "model"
+            logger.warning(f"Model returned unknown labels: {result}")
             
         except Exception as e:
             logger.error(f"Error categorizing ticket: {e}")
-            return "General", "Medium"
+        
+        # Fall back to the classifier's best guess rather than a fixed General/Medium
+        return prediction["category"], prediction["priority"], "classifier"
     
     def generate_response(self, subject: str, message: str, category: str) -> str:
         """Generate AI-powered response for support tickets."""
@@ -99,7 +228,7 @@ class GPUSupportAI:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = metered_call("support.generate_response", FEATURE_SUPPORT_TICKETS, self.client.chat.completions.create,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7
@@ -109,62 +238,245 @@ class GPUSupportAI:
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return "Thank you for contacting GPU Benchmark Tool support. We're experiencing technical difficulties. Please try again later or contact us directly."
+            return FALLBACK_RESPONSE
+    
+    def _resolve_ticket(self, subject: str, message: str) -> Dict:
+        """Categorize a ticket and draft its response, overlapping the two model calls.
+        
+        When the classifier is unsure, the response is drafted with its best-guess
+        category while the model categorizes; the draft is only regenerated if the
+        model disagrees.
+        """
+        
+        # Near-duplicate tickets reuse a prior answer and skip both model calls
+        cached = self.response_cache.lookup(subject, message)
+        if cached:
+            return {
+                "category": cached["category"],
+                "priority": cached["priority"],
+                "ai_response": cached["ai_response"],
+                "label_source": "cache"
+            }
+        
+        prediction = self.classifier.predict(subject, message)
+        if self.classifier.is_confident(prediction):
+            category, priority, label_source = prediction["category"], prediction["priority"], "classifier"
+            ai_response = self.generate_response(subject, message, category)
+        else:
+            draft = self._speculation_pool.submit(self.generate_response, subject, message, prediction["category"])
+            category, priority, label_source = self._categorize(subject, message, prediction)
+            ai_response = draft.result()
+            if category != prediction["category"]:
+                ai_response = self.generate_response(subject, message, category)
+        
+        return {
+            "category": category,
+            "priority": priority,
+            "ai_response": ai_response,
+            "label_source": label_source
+        }
+    
+    def _store_tickets(self, tickets: List[Dict]):
+        """Insert processed tickets in a single transaction and assign their IDs."""
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            for ticket in tickets:
+                cursor.execute('''
+                    INSERT INTO support_tickets 
+                    (user_email, subject, message, category, priority, ai_response, label_source)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (ticket["user_email"], ticket["subject"], ticket["message"], ticket["category"],
+                      ticket["priority"], ticket["ai_response"], ticket["label_source"]))
+                ticket["ticket_id"] = cursor.lastrowid
+        
+        for ticket in tickets:
+            if ticket["label_source"] != "cache" and ticket["ai_response"] != FALLBACK_RESPONSE:
+                self.response_cache.add(ticket["ticket_id"], ticket["subject"], ticket["message"],
+                                        ticket["category"], ticket["priority"], ticket["ai_response"])
+    
+    def _ticket_result(self, ticket: Dict) -> Dict:
+        return {
+            "ticket_id": ticket["ticket_id"],
+            "category": ticket["category"],
+            "priority": ticket["priority"],
+            "ai_response": ticket["ai_response"],
+            "from_cache": ticket["label_source"] == "cache",
+            "status": "processed"
+        }
     
     def process_ticket(self, user_email: str, subject: str, message: str) -> Dict:
         """Process a new support ticket with AI."""
+        ticket = self._resolve_ticket(subject, message)
+        ticket.update(user_email=user_email, subject=subject, message=message)
+        self._store_tickets([ticket])
+        
+        logger.info(f"Processed ticket #{ticket['ticket_id']} - Category: {ticket['category']}, "
+                    f"Priority: {ticket['priority']} ({ticket['label_source']})")
+        
+        return self._ticket_result(ticket)
+    
+    def process_tickets(self, tickets: List[Dict], workers: int = 8, batch_size: int = 100) -> List[Dict]:
+        """Process a backlog of tickets ({user_email, subject, message}) with a worker pool.
         
-        # Categorize and prioritize
-        category, priority = self.categorize_ticket(subject, message)
+        Model calls for different tickets run concurrently; finished tickets are
+        written to the database in batched transactions. Results keep input order.
+        """
+        results: List[Dict] = [None] * len(tickets)
+        pending: List[Dict] = []
         
-        # Generate AI response
-        ai_response = self.generate_response(subject, message, category)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ticket-worker") as pool:
+            futures = {
+                pool.submit(self._resolve_ticket, t["subject"], t["message"]): index
+                for index, t in enumerate(tickets)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                ticket = future.result()
+                ticket.update(user_email=tickets[index].get("user_email"),
+                              subject=tickets[index]["subject"],
+                              message=tickets[index]["message"])
+                results[index] = ticket
+                pending.append(ticket)
+                
+                if len(pending) >= batch_size:
+                    self._store_tickets(pending)
+                    pending = []
         
-        # Store in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if pending:
+            self._store_tickets(pending)
         
-        cursor.execute('''
-            INSERT INTO support_tickets 
-            (user_email, subject, message, category, priority, ai_response)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_email, subject, message, category, priority, ai_response))
+        logger.info(f"Processed {len(tickets)} tickets with {workers} workers")
+        return [self._ticket_result(ticket) for ticket in results]
+    
+    def _ticket_dict(self, row) -> Dict:
+        return dict(zip([column.strip() for column in TICKET_COLUMNS.split(",")], row))
+    
+    def get_ticket(self, ticket_id: int) -> Optional[Dict]:
+        """Fetch one ticket, including its AI response."""
+        row = self.storage.fetchone(f'''
+            SELECT {TICKET_COLUMNS}, message, ai_response FROM support_tickets WHERE id = ?
+        ''', (ticket_id,))
+        if not row:
+            return None
         
-        ticket_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        ticket = self._ticket_dict(row[:-2])
+        ticket.update(message=row[-2], ai_response=row[-1])
+        return ticket
+    
+    def list_tickets(self, status: str = None, priority: str = None,
+                     limit: int = 50, cursor: int = None) -> Dict:
+        """List tickets newest first, optionally filtered by status and/or priority.
         
-        logger.info(f"Processed ticket #{ticket_id} - Category: {category}, Priority: {priority}")
+        Paging is keyset-based: pass the returned next_cursor to get the next page.
+        Ids grow with created_at, so each page is an index range read no matter
+        how deep into the backlog it is.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if priority:
+            conditions.append("priority = ?")
+            params.append(priority)
+        if cursor is not None:
+            conditions.append("id < ?")
+            params.append(int(cursor))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Fetch one extra row to know whether another page exists
+        rows = self.storage.fetchall(f'''
+            SELECT {TICKET_COLUMNS} FROM support_tickets {where}
+            ORDER BY id DESC LIMIT ?
+        ''', params + [limit + 1])
         
+        tickets = [self._ticket_dict(row) for row in rows[:limit]]
         return {
-            "ticket_id": ticket_id,
-            "category": category,
-            "priority": priority,
-            "ai_response": ai_response,
-            "status": "processed"
+            "tickets": tickets,
+            "next_cursor": tickets[-1]["id"] if len(rows) > limit else None
         }
     
+    def _update_ticket(self, ticket_id: int, sql: str, params: Tuple) -> bool:
+        cursor = self.storage.execute(sql, params + (ticket_id,))
+        return cursor.rowcount == 1
+    
+    def resolve_ticket(self, ticket_id: int) -> bool:
+        """Mark an open ticket resolved. Returns False if it does not exist or is not open."""
+        resolved = self._update_ticket(ticket_id, '''
+            UPDATE support_tickets SET status = 'resolved', resolved_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'open'
+        ''', ())
+        if resolved:
+            logger.info(f"Resolved ticket #{ticket_id}")
+        return resolved
+    
+    def close_ticket(self, ticket_id: int) -> bool:
+        """Close a ticket for good, keeping its original resolution time if it had one."""
+        closed = self._update_ticket(ticket_id, '''
+            UPDATE support_tickets SET status = 'closed',
+                resolved_at = COALESCE(resolved_at, CURRENT_TIMESTAMP)
+            WHERE id = ? AND status != 'closed'
+        ''', ())
+        if closed:
+            logger.info(f"Closed ticket #{ticket_id}")
+        return closed
+    
+    def reopen_ticket(self, ticket_id: int) -> bool:
+        """Reopen a resolved or closed ticket."""
+        reopened = self._update_ticket(ticket_id, '''
+            UPDATE support_tickets SET status = 'open', resolved_at = NULL
+            WHERE id = ? AND status != 'open'
+        ''', ())
+        if reopened:
+            logger.info(f"Reopened ticket #{ticket_id}")
+        return reopened
+    
+    def assign_ticket(self, ticket_id: int, assignee: Optional[str]) -> bool:
+        """Assign a ticket to a support agent (None unassigns it)."""
+        return self._update_ticket(ticket_id, '''
+            UPDATE support_tickets SET assignee = ? WHERE id = ?
+        ''', (assignee,))
+    
+    def relabel_ticket(self, ticket_id: int, category: Optional[str] = None,
+                       priority: Optional[str] = None) -> bool:
+        """Correct a ticket's category and/or priority as an agent.
+
+        Agent labels are what the local classifier trains on, so corrections
+        feed the next retraining. Raises ValueError for unknown labels.
+        """
+        if category is None and priority is None:
+            raise ValueError("category or priority is required")
+        if category is not None and category not in CATEGORIES:
+            raise ValueError(f"category must be one of {', '.join(CATEGORIES)}")
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        relabeled = self._update_ticket(ticket_id, '''
+            UPDATE support_tickets SET category = COALESCE(?, category), priority = COALESCE(?, priority),
+                label_source = 'agent'
+            WHERE id = ?
+        ''', (category, priority))
+        if relabeled:
+            logger.info(f"Relabeled ticket #{ticket_id}: {category or '-'} / {priority or '-'}")
+        return relabeled
+    
     def get_ticket_stats(self) -> Dict:
-        """Get statistics about support tickets."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get statistics about support tickets.
         
-        # Get category distribution
-        cursor.execute('SELECT category, COUNT(*) FROM support_tickets GROUP BY category')
-        categories = dict(cursor.fetchall())
-        
-        # Get priority distribution
-        cursor.execute('SELECT priority, COUNT(*) FROM support_tickets GROUP BY priority')
-        priorities = dict(cursor.fetchall())
+        Reads the trigger-maintained ticket_stats rows, so the cost does not
+        grow with the number of tickets.
+        """
+        rows = self.storage.fetchall(HOT_QUERIES["ticket_stats"][0])
         
-        # Get resolution time
-        cursor.execute('''
-            SELECT AVG(julianday(resolved_at) - julianday(created_at)) * 24 
-            FROM support_tickets WHERE resolved_at IS NOT NULL
-        ''')
-        avg_resolution_time = cursor.fetchone()[0] or 0
+        categories, priorities = {}, {}
+        resolved, total_hours = 0, 0.0
+        for dimension, value, ticket_count, hours in rows:
+            if dimension == "resolution":
+                resolved, total_hours = ticket_count, hours
+            elif ticket_count > 0:
+                target = categories if dimension == "category" else priorities
+                target[value or None] = ticket_count
         
-        conn.close()
+        avg_resolution_time = total_hours / resolved if resolved else 0
         
         return {
             "categories": categories,
@@ -186,6 +498,14 @@ if __name__ == "__main__":
     
     print(f"Ticket processed: {ticket}")
     
+    # Example backlog import
+    backlog = [
+        {"user_email": "a@example.com", "subject": "Low FPS", "message": "Benchmark score dropped after the latest driver update."},
+        {"user_email": "b@example.com", "subject": "Refund request", "message": "I was charged twice for the Pro plan this month."},
+    ]
+    results = ai_support.process_tickets(backlog, workers=8)
+    print(f"Backlog processed: {[r['ticket_id'] for r in results]}")
+    
     # Get statistics
     stats = ai_support.get_ticket_stats()
     print(f"Support stats: {stats}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+API Authentication
+Signed per-user API keys for the AI backends, and bearer-token guards for the internal support and admin routes.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import sys
+from typing import Optional
+import logging
+
+from flask import jsonify, request
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keys are "<base64url email>.<HMAC-SHA256 of the email>", so verifying one needs no
+# database lookup; rotating API_KEY_SECRET revokes every key at once
+API_KEY_SECRET_ENV = "API_KEY_SECRET"
+# Staff tokens per role, most specific first; admins can do everything support can.
+# A role with none of its variables set is closed to everyone.
+ROLE_TOKEN_ENVS = {
+    "support": ("SUPPORT_API_TOKEN", "ADMIN_API_TOKEN"),
+    "admin": ("ADMIN_API_TOKEN",),
+}
+
+def _secret() -> Optional[bytes]:
+    secret = os.getenv(API_KEY_SECRET_ENV)
+    return secret.encode() if secret else None
+
+def _signature(secret: bytes, user_email: str) -> str:
+    return hmac.new(secret, user_email.encode(), hashlib.sha256).hexdigest()
+
+def issue_api_key(user_email: str) -> str:
+    """API key identifying user_email to the AI backends."""
+    secret = _secret()
+    if secret is None:
+        raise RuntimeError(f"{API_KEY_SECRET_ENV} is not set")
+    encoded = base64.urlsafe_b64encode(user_email.encode()).decode().rstrip("=")
+    return f"{encoded}.{_signature(secret, user_email)}"
+
+def verify_api_key(api_key: str) -> Optional[str]:
+    """The email an API key was issued for, or None if the key is malformed or forged."""
+    secret = _secret()
+    if secret is None or "." not in api_key:
+        return None
+    encoded, signature = api_key.rsplit(".", 1)
+    try:
+        user_email = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    if not hmac.compare_digest(signature, _signature(secret, user_email)):
+        return None
+    return user_email
+
+def _bearer_token() -> Optional[str]:
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):].strip()
+    return request.headers.get("X-API-Key")
+
+def authenticated_user() -> Optional[str]:
+    """Email of the caller's verified API key; None for anonymous callers.
+
+    Identity never comes from request bodies or plain headers: those are
+    whatever the client chooses to send.
+    """
+    token = _bearer_token()
+    return verify_api_key(token) if token else None
+
+def has_role(role: str) -> bool:
+    """Whether the request's bearer token is one configured for role."""
+    token = _bearer_token()
+    if not token:
+        return False
+    for env in ROLE_TOKEN_ENVS[role]:
+        expected = os.getenv(env)
+        if expected and hmac.compare_digest(token.encode(), expected.encode()):
+            return True
+    return False
+
+def require_role(role: str):
+    """A before_request handler that answers 401 unless the caller holds role.
+
+    Register it on a blueprint (blueprint.before_request(require_role("admin")))
+    so every route the blueprint adds later is covered too.
+    """
+    def check():
+        if has_role(role):
+            return None
+        response = jsonify({'success': False, 'error': 'Authentication required'})
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response, 401
+    return check
+
+if __name__ == "__main__":
+    # Issue a key for a customer: API_KEY_SECRET=... python api_auth.py user@example.com
+    if len(sys.argv) != 2:
+        print("usage: api_auth.py <user_email>", file=sys.stderr)
+        sys.exit(2)
+    print(issue_api_key(sys.argv[1]))
@@ -3,255 +3,47 @@
 GPU Detector - Simple web tool to detect and display GPU information
 """
 
-import platform
 import json
-from flask import Flask, render_template, jsonify, request
-import psutil
+import hashlib
+import time
+from concurrent.futures import TimeoutError as ReportTimeout
+from flask import Flask, Response, render_template, jsonify, request, send_file
 
-# Try to import GPU detection libraries
-try:
-    import pynvml
-    PYNVML_AVAILABLE = True
-except ImportError:
-    PYNVML_AVAILABLE = False
-
-try:
-    import cpuinfo
-    CPUINFO_AVAILABLE = True
-except ImportError:
-    CPUINFO_AVAILABLE = False
+from api_auth import require_role
+from downsample import CHART_FIELDS, METHODS, chart_series
+from gpu_detection import detect
+from report_renderer import MAX_BATCH_REPORTS, REPORT_FORMATS, ReportRenderer
+from result_stream import StreamingResultParser
+from stress_results import (MAX_ERRORS, MAX_SAMPLES_PER_GPU, StressResultStore, parse_timestamp, validate_columns,
+                            validate_result)
+import telemetry_codec
 
 app = Flask(__name__)
 
-def get_system_info():
-    """Get basic system information"""
-    return {
-        "platform": platform.system(),
-        "platform_version": platform.version(),
-        "architecture": platform.machine(),
-        "processor": platform.processor(),
-        "python_version": platform.python_version()
-    }
-
-def get_gpu_info():
-    """Get GPU information using available backends"""
-    gpu_info = {
-        "detected": False,
-        "gpus": [],
-        "backend": "none",
-        "error": None
-    }
-    
-    # Try NVIDIA GPUs first
-    if PYNVML_AVAILABLE:
-        try:
-            pynvml.nvmlInit()
-            device_count = pynvml.nvmlDeviceGetCount()
-            
-            for i in range(device_count):
-                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-                
-                # Get GPU name
-                name = pynvml.nvmlDeviceGetName(handle)
-                if isinstance(name, bytes):
-                    name = name.decode('utf-8')
-                
-                # Get memory info
-                memory_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                memory_total_gb = memory_info.total // (1024**3)
-                
-                # Get driver version
-                driver_version = pynvml.nvmlSystemGetDriverVersion()
-                if isinstance(driver_version, bytes):
-                    driver_version = driver_version.decode('utf-8')
-                
-                gpu_data = {
-                    "name": name,
-                    "memory_gb": memory_total_gb,
-                    "driver_version": driver_version,
-                    "type": "NVIDIA"
-                }
-                
-                gpu_info["gpus"].append(gpu_data)
-            
-            if gpu_info["gpus"]:
-                gpu_info["detected"] = True
-                gpu_info["backend"] = "nvidia"
-            
-            pynvml.nvmlShutdown()
-            
-        except Exception as e:
-            gpu_info["error"] = f"NVIDIA detection failed: {str(e)}"
-    
-    # If no NVIDIA GPUs found, try other methods
-    if not gpu_info["detected"]:
-        # Try using system commands
-        try:
-            if platform.system() == "Darwin":  # macOS
-                # Try to get GPU info using system_profiler
-                import subprocess
-                result = subprocess.run(['system_profiler', 'SPDisplaysDataType'], 
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    # Parse the output to find GPU info
-                    lines = result.stdout.split('\n')
-                    gpu_name = None
-                    gpu_memory = "Unknown"
-                    
-                    for line in lines:
-                        if 'Chipset Model:' in line:
-                            gpu_name = line.split(':')[1].strip()
-                        elif 'VRAM' in line and 'Total' in line:
-                            # Try to extract memory info
-                            memory_match = line.split(':')[1].strip()
-                            if memory_match != '':
-                                gpu_memory = memory_match
-                    
-                    # If no specific GPU found, try to detect Apple Silicon
-                    if not gpu_name:
-                        # Check for Apple Silicon
-                        if platform.machine() == 'arm64':
-                            # Try to get more specific info
-                            try:
-                                result = subprocess.run(['sysctl', '-n', 'machdep.cpu.brand_string'], 
-                                                      capture_output=True, text=True, timeout=5)
-                                if result.returncode == 0 and 'Apple' in result.stdout:
-                                    cpu_info = result.stdout.strip()
-                                    if 'M1' in cpu_info:
-                                        if 'Pro' in cpu_info:
-                                            gpu_name = "Apple M1 Pro"
-                                        elif 'Max' in cpu_info:
-                                            gpu_name = "Apple M1 Max"
-                                        elif 'Ultra' in cpu_info:
-                                            gpu_name = "Apple M1 Ultra"
-                                        else:
-                                            gpu_name = "Apple M1"
-                                    elif 'M2' in cpu_info:
-                                        if 'Pro' in cpu_info:
-                                            gpu_name = "Apple M2 Pro"
-                                        elif 'Max' in cpu_info:
-                                            gpu_name = "Apple M2 Max"
-                                        elif 'Ultra' in cpu_info:
-                                            gpu_name = "Apple M2 Ultra"
-                                        else:
-                                            gpu_name = "Apple M2"
-                                    elif 'M3' in cpu_info:
-                                        if 'Pro' in cpu_info:
-                                            gpu_name = "Apple M3 Pro"
-                                        elif 'Max' in cpu_info:
-                                            gpu_name = "Apple M3 Max"
-                                        elif 'Ultra' in cpu_info:
-                                            gpu_name = "Apple M3 Ultra"
-                                        else:
-                                            gpu_name = "Apple M3"
-                            except:
-                                gpu_name = "Apple Silicon GPU"
-                    
-                    if gpu_name:
-                        gpu_info["gpus"].append({
-                            "name": gpu_name,
-                            "memory_gb": gpu_memory,
-                            "driver_version": "macOS",
-                            "type": "Apple/AMD/Intel"
-                        })
-                        gpu_info["detected"] = True
-                        gpu_info["backend"] = "system_profiler"
-            
-            elif platform.system() == "Windows":
-                # Try using wmic for Windows
-                import subprocess
-                result = subprocess.run(['wmic', 'path', 'win32_VideoController', 'get', 'name'], 
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')[1:]  # Skip header
-                    for line in lines:
-                        if line.strip():
-                            gpu_info["gpus"].append({
-                                "name": line.strip(),
-                                "memory_gb": "Unknown",
-                                "driver_version": "Windows",
-                                "type": "Unknown"
-                            })
-                            gpu_info["detected"] = True
-                            gpu_info["backend"] = "wmic"
-            
-            elif platform.system() == "Linux":
-                # Try using lspci for Linux
-                import subprocess
-                result = subprocess.run(['lspci', '-v'], capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    lines = result.stdout.split('\n')
-                    for line in lines:
-                        if 'VGA compatible controller' in line or '3D controller' in line:
-                            gpu_name = line.split(':')[2].strip()
-                            gpu_info["gpus"].append({
-                                "name": gpu_name,
-                                "memory_gb": "Unknown",
-                                "driver_version": "Linux",
-                                "type": "Unknown"
-                            })
-                            gpu_info["detected"] = True
-                            gpu_info["backend"] = "lspci"
-                            
-        except Exception as e:
-            gpu_info["error"] = f"System detection failed: {str(e)}"
-    
-    return gpu_info
+# Result documents carry up to MAX_SAMPLES_PER_GPU telemetry rows per GPU; uploads are
+# parsed as they stream in, so the limit bounds request time rather than memory
+MAX_RESULT_UPLOAD_BYTES = 512 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# A report request waits this long for a fresh render before answering 202
+REPORT_WAIT_SECONDS = 10
+_result_store = None
+_report_renderer = None
+# Batch renders fan out over the shared worker pool, so queuing them is an admin action
+_require_admin = require_role("admin")
 
-def get_cpu_info():
-    """Get CPU information"""
-    cpu_info = {
-        "name": "Unknown",
-        "cores": psutil.cpu_count(),
-        "physical_cores": psutil.cpu_count(logical=False),
-        "frequency": psutil.cpu_freq().current if psutil.cpu_freq() else "Unknown"
-    }
-    
-    # Try multiple methods to get CPU name
-    if CPUINFO_AVAILABLE:
-        try:
-            info = cpuinfo.get_cpu_info()
-            cpu_info["name"] = info.get('brand_raw', 'Unknown')
-        except:
-            pass
-    
-    # If cpuinfo failed, try system-specific methods
-    if cpu_info["name"] == "Unknown":
-        try:
-            if platform.system() == "Darwin":  # macOS
-                import subprocess
-                result = subprocess.run(['sysctl', '-n', 'machdep.cpu.brand_string'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    cpu_info["name"] = result.stdout.strip()
-            elif platform.system() == "Linux":
-                # Try reading from /proc/cpuinfo
-                try:
-                    with open('/proc/cpuinfo', 'r') as f:
-                        for line in f:
-                            if line.startswith('model name'):
-                                cpu_info["name"] = line.split(':')[1].strip()
-                                break
-                except:
-                    pass
-        except:
-            pass
-    
-    # Fix frequency display
-    if cpu_info["frequency"] != "Unknown":
-        cpu_info["frequency"] = f"{cpu_info['frequency']:.0f}"
-    
-    return cpu_info
+def get_result_store():
+    """Stress-test result store, opened on first use"""
+    global _result_store
+    if _result_store is None:
+        _result_store = StressResultStore()
+    return _result_store
 
-def get_memory_info():
-    """Get memory information"""
-    memory = psutil.virtual_memory()
-    return {
-        "total_gb": round(memory.total / (1024**3), 2),
-        "available_gb": round(memory.available / (1024**3), 2),
-        "used_gb": round(memory.used / (1024**3), 2),
-        "percent_used": memory.percent
-    }
+def get_report_renderer():
+    """Report renderer and its worker pool, started on first use"""
+    global _report_renderer
+    if _report_renderer is None:
+        _report_renderer = ReportRenderer(get_result_store())
+    return _report_renderer
 
 @app.route('/')
 def index():
@@ -261,50 +53,233 @@ def index():
 @app.route('/api/detect')
 def detect_gpu():
     """API endpoint to detect GPU"""
-    result = {
-        "success": False,
-        "system": None,
-        "gpu": None,
-        "cpu": None,
-        "memory": None,
-        "errors": []
-    }
-    
-    try:
-        # Test each function individually
-        try:
-            result["system"] = get_system_info()
-        except Exception as e:
-            result["errors"].append(f"System info failed: {str(e)}")
-        
-        try:
-            result["gpu"] = get_gpu_info()
-        except Exception as e:
-            result["errors"].append(f"GPU info failed: {str(e)}")
-        
-        try:
-            result["cpu"] = get_cpu_info()
-        except Exception as e:
-            result["errors"].append(f"CPU info failed: {str(e)}")
-        
-        try:
-            result["memory"] = get_memory_info()
-        except Exception as e:
-            result["errors"].append(f"Memory info failed: {str(e)}")
-        
-        # If we got here without major issues, mark as success
-        result["success"] = True
-        return jsonify(result)
-        
-    except Exception as e:
-        result["errors"].append(f"General error: {str(e)}")
-        return jsonify(result), 500
+    return jsonify(detect())
 
 @app.route('/api/health')
 def health():
     """Health check endpoint"""
     return jsonify({"status": "healthy"})
 
+@app.route('/api/results', methods=['POST'])
+def upload_results():
+    """Validate and store a stress-test result document"""
+    if request.content_length is not None and request.content_length > MAX_RESULT_UPLOAD_BYTES:
+        return jsonify({'success': False, 'error': f"Upload exceeds {MAX_RESULT_UPLOAD_BYTES} bytes"}), 413
+
+    first = request.stream.read(UPLOAD_CHUNK_BYTES)
+    binary = request.mimetype == telemetry_codec.CONTENT_TYPE or first.startswith(telemetry_codec.MAGIC)
+    try:
+        if binary:
+            # Binary uploads are small enough to decode in one piece
+            body = first + request.stream.read(MAX_RESULT_UPLOAD_BYTES + 1 - len(first))
+            if len(body) > MAX_RESULT_UPLOAD_BYTES:
+                return jsonify({'success': False, 'error': f"Upload exceeds {MAX_RESULT_UPLOAD_BYTES} bytes"}), 413
+            doc, telemetry = telemetry_codec.decode_result(body, MAX_SAMPLES_PER_GPU)
+            errors = []
+            result_hash, size = hashlib.sha256(body).hexdigest(), len(body)
+        else:
+            parser = StreamingResultParser()
+            chunk = first
+            while chunk:
+                parser.feed(chunk)
+                if parser.size > MAX_RESULT_UPLOAD_BYTES:
+                    return jsonify({'success': False, 'error': f"Upload exceeds {MAX_RESULT_UPLOAD_BYTES} bytes"}), 413
+                chunk = request.stream.read(UPLOAD_CHUNK_BYTES)
+            doc = parser.close()
+            telemetry, errors = parser.telemetry, parser.errors
+            result_hash, size = parser.sha256, parser.size
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f"Invalid {'telemetry file' if binary else 'JSON'}: {e}"}), 400
+
+    errors = errors + validate_result(doc)
+    if not errors:
+        # Column-level checks; streamed samples were already checked one by one
+        for gpu_key, columns in telemetry.items():
+            errors += validate_columns(gpu_key, columns)
+    if errors:
+        return jsonify({'success': False, 'error': 'Invalid result document', 'details': errors[:MAX_ERRORS]}), 400
+
+    try:
+        result_id, duplicate = get_result_store().ingest_columns(doc, telemetry, result_hash, size)
+    except ValueError as e:
+        # Telemetry the binary codec cannot represent
+        return jsonify({'success': False, 'error': f"Invalid telemetry: {e}"}), 400
+    return jsonify({
+        'success': True,
+        'result_id': result_id,
+        'gpus': len(doc['results']),
+        'duplicate': duplicate
+    }), 200 if duplicate else 201
+
+@app.route('/api/results')
+def list_results():
+    """Stored results, newest first: ?limit=50&cursor=<next_cursor>"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit and cursor must be integers'}), 400
+    return jsonify(dict(get_result_store().list_results(limit, cursor), success=True))
+
+@app.route('/api/results/<int:result_id>')
+def get_result(result_id):
+    """One stored result; ?telemetry=1 includes the telemetry samples, ?format=gput returns the binary file"""
+    if request.args.get('format') == 'gput':
+        data = get_result_store().export_result(result_id)
+        if data is None:
+            return jsonify({'success': False, 'error': f"Result {result_id} not found"}), 404
+        return Response(data, mimetype=telemetry_codec.CONTENT_TYPE, headers={
+            'Content-Disposition': f'attachment; filename="result-{result_id}{telemetry_codec.FILE_EXTENSION}"'
+        })
+
+    result = get_result_store().get_result(result_id, request.args.get('telemetry') in ('1', 'true'))
+    if result is None:
+        return jsonify({'success': False, 'error': f"Result {result_id} not found"}), 404
+    return jsonify({'success': True, 'result': result})
+
+@app.route('/api/results/<int:result_id>/series')
+def get_result_series(result_id):
+    """Downsampled chart series for every GPU of a result: ?width=<chart px>&fields=temp_c,power_w&method=lttb|minmax"""
+    try:
+        width = int(request.args.get('width', 800))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'width must be an integer'}), 400
+    if width <= 0:
+        return jsonify({'success': False, 'error': 'width must be positive'}), 400
+    fields = [f for f in request.args.get('fields', '').split(',') if f] or list(CHART_FIELDS)
+    if any(f not in CHART_FIELDS for f in fields):
+        return jsonify({'success': False, 'error': f"fields must be a subset of {', '.join(CHART_FIELDS)}"}), 400
+    method = request.args.get('method', 'lttb')
+    if method not in METHODS:
+        return jsonify({'success': False, 'error': f"method must be one of {', '.join(METHODS)}"}), 400
+
+    store = get_result_store()
+    result = store.get_result(result_id)
+    if result is None:
+        return jsonify({'success': False, 'error': f"Result {result_id} not found"}), 404
+
+    gpus = {}
+    for gpu_key, run in result['results'].items():
+        columns = store.get_telemetry_columns(run['run_id'])
+        if columns is None or not len(columns['timestamp']):
+            continue
+        gpus[gpu_key] = dict(chart_series(columns, width, fields, method),
+                             name=run['gpu_info'].get('name'))
+    response = jsonify({'success': True, 'result_id': result_id, 'device_count': result['device_count'],
+                        'gpus': gpus})
+    # Stored results never change
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+@app.route('/api/results/<int:result_id>/report')
+def get_result_report(result_id):
+    """Rendered report for a stored result: ?format=pdf|html. Answers 202 while a render is still running."""
+    fmt = request.args.get('format', 'pdf')
+    if fmt not in REPORT_FORMATS:
+        return jsonify({'success': False, 'error': f"format must be one of {', '.join(REPORT_FORMATS)}"}), 400
+
+    renderer = get_report_renderer()
+    path = renderer.cached(result_id, fmt)
+    if path is None:
+        future = renderer.submit(result_id, fmt)
+        if future is None:
+            return jsonify({'success': False, 'error': f"Result {result_id} not found"}), 404
+        try:
+            path = future.result(timeout=REPORT_WAIT_SECONDS)
+        except ReportTimeout:
+            response = jsonify({'success': True, 'status': 'pending'})
+            response.headers['Retry-After'] = '2'
+            return response, 202
+        except Exception as e:
+            return jsonify({'success': False, 'error': f"Report rendering failed: {e}"}), 500
+
+    return send_file(path, mimetype=REPORT_FORMATS[fmt], as_attachment=fmt == 'pdf',
+                     download_name=f"gpu_stress_test_report_{result_id}.{fmt}", max_age=86400)
+
+@app.route('/api/reports', methods=['POST'])
+def queue_reports():
+    """Queue reports for many results: {"result_ids": [...], "format": "pdf"}; no ids means the newest results"""
+    denied = _require_admin()
+    if denied:
+        return denied
+    body = request.get_json(silent=True) or {}
+    fmt = body.get('format', 'pdf')
+    if fmt not in REPORT_FORMATS:
+        return jsonify({'success': False, 'error': f"format must be one of {', '.join(REPORT_FORMATS)}"}), 400
+    result_ids = body.get('result_ids')
+    if result_ids is None:
+        result_ids = [row['id'] for row in get_result_store().list_results(MAX_BATCH_REPORTS)['results']]
+    elif not isinstance(result_ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in result_ids):
+        return jsonify({'success': False, 'error': 'result_ids must be a list of integers'}), 400
+    elif len(result_ids) > MAX_BATCH_REPORTS:
+        return jsonify({'success': False, 'error': f"At most {MAX_BATCH_REPORTS} reports per batch"}), 400
+
+    summary = get_report_renderer().submit_batch(result_ids, fmt)
+    return jsonify(dict(summary, success=True, format=fmt)), 202
+
+def _time_arg(name):
+    """Unix time from an ISO-8601 or numeric query argument; ValueError if it is neither"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = parse_timestamp(value)
+        if parsed is None:
+            raise ValueError(f"{name} must be an ISO-8601 timestamp or unix time")
+        return parsed
+
+@app.route('/api/fleet/runs')
+def fleet_runs():
+    """GPU runs across every stored result, newest first.
+
+    ?model=<model>&status=<health status>&below=<score>&min_health=<score>
+    &days=<n> or &since=/&until=<ISO-8601 or unix time>&limit=50&cursor=<next_cursor>
+    """
+    try:
+        since, until = _time_arg('since'), _time_arg('until')
+        if request.args.get('days'):
+            since = time.time() - float(request.args['days']) * 86400
+        below = request.args.get('below')
+        min_health = request.args.get('min_health')
+        page = get_result_store().query_runs(
+            model=request.args.get('model') or None,
+            status=request.args.get('status') or None,
+            below=float(below) if below else None,
+            min_health=float(min_health) if min_health else None,
+            since=since, until=until,
+            limit=int(request.args.get('limit', 50)),
+            cursor=request.args.get('cursor') or None,
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f"Invalid query: {e}"}), 400
+    return jsonify(dict(page, success=True))
+
+@app.route('/api/devices/<path:device_key>')
+def get_device(device_key):
+    """Running baseline statistics for one physical GPU and its newest runs: ?limit=50"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    device = get_result_store().get_device(device_key, limit)
+    if device is None:
+        return jsonify({'success': False, 'error': f"Device {device_key} not found"}), 404
+    return jsonify({'success': True, 'device': device})
+
+@app.route('/api/fleet/models')
+def fleet_models():
+    """Pre-aggregated statistics per GPU model: ?prefix=RTX&limit=50&cursor=<next_cursor>"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    page = get_result_store().model_stats(request.args.get('prefix', ''), limit,
+                                          request.args.get('cursor') or None)
+    return jsonify(dict(page, success=True))
+
 if __name__ == '__main__':
     # Development server
     app.run(debug=True, host='0.0.0.0', port=8080)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Query Plan Regression Check
+Builds fresh support, monetization and stress-result databases and fails if any hot query plans a table scan or a sort.
+"""
+
+import os
+import sys
+import tempfile
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def check_all() -> int:
+    """Run EXPLAIN QUERY PLAN over every registered hot query. Returns the number of failures."""
+    import ai_support_system
+    import monetization_strategy
+    import quota_limiter
+    import stress_results
+
+    support = ai_support_system.GPUSupportAI("query-plan-check")
+    support.classifier.stop()
+    monetization = monetization_strategy.GPUMonetizationEngine()
+    quota_limiter.GPUQuotaLimiter(monetization)
+    results = stress_results.StressResultStore()
+
+    suites = [
+        ("ai_support_system", support.storage, ai_support_system.HOT_QUERIES),
+        ("monetization_strategy", monetization.storage, monetization_strategy.HOT_QUERIES),
+        ("quota_limiter", monetization.storage, quota_limiter.HOT_QUERIES),
+        ("stress_results", results.storage, stress_results.HOT_QUERIES),
+    ]
+
+    failures = 0
+    for module, storage, queries in suites:
+        problems = storage.check_query_plans(queries)
+        for name in queries:
+            if name in problems:
+                failures += 1
+                print(f"FAIL {module}.{name}: {'; '.join(problems[name])}")
+            else:
+                print(f"ok   {module}.{name}: {'; '.join(storage.explain(*queries[name]))}")
+    return failures
+
+if __name__ == "__main__":
+    # The modules create their databases in the working directory; keep them out of the tree
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        failed = check_all()
+
+    if failed:
+        print(f"\n{failed} hot queries fall back to a table scan or sort")
+        sys.exit(1)
+    print("\nAll hot queries use an index")
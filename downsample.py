@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Chart Series Downsampling
+Reduces telemetry columns to about one point per pixel of chart width (LTTB and min/max buckets).
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+import logging
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIN_CHART_POINTS = 16
+MAX_CHART_POINTS = 4096
+
+# Telemetry fields the results page charts
+CHART_FIELDS = ("temp_c", "power_w", "gpu_util_pct", "mem_util_pct", "mem_bandwidth_pct", "throttling")
+# Flags keep every transition under min/max; LTTB would drop short throttle events
+MINMAX_FIELDS = ("throttling",)
+METHODS = ("lttb", "minmax")
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps (x must be sorted).
+
+    The first and last points are always kept; every bucket in between contributes
+    the point forming the largest triangle with the previous pick and the average of
+    the next bucket, which preserves peaks that plain striding would skip.
+    """
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points, and each bucket's centroid up front:
+    # only the previously picked point is sequential
+    edges = (1 + np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64)
+    edges[-1] = n - 1
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    centroid_x = np.append(sums_x / sizes, x[-1])
+    centroid_y = np.append(sums_y / sizes, y[-1])
+
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        cx, cy = centroid_x[bucket + 1], centroid_y[bucket + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((ax - cx) * (y[start:end] - ay) - (ax - x[start:end]) * (cy - ay))
+        a = start + int(area.argmax())
+        picked[bucket + 1] = a
+    return picked
+
+def min_max(y: np.ndarray, buckets: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, in order (two points per bucket)."""
+    n = y.size
+    if buckets * 2 >= n or buckets < 1:
+        return np.arange(n)
+    size = math.ceil(n / buckets)
+    rows = math.ceil(n / size)
+    pad = rows * size - n
+    lows = np.concatenate((y, np.full(pad, np.inf))).reshape(rows, size).argmin(axis=1)
+    highs = np.concatenate((y, np.full(pad, -np.inf))).reshape(rows, size).argmax(axis=1)
+    offsets = np.arange(rows) * size
+    return np.unique(np.concatenate((offsets + lows, offsets + highs)))
+
+def downsample(x: np.ndarray, y: np.ndarray, points: int, method: str = "lttb") -> Dict:
+    """One series as {"t": [...], "v": [...]} with at most `points` points; missing (NaN) values are skipped."""
+    present = ~np.isnan(y)
+    if not present.all():
+        x, y = x[present], y[present]
+    keep = lttb(x, y, points) if method == "lttb" else min_max(y, points // 2)
+    return {"t": np.round(x[keep], 3).tolist(), "v": np.round(y[keep], 2).tolist()}
+
+def chart_series(columns: Dict, width: int, fields: Optional[Iterable[str]] = None,
+                 method: str = "lttb") -> Dict:
+    """Downsample a run's telemetry columns for a chart `width` pixels wide.
+
+    Timestamps are returned relative to the first sample, so every GPU of a result
+    shares a time axis starting at 0. Work and payload are bounded by the width,
+    not by the run length.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    points = max(MIN_CHART_POINTS, min(int(width), MAX_CHART_POINTS))
+    timestamps = np.frombuffer(columns["timestamp"], dtype=np.float64) \
+        if not isinstance(columns["timestamp"], np.ndarray) else columns["timestamp"]
+    start = float(timestamps[0]) if timestamps.size else 0.0
+    x = timestamps - start
+
+    series = {}
+    for field in fields or CHART_FIELDS:
+        if field not in columns:
+            continue
+        values = columns[field]
+        y = np.frombuffer(values, dtype=np.float64) if not isinstance(values, np.ndarray) else values
+        series[field] = downsample(x, y, points, "minmax" if field in MINMAX_FIELDS else method)
+    return {"start": start, "sample_count": int(timestamps.size), "points": points, "series": series}
+
+if __name__ == "__main__":
+    import time
+
+    n = 1_000_000
+    t = np.arange(n) * 0.1
+    temps = 60 + 10 * np.sin(t / 600) + np.random.default_rng(0).normal(0, 0.5, n)
+    temps[n // 3] = 95.0  # a single spike the chart must still show
+    throttling = np.zeros(n)
+    throttling[n // 2:n // 2 + 3] = 1.0
+
+    started = time.perf_counter()
+    result = chart_series({"timestamp": t, "temp_c": temps, "throttling": throttling}, 1200,
+                          fields=("temp_c", "throttling"))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{n} samples -> {len(result['series']['temp_c']['v'])} points in {elapsed_ms:.1f}ms")
+    print(f"Spike kept: {max(result['series']['temp_c']['v']) == 95.0}")
+    print(f"Throttle event kept: {max(result['series']['throttling']['v']) == 1.0}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+GPU Detector Command Line
+Hardware inventory, live telemetry and stress benchmarks as JSON, NDJSON or CSV, without the web stack.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+# Detection, telemetry and the stress runner are imported by the command that needs
+# them: an inventory run from cron should not pay for numpy or the result store
+
+OUTPUT_FORMATS = ("json", "ndjson", "csv")
+COMMANDS = ("inventory", "telemetry", "benchmark")
+
+INVENTORY_COLUMNS = ("hostname", "timestamp", "index", "name", "type", "memory_gb", "driver_version",
+                     "uuid", "serial", "pci_bus_id", "backend")
+TELEMETRY_COLUMNS = ("gpu", "timestamp", "temp_c", "power_w", "gpu_util_pct", "mem_util_pct",
+                     "mem_bandwidth_pct", "throttling", "throttle_reasons")
+BENCHMARK_COLUMNS = ("gpu", "name", "score", "status", "baseline_temp", "max_temp", "max_power",
+                     "avg_utilization", "matmul_tflops", "memory_bandwidth_gbps", "duration")
+
+def write_records(records: Iterable[Dict], output_format: str, columns: Iterable[str], out=None):
+    """Write records as they arrive: one JSON array, one JSON object per line, or CSV with a header.
+
+    NDJSON and CSV are flushed per record so a pipe sees each one immediately;
+    list and dict values are JSON-encoded inside a CSV cell.
+    """
+    out = out or sys.stdout
+    if output_format == "json":
+        json.dump(list(records), out, indent=2)
+        out.write("\n")
+        return
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(columns), extrasaction="ignore")
+        writer.writeheader()
+    for record in records:
+        if writer is None:
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        else:
+            writer.writerow({key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                             for key, value in record.items()})
+        out.flush()
+
+def inventory(args: argparse.Namespace) -> int:
+    from gpu_detection import SECTIONS, detect
+
+    sections = list(SECTIONS) if args.sections == "all" else [name.strip() for name in args.sections.split(",")]
+    unknown = [name for name in sections if name not in SECTIONS]
+    if unknown:
+        print(f"Error: sections must be 'all' or a subset of {','.join(SECTIONS)}", file=sys.stderr)
+        return 2
+    result = detect(sections)
+    host = {"hostname": platform.node(), "timestamp": datetime.now(timezone.utc).isoformat()}
+
+    if args.format == "csv":
+        # One row per GPU; system, CPU and memory sections do not fit the table. A host
+        # without GPUs still gets a row, so appended inventories record that it was checked.
+        gpu = result["gpu"] or {}
+        rows = [dict(host, index=index, backend=gpu.get("backend"), **entry)
+                for index, entry in enumerate(gpu.get("gpus", []))] or [dict(host, backend=gpu.get("backend"))]
+        write_records(rows, "csv", INVENTORY_COLUMNS)
+    elif args.format == "ndjson":
+        # One line per host run, so a cron job can append to a shared file
+        write_records([dict(host, **result)], "ndjson", ())
+    else:
+        json.dump(dict(host, **result), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    for error in result["errors"]:
+        print(f"Warning: {error}", file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+def telemetry_records(sensors: Dict[str, object], interval: float, count: int):
+    """Read every sensor once per tick, on fixed deadlines, `count` ticks (0 = until interrupted)."""
+    next_at = time.monotonic()
+    tick = 0
+    while not count or tick < count:
+        for gpu_key, sensor in sensors.items():
+            reading = sensor.read()
+            yield {
+                "gpu": gpu_key,
+                "timestamp": time.time(),
+                "temp_c": reading["temp_c"],
+                "power_w": reading["power_w"],
+                "gpu_util_pct": reading.get("gpu_util_pct"),
+                "mem_util_pct": reading.get("mem_util_pct"),
+                "mem_bandwidth_pct": reading.get("mem_bandwidth_pct"),
+                "throttling": reading["throttling"] == 1.0,
+                "throttle_reasons": reading["reasons"],
+            }
+        tick += 1
+        next_at += interval
+        delay = next_at - time.monotonic()
+        if delay < 0:
+            next_at = time.monotonic()
+        elif not count or tick < count:
+            time.sleep(delay)
+
+def telemetry(args: argparse.Namespace) -> int:
+    import stress_runner
+
+    if args.interval <= 0 or args.count < 0:
+        print("Error: interval must be positive and count non-negative", file=sys.stderr)
+        return 2
+    if args.format == "json" and not args.count:
+        print("Error: json output needs --count; use ndjson or csv to stream", file=sys.stderr)
+        return 2
+    nvml = stress_runner.PYNVML_AVAILABLE
+    if nvml:
+        try:
+            stress_runner.pynvml.nvmlInit()
+        except stress_runner.pynvml.NVMLError as e:
+            reason = f"NVML unavailable: {e}"
+            nvml = False
+    else:
+        reason = "NVML unavailable: pynvml is not installed"
+    if not nvml and not args.simulate:
+        print(f"Error: {reason} (--simulate samples modelled CPU telemetry instead)", file=sys.stderr)
+        return 2
+
+    try:
+        if nvml:
+            count = stress_runner.pynvml.nvmlDeviceGetCount()
+            indices = [int(index) for index in args.gpus.split(",")] if args.gpus else list(range(count))
+            if any(index < 0 or index >= count for index in indices):
+                print(f"Error: gpus must be indices below {count}", file=sys.stderr)
+                return 2
+            sensors = {f"gpu_{index}": stress_runner.NvmlSensor(index) for index in indices}
+        else:
+            sensors = {"gpu_0": stress_runner.SimulatedSensor()}
+        write_records(telemetry_records(sensors, args.interval, args.count), args.format, TELEMETRY_COLUMNS)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if nvml:
+            stress_runner.pynvml.nvmlShutdown()
+    return 0
+
+def benchmark_record(gpu_key: str, run: Dict) -> Dict:
+    """Flatten one GPU's result entry to the benchmark table row."""
+    metrics = run["metrics"]
+    tests = run.get("stress_test_results", {})
+    return {
+        "gpu": gpu_key,
+        "name": run["gpu_info"].get("name"),
+        "score": run["health_score"]["score"],
+        "status": run["health_score"]["status"],
+        "baseline_temp": metrics.get("baseline_temp"),
+        "max_temp": metrics.get("max_temp"),
+        "max_power": metrics.get("max_power"),
+        "avg_utilization": metrics.get("avg_utilization"),
+        "matmul_tflops": tests.get("matrix_multiply", {}).get("tflops"),
+        "memory_bandwidth_gbps": tests.get("memory_bandwidth", {}).get("bandwidth_gbps"),
+        "duration": run["metadata"]["duration"],
+    }
+
+def benchmark(args: argparse.Namespace) -> int:
+    from stress_runner import run_stress_test, write_result
+
+    try:
+        doc = run_stress_test(
+            duration=args.duration, baseline=args.baseline, interval=args.interval,
+            kernels=[name.strip() for name in args.kernels.split(",") if name.strip()],
+            backend=args.backend,
+            gpus=[int(index) for index in args.gpus.split(",")] if args.gpus else None,
+            enhanced=args.enhanced,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if args.output:
+        write_result(doc, args.output)
+    if args.format == "json":
+        json.dump(doc, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        write_records([benchmark_record(gpu_key, run) for gpu_key, run in doc["results"].items()],
+                      args.format, BENCHMARK_COLUMNS)
+    return 0
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=OUTPUT_FORMATS, default="json", help="output format (default json)")
+
+    parser = argparse.ArgumentParser(prog="gpu-detector", description="Detect, monitor and benchmark GPUs")
+    commands = parser.add_subparsers(dest="command", metavar="{inventory,telemetry,benchmark}")
+
+    inv = commands.add_parser("inventory", parents=[common], help="system, GPU, CPU and memory inventory (default)")
+    inv.add_argument("--sections", default="all",
+                     help="comma-separated subset of system,gpu,cpu,memory (default all; gpu alone is fastest)")
+
+    tel = commands.add_parser("telemetry", parents=[common], help="sample GPU telemetry at a fixed interval")
+    tel.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    tel.add_argument("--count", type=int, default=0, help="number of samples per GPU (default: until interrupted)")
+    tel.add_argument("--gpus", help="comma-separated GPU indices (default: all)")
+    tel.add_argument("--simulate", action="store_true", help="modelled CPU telemetry when NVML is unavailable")
+
+    bench = commands.add_parser("benchmark", parents=[common], help="run a stress test")
+    bench.add_argument("--duration", type=float, default=60.0, help="load phase length in seconds")
+    bench.add_argument("--baseline", type=float, default=5.0, help="idle sampling before the load, seconds")
+    bench.add_argument("--interval", type=float, default=0.5, help="telemetry sample interval, seconds")
+    bench.add_argument("--kernels", default="compute,memory", help="comma-separated subset of compute,memory")
+    bench.add_argument("--backend", choices=("auto", "torch", "cupy", "numpy"), default="auto")
+    bench.add_argument("--gpus", help="comma-separated GPU indices (default: all)")
+    bench.add_argument("--enhanced", action="store_true", help="add mixed-precision and VRAM stress tests")
+    bench.add_argument("--output", help="also save the full result (.json or .gput)")
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # No command runs the inventory, so a bare `gpu-detector --format csv` works
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv.insert(0, "inventory")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    try:
+        return {"inventory": inventory, "telemetry": telemetry, "benchmark": benchmark}[args.command](args)
+    except BrokenPipeError:
+        # Output piped into head or similar: stop quietly, and keep the interpreter's
+        # final flush of stdout from raising again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Load Test Harness for GPU Detector APIs
+Drives the AI and detection endpoints at a target request rate and reports latency percentiles.
+
+Example (AI backend wired to mock_model_server.py, sharing its API_KEY_SECRET):
+    API_KEY_SECRET=... python load_test.py --base-url http://localhost:5000 --endpoint analyze-gpu --rps 50 --duration 30
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from api_auth import issue_api_key
+
+ENDPOINTS = {
+    "analyze-gpu": ("POST", "/api/analyze-gpu"),
+    "recommend-upgrade": ("POST", "/api/recommend-upgrade"),
+    "detect": ("GET", "/api/detect"),
+}
+# Endpoints metered against the caller's plan quota; only these carry an API key
+QUOTA_ENDPOINTS = ("analyze-gpu", "recommend-upgrade")
+
+SAMPLE_GPUS = ["RTX 4090", "RTX 4080", "RTX 3080", "RX 7900 XTX", "Arc A770", "RTX 5000 Ada"]
+SAMPLE_USE_CASES = ["4K Gaming", "Video Editing", "3D Rendering", "Machine Learning"]
+
+def build_payload(endpoint: str, request_index: int) -> Dict:
+    """Build a realistic request body for an endpoint."""
+    rng = random.Random(request_index)
+    if endpoint == "analyze-gpu":
+        return {
+            "gpu_model": rng.choice(SAMPLE_GPUS),
+            "temperature": rng.randint(35, 90),
+            "power_consumption": rng.randint(50, 450),
+            "utilization": rng.randint(10, 100),
+        }
+    if endpoint == "recommend-upgrade":
+        return {
+            "current_gpu": rng.choice(SAMPLE_GPUS),
+            "use_case": rng.choice(SAMPLE_USE_CASES),
+            "budget": rng.choice([500, 1000, 1500, 2500]),
+        }
+    return None
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class LoadGenerator:
+    def __init__(self, base_url: str, endpoints: List[str], rps: float, duration: float,
+                 concurrency: int = 64, timeout: float = 30.0, users: int = 0):
+        """Open-loop load generator for one or more endpoints."""
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints
+        self.rps = rps
+        self.duration = duration
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.users = users
+        # Quotas are keyed by the caller's API key, so each simulated user gets its own;
+        # issuing fails fast here if API_KEY_SECRET is not set
+        self._api_keys = {}
+        if any(endpoint in QUOTA_ENDPOINTS for endpoint in endpoints):
+            self._api_key(0)
+        self._lock = threading.Lock()
+        self.results: List[Tuple[str, int, float]] = []
+
+    def _api_key(self, request_index: int) -> str:
+        """Bearer key of the simulated user sending a request (one user per request when users is 0)."""
+        user = request_index % self.users if self.users else request_index
+        key = self._api_keys.get(user)
+        if key is None:
+            key = self._api_keys.setdefault(user, issue_api_key(f"loadtest-{user}@example.com"))
+        return key
+
+    def _send(self, endpoint: str, request_index: int, scheduled_at: float):
+        method, path = ENDPOINTS[endpoint]
+        payload = build_payload(endpoint, request_index)
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if endpoint in QUOTA_ENDPOINTS:
+            headers["Authorization"] = f"Bearer {self._api_key(request_index)}"
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except Exception:
+            status = 0  # connection error / timeout
+
+        # Measure from the scheduled send time so a backed-up server isn't hidden
+        # by the generator waiting on it (coordinated omission).
+        latency = time.perf_counter() - scheduled_at
+        with self._lock:
+            self.results.append((endpoint, status, latency))
+
+    def run(self) -> Dict:
+        """Issue requests at a fixed rate for the configured duration and summarize them."""
+        interval = 1.0 / self.rps
+        total_requests = int(self.rps * self.duration)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for i in range(total_requests):
+                scheduled_at = start + i * interval
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                endpoint = self.endpoints[i % len(self.endpoints)]
+                executor.submit(self._send, endpoint, i, scheduled_at)
+
+        elapsed = time.perf_counter() - start
+        return self.summarize(elapsed)
+
+    def summarize(self, elapsed: float) -> Dict:
+        """Latency percentiles and error rates per endpoint and overall.
+
+        429s are counted apart from errors: a quota rejection returns in microseconds,
+        so any of them make the latency percentiles meaningless.
+        """
+        report = {"target_rps": self.rps, "elapsed_seconds": round(elapsed, 2), "endpoints": {}}
+        groups = {endpoint: [r for r in self.results if r[0] == endpoint] for endpoint in self.endpoints}
+        groups["all"] = self.results
+
+        for name, rows in groups.items():
+            latencies = sorted(r[2] * 1000 for r in rows)
+            statuses = Counter(r[1] for r in rows)
+            errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+            stats = {
+                "requests": len(rows),
+                "achieved_rps": round(len(rows) / elapsed, 2) if elapsed else 0,
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2) if latencies else 0,
+                "error_rate": round(errors / len(rows), 4) if rows else 0,
+                "rate_limited": statuses.get(429, 0),
+                "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+            }
+            if name == "all":
+                report["overall"] = stats
+            else:
+                report["endpoints"][name] = stats
+        return report
+
+def print_report(report: Dict):
+    print(f"\n📈 Load test: target {report['target_rps']} rps over {report['elapsed_seconds']}s")
+    print(f"{'endpoint':<20}{'reqs':>8}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}{'429s':>7}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, stats in rows:
+        print(f"{name:<20}{stats['requests']:>8}{stats['achieved_rps']:>9}"
+              f"{stats['p50_ms']:>8}ms{stats['p95_ms']:>8}ms{stats['p99_ms']:>8}ms"
+              f"{stats['error_rate']:>9.2%}{stats['rate_limited']:>7}")
+    print(f"Status codes: {report['overall']['status_codes']}")
+    if report["overall"]["rate_limited"]:
+        print("⚠️  Requests were rate limited: raise --users or the plan quotas; latencies are not valid")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the GPU Detector AI and detection endpoints")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS),
+                        help="Endpoint to drive (repeatable); defaults to the AI endpoints")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test length in seconds")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum in-flight requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--users", type=int, default=0,
+                        help="Number of simulated users, each with its own API key (0 = one per request)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        generator = LoadGenerator(
+            base_url=args.base_url,
+            endpoints=args.endpoint or ["analyze-gpu", "recommend-upgrade"],
+            rps=args.rps,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            users=args.users,
+        )
+    except RuntimeError as e:
+        print(f"Error: {e} (use the AI backend's secret so its quotas see distinct users)", file=sys.stderr)
+        sys.exit(2)
+    report = generator.run()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    # A rate-limited run measured the quota check, not the endpoints
+    sys.exit(1 if report["overall"]["rate_limited"] else 0)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Mock AI Model Server
+Fake Anthropic/OpenAI-compatible HTTP API for benchmarking the AI backends offline.
+
+Point the backends at it with:
+    export ANTHROPIC_BASE_URL=http://localhost:8400
+    export OPENAI_BASE_URL=http://localhost:8400/v1
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FILLER_WORDS = (
+    "GPU thermal performance utilization memory bandwidth driver cooling power "
+    "efficiency throughput latency clock boost workload benchmark stable optimal"
+).split()
+
+ERROR_BODIES = {
+    429: ("rate_limit_error", "Number of requests has exceeded your rate limit"),
+    500: ("api_error", "Internal server error"),
+    503: ("api_error", "Service temporarily unavailable"),
+    529: ("overloaded_error", "Overloaded"),
+}
+
+class MockModelConfig:
+    def __init__(self, latency_dist: str = "lognormal", latency_ms: float = 400.0,
+                 latency_jitter_ms: float = 150.0, tokens_per_second: float = 0.0,
+                 output_tokens: int = 200, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = (429, 500, 529), seed: int = None):
+        """Latency, token generation and error injection settings."""
+        self.latency_dist = latency_dist
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-token in seconds from the configured distribution."""
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        with self._lock:
+            if self.latency_dist == "fixed":
+                value = mean
+            elif self.latency_dist == "uniform":
+                value = self._random.uniform(mean - jitter, mean + jitter)
+            elif self.latency_dist == "normal":
+                value = self._random.gauss(mean, jitter)
+            elif self.latency_dist == "exponential":
+                value = self._random.expovariate(1.0 / mean) if mean > 0 else 0
+            else:  # lognormal: long right tail, like real model APIs
+                if mean > 0:
+                    sigma2 = math.log(1 + (jitter / mean) ** 2)
+                    value = self._random.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+                else:
+                    value = 0.0
+        return max(value, 0.0) / 1000.0
+
+    def sample_output_tokens(self, max_tokens: int) -> int:
+        """Pick how many tokens the fake completion contains."""
+        with self._lock:
+            tokens = int(self._random.gauss(self.output_tokens, self.output_tokens * 0.2))
+        return max(1, min(tokens, max_tokens or tokens))
+
+    def sample_error(self) -> int:
+        """Return an HTTP status to inject, or 0 for a normal response."""
+        with self._lock:
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses)
+        return 0
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+def build_completion_text(prompt: str, output_tokens: int) -> str:
+    """Generate filler text, or a valid categorization JSON when the prompt asks for one."""
+    if '"category"' in prompt and '"priority"' in prompt:
+        return json.dumps({"category": "General", "priority": "Medium", "reasoning": "Mock categorization"})
+    rng = random.Random(len(prompt))
+    return " ".join(rng.choice(FILLER_WORDS) for _ in range(output_tokens))
+
+class MockModelHandler(BaseHTTPRequestHandler):
+    server_version = "MockModelServer/1.0"
+    config: MockModelConfig = None
+
+    def log_message(self, format, *args):
+        """Keep request logging quiet under load."""
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int):
+        error_type, message = ERROR_BODIES.get(status, ("api_error", "Injected error"))
+        if self.path.endswith("/chat/completions"):
+            payload = {"error": {"message": message, "type": error_type, "code": status}}
+        else:
+            payload = {"type": "error", "error": {"type": error_type, "message": message}}
+        self._send_json(status, payload)
+
+    def do_GET(self):
+        if self.path in ("/", "/health"):
+            self._send_json(200, {"status": "healthy"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request_body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        if self.path.endswith("/v1/complete"):
+            prompt = request_body.get("prompt", "")
+            max_tokens = request_body.get("max_tokens_to_sample", 0)
+        elif self.path.endswith("/v1/messages") or self.path.endswith("/chat/completions"):
+            prompt = "\n".join(str(m.get("content", "")) for m in request_body.get("messages", []))
+            max_tokens = request_body.get("max_tokens", 0)
+        else:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        config = self.config
+        delay = config.sample_latency()
+        error_status = config.sample_error()
+        output_tokens = config.sample_output_tokens(max_tokens)
+        if not error_status and config.tokens_per_second > 0:
+            delay += output_tokens / config.tokens_per_second
+        time.sleep(delay)
+
+        if error_status:
+            self._send_error(error_status)
+            return
+
+        model = request_body.get("model", "mock-model")
+        text = build_completion_text(prompt, output_tokens)
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text) if text.startswith("{") else output_tokens
+
+        if self.path.endswith("/v1/complete"):
+            payload = {
+                "completion": " " + text,
+                "stop_reason": "stop_sequence",
+                "model": model,
+            }
+        elif self.path.endswith("/v1/messages"):
+            payload = {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+            }
+        else:
+            payload = {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                },
+            }
+        self._send_json(200, payload)
+
+def create_server(host: str, port: int, config: MockModelConfig) -> ThreadingHTTPServer:
+    """Build a threaded mock server bound to host:port."""
+    handler = type("ConfiguredMockModelHandler", (MockModelHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake Anthropic/OpenAI API server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--latency-dist", default="lognormal",
+                        choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Mean time to first token")
+    parser.add_argument("--latency-jitter-ms", type=float, default=150.0, help="Spread of the latency distribution")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Output generation rate; 0 returns the whole completion instantly")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Mean completion length in tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-statuses", default="429,500,529", help="Comma-separated statuses to inject")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = MockModelConfig(
+        latency_dist=args.latency_dist,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s),
+        seed=args.seed,
+    )
+    server = create_server(args.host, args.port, config)
+
+    print(f"🧪 Mock model server listening on http://{args.host}:{args.port}")
+    print(f"   Latency: {args.latency_dist} {args.latency_ms}ms ± {args.latency_jitter_ms}ms, "
+          f"error rate: {args.error_rate:.1%}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
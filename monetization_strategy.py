@@ -5,67 +5,282 @@ Implements the key ideas from the Medium article to generate revenue from AI aut
 """
 
 import json
-import sqlite3
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from ai_cost_ledger import (FEATURE_ADVANCED_ANALYSIS, FEATURE_AI_RECOMMENDATIONS, FEATURE_CONTENT_GENERATION,
+                            FEATURE_SUPPORT_TICKETS, FEATURES, get_ledger)
+from storage import get_storage
+from usage_buffer import UsageEventBuffer, create_usage_tables
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SUBSCRIPTION_PERIOD_DAYS = 30
+EXPIRY_CHECK_INTERVAL_SECONDS = 60
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def _track_subscription_changes(cursor):
+    """Stamp every subscription write with a commit-ordered change_seq.
+    
+    SQLite has a single writer, so MAX(change_seq) + 1 taken inside the write
+    transaction grows in commit order; caches sync with change_seq > last_seen
+    without missing rows, whichever code path wrote them.
+    """
+    cursor.execute('ALTER TABLE subscriptions ADD COLUMN updated_at TIMESTAMP')
+    cursor.execute('ALTER TABLE subscriptions ADD COLUMN change_seq INTEGER')
+    cursor.execute('UPDATE subscriptions SET change_seq = id, updated_at = CURRENT_TIMESTAMP')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_subscriptions_change_seq ON subscriptions (change_seq)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_subscriptions_insert_seq AFTER INSERT ON subscriptions
+        BEGIN
+            UPDATE subscriptions SET updated_at = CURRENT_TIMESTAMP,
+                change_seq = (SELECT IFNULL(MAX(change_seq), 0) + 1 FROM subscriptions)
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_subscriptions_update_seq
+        AFTER UPDATE OF user_email, plan_type, start_date, end_date, status, revenue ON subscriptions
+        BEGIN
+            UPDATE subscriptions SET updated_at = CURRENT_TIMESTAMP,
+                change_seq = (SELECT IFNULL(MAX(change_seq), 0) + 1 FROM subscriptions)
+            WHERE id = NEW.id;
+        END
+    ''')
+
+def _create_subscription_payments(cursor):
+    """One row per charge, so windowed revenue counts each payment when it was made.
+    
+    subscriptions.revenue is a lifetime total on a row whose start_date moves on
+    resubscription; charges from before this table existed are carried over as one
+    'legacy' payment at the subscription's start date, the best time still known.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscription_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            plan_type TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            periods INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            paid_at TIMESTAMP NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO subscription_payments (user_email, plan_type, kind, periods, amount, paid_at)
+        SELECT user_email, plan_type, 'legacy', 0, revenue, IFNULL(start_date, created_at)
+        FROM subscriptions WHERE revenue > 0
+    ''')
+    # generate_revenue_report: payments in a window, grouped by plan, from the index alone
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_subscription_payments_paid
+        ON subscription_payments (paid_at, plan_type, user_email, amount)
+    ''')
+
+# Append-only; see SQLiteStorage.migrate
+SCHEMA_MIGRATIONS = [
+    # generate_revenue_report: active subscriptions by start date, grouped by plan
+    '''CREATE INDEX IF NOT EXISTS idx_subscriptions_status_start
+       ON subscriptions (status, start_date, plan_type, revenue)''',
+    # implement_ai_upselling: one user's features by usage, without touching the table
+    '''CREATE INDEX IF NOT EXISTS idx_feature_usage_user_count
+       ON feature_usage (user_email, usage_count DESC, feature_name, revenue_generated)''',
+    # evaluate_upsell_candidates: one row per user with a bit per matching UPSELL_RULES entry
+    ['''CREATE TABLE IF NOT EXISTS upsell_candidates (
+           user_email TEXT PRIMARY KEY,
+           plan_type TEXT NOT NULL,
+           rule_mask INTEGER NOT NULL
+       ) WITHOUT ROWID''',
+     '''CREATE TABLE IF NOT EXISTS upsell_runs (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           started_at TIMESTAMP NOT NULL,
+           finished_at TIMESTAMP NOT NULL,
+           users_evaluated INTEGER NOT NULL,
+           candidates INTEGER NOT NULL
+       )'''],
+    # Subscription lifecycle: change tracking for the plan cache, and the expiry scan
+    _track_subscription_changes,
+    'CREATE INDEX IF NOT EXISTS idx_subscriptions_status_end ON subscriptions (status, end_date)',
+    _create_subscription_payments,
+]
+
+# Upselling rules: users on current_plan who used a feature whose name contains
+# feature are offered upgrade_to. A rule's position is its bit in upsell_candidates.rule_mask,
+# so only ever append to this list.
+UPSELL_RULES = [
+    {
+        "current_plan": "free",
+        "feature": FEATURE_ADVANCED_ANALYSIS,
+        "upgrade_to": "pro",
+        "reason": "You're using advanced analysis features frequently",
+        "benefit": "Unlimited advanced analysis and priority support",
+        "price": 19.99
+    },
+    {
+        "current_plan": "pro",
+        "feature": FEATURE_CONTENT_GENERATION,
+        "upgrade_to": "enterprise",
+        "reason": "You're generating content regularly",
+        "benefit": "Unlimited content generation and API access",
+        "price": 99.99
+    },
+]
+
+# Queries on the request path; check_query_plans.py asserts none of them scans a table.
+# Methods run these exact texts with bound parameters, so sqlite3's per-connection
+# statement cache prepares each one once.
+HOT_QUERIES = {
+    "revenue_subscriptions": ('''
+        SELECT plan_type, COUNT(DISTINCT user_email), SUM(amount)
+        FROM subscription_payments
+        WHERE paid_at >= date('now', ?)
+        GROUP BY plan_type
+    ''', ('-30 days',)),
+    "revenue_features": ('''
+        SELECT feature_name, SUM(revenue), COUNT(DISTINCT user_email)
+        FROM usage_rollup_daily
+        WHERE day >= date('now', ?)
+        GROUP BY feature_name
+    ''', ('-30 days',)),
+    "feature_roi": ('''
+        SELECT SUM(event_count), SUM(revenue), COUNT(DISTINCT user_email)
+        FROM usage_rollup_daily
+        WHERE day >= date('now', ?) AND feature_name = ?
+    ''', ('-30 days', FEATURE_ADVANCED_ANALYSIS)),
+    "usage_timeseries": ('''
+        SELECT hour, feature_name, event_count, revenue
+        FROM usage_rollup_hourly
+        WHERE hour >= strftime('%Y-%m-%d %H:00', 'now', ?) AND (? IS NULL OR feature_name = ?)
+        ORDER BY hour
+    ''', ('-24 hours', None, None)),
+    "upsell_usage": ('''
+        SELECT feature_name, usage_count, revenue_generated
+        FROM feature_usage
+        WHERE user_email = ?
+        ORDER BY usage_count DESC
+    ''', ('user@example.com',)),
+    "upsell_candidates": ('''
+        SELECT rule_mask FROM upsell_candidates WHERE user_email = ?
+    ''', ('user@example.com',)),
+    "expire_subscriptions": ('''
+        UPDATE subscriptions SET status = 'expired'
+        WHERE status = 'active' AND end_date <= ?
+    ''', ('2026-01-01 00:00:00',)),
+    "next_expiry": ('''
+        SELECT MIN(end_date) FROM subscriptions WHERE status = 'active'
+    ''', ()),
+    "subscription_changes": ('''
+        SELECT user_email, plan_type, status, strftime('%s', end_date), change_seq FROM subscriptions
+        WHERE change_seq > ? ORDER BY change_seq
+    ''', (0,)),
+}
+
 class GPUMonetizationEngine:
     def __init__(self):
         """Initialize the monetization engine."""
         self.db_path = "gpu_monetization.db"
+        self.storage = get_storage(self.db_path)
         self.init_database()
+        self.usage_buffer = UsageEventBuffer(self.storage)
+        self._expiry_stop = threading.Event()
+        self._expiry_thread = None
         
     def init_database(self):
         """Initialize database for tracking revenue and user engagement."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # User subscriptions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subscriptions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_email TEXT UNIQUE,
-                plan_type TEXT,
-                start_date TIMESTAMP,
-                end_date TIMESTAMP,
-                status TEXT DEFAULT 'active',
-                revenue REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # AI feature usage tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS feature_usage (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_email TEXT,
-                feature_name TEXT,
-                usage_count INTEGER DEFAULT 1,
-                last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                revenue_generated REAL DEFAULT 0
-            )
-        ''')
-        
-        # Premium content access
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS premium_content (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content_type TEXT,
-                title TEXT,
-                content TEXT,
-                price REAL,
-                access_level TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # User subscriptions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_email TEXT UNIQUE,
+                    plan_type TEXT,
+                    start_date TIMESTAMP,
+                    end_date TIMESTAMP,
+                    status TEXT DEFAULT 'active',
+                    revenue REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        
+            # AI feature usage tracking
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feature_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_email TEXT,
+                    feature_name TEXT,
+                    usage_count INTEGER DEFAULT 1,
+                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    revenue_generated REAL DEFAULT 0
+                )
+            ''')
+        
+            # Premium content access
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS premium_content (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    content_type TEXT,
+                    title TEXT,
+                    content TEXT,
+                    price REAL,
+                    access_level TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # One row per (user, feature) so buffered usage can be flushed with UPSERTs.
+            # Older databases may hold duplicates from racing writers; fold them first.
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_feature_usage_user_feature'")
+            if not cursor.fetchone():
+                cursor.execute('''
+                    UPDATE feature_usage SET
+                        usage_count = (SELECT SUM(f.usage_count) FROM feature_usage f
+                                       WHERE f.user_email = feature_usage.user_email
+                                         AND f.feature_name = feature_usage.feature_name),
+                        revenue_generated = (SELECT SUM(f.revenue_generated) FROM feature_usage f
+                                             WHERE f.user_email = feature_usage.user_email
+                                               AND f.feature_name = feature_usage.feature_name),
+                        last_used = (SELECT MAX(f.last_used) FROM feature_usage f
+                                     WHERE f.user_email = feature_usage.user_email
+                                       AND f.feature_name = feature_usage.feature_name)
+                    WHERE id IN (SELECT MIN(id) FROM feature_usage
+                                 GROUP BY user_email, feature_name HAVING COUNT(*) > 1)
+                ''')
+                cursor.execute('''
+                    DELETE FROM feature_usage WHERE id NOT IN
+                        (SELECT MIN(id) FROM feature_usage GROUP BY user_email, feature_name)
+                ''')
+                cursor.execute('''
+                    CREATE UNIQUE INDEX idx_feature_usage_user_feature
+                    ON feature_usage (user_email, feature_name)
+                ''')
+            
+            # Time-bucketed rollups fed by the append-only event log (usage_events_YYYYMMDD).
+            # Databases that predate them only have running totals; seed those at their
+            # last_used day so existing revenue still shows up in reports.
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_rollup_daily'")
+            seed_rollups = cursor.fetchone() is None
+            create_usage_tables(cursor)
+            if seed_rollups:
+                cursor.execute('''
+                    INSERT INTO usage_rollup_daily (day, feature_name, user_email, event_count, revenue)
+                    SELECT date(last_used), feature_name, user_email, usage_count, revenue_generated
+                    FROM feature_usage WHERE last_used IS NOT NULL
+                ''')
+                cursor.execute('''
+                    INSERT INTO usage_rollup_hourly (hour, feature_name, event_count, revenue)
+                    SELECT strftime('%Y-%m-%d %H:00', last_used), feature_name, SUM(usage_count), SUM(revenue_generated)
+                    FROM feature_usage WHERE last_used IS NOT NULL
+                    GROUP BY 1, 2
+                ''')
+        
+        self.storage.migrate("monetization", SCHEMA_MIGRATIONS)
+        
         logger.info("Monetization database initialized")
     
     def create_subscription_plans(self) -> Dict:
@@ -82,9 +297,10 @@ class GPUMonetizationEngine:
                     "Limited AI recommendations (5/month)"
                 ],
                 "ai_limits": {
-                    "support_tickets": 2,
-                    "content_generation": 0,
-                    "advanced_analysis": 0,
+                    FEATURE_AI_RECOMMENDATIONS: 5,
+                    FEATURE_SUPPORT_TICKETS: 2,
+                    FEATURE_CONTENT_GENERATION: 0,
+                    FEATURE_ADVANCED_ANALYSIS: 0,
                     "priority_support": False
                 }
             },
@@ -100,9 +316,10 @@ class GPUMonetizationEngine:
                     "Email support"
                 ],
                 "ai_limits": {
-                    "support_tickets": 10,
-                    "content_generation": 5,
-                    "advanced_analysis": 20,
+                    FEATURE_AI_RECOMMENDATIONS: -1,
+                    FEATURE_SUPPORT_TICKETS: 10,
+                    FEATURE_CONTENT_GENERATION: 5,
+                    FEATURE_ADVANCED_ANALYSIS: 20,
                     "priority_support": True
                 }
             },
@@ -119,9 +336,10 @@ class GPUMonetizationEngine:
                     "Custom integrations"
                 ],
                 "ai_limits": {
-                    "support_tickets": -1,  # Unlimited
-                    "content_generation": -1,
-                    "advanced_analysis": -1,
+                    FEATURE_AI_RECOMMENDATIONS: -1,
+                    FEATURE_SUPPORT_TICKETS: -1,  # Unlimited
+                    FEATURE_CONTENT_GENERATION: -1,
+                    FEATURE_ADVANCED_ANALYSIS: -1,
                     "priority_support": True
                 }
             }
@@ -129,72 +347,154 @@ class GPUMonetizationEngine:
         
         return plans
     
+    def get_subscription(self, user_email: str) -> Optional[Dict]:
+        """Current subscription row for a user, whatever its status."""
+        row = self.storage.fetchone('''
+            SELECT user_email, plan_type, start_date, end_date, status, revenue
+            FROM subscriptions WHERE user_email = ?
+        ''', (user_email,))
+        if not row:
+            return None
+        return dict(zip(["user_email", "plan_type", "start_date", "end_date", "status", "revenue"], row))
+    
+    def create_subscription(self, user_email: str, plan_type: str, periods: int = 1) -> Dict:
+        """Start (or restart) a subscription for a number of 30-day billing periods."""
+        plans = self.create_subscription_plans()
+        if plan_type not in plans:
+            raise ValueError(f"Unknown plan: {plan_type}")
+        
+        now = datetime.utcnow()
+        end = now + timedelta(days=SUBSCRIPTION_PERIOD_DAYS * periods)
+        amount = plans[plan_type]["price"] * periods
+        with self.storage.transaction() as conn:
+            conn.execute('''
+                INSERT INTO subscriptions (user_email, plan_type, start_date, end_date, status, revenue)
+                VALUES (?, ?, ?, ?, 'active', ?)
+                ON CONFLICT(user_email) DO UPDATE SET
+                    plan_type = excluded.plan_type, start_date = excluded.start_date,
+                    end_date = excluded.end_date, status = 'active',
+                    revenue = IFNULL(revenue, 0) + excluded.revenue
+            ''', (user_email, plan_type, now.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT), amount))
+            self._record_payment(conn, user_email, plan_type, "new", periods, amount, now)
+        
+        logger.info(f"Subscription created: {user_email} - {plan_type} until {end:%Y-%m-%d}")
+        return self.get_subscription(user_email)
+    
+    def renew_subscription(self, user_email: str, periods: int = 1) -> Optional[Dict]:
+        """Extend a subscription; lapsed ones restart from now. Returns None if there is none."""
+        row = self.storage.fetchone('SELECT plan_type FROM subscriptions WHERE user_email = ?', (user_email,))
+        if not row:
+            return None
+        
+        amount = self.create_subscription_plans().get(row[0], {}).get("price", 0) * periods
+        paid_at = datetime.utcnow()
+        now = paid_at.strftime(TIMESTAMP_FORMAT)
+        with self.storage.transaction() as conn:
+            conn.execute('''
+                UPDATE subscriptions SET
+                    end_date = datetime(MAX(IFNULL(end_date, ?), ?), ?),
+                    status = 'active',
+                    revenue = IFNULL(revenue, 0) + ?
+                WHERE user_email = ?
+            ''', (now, now, f'+{SUBSCRIPTION_PERIOD_DAYS * periods} days', amount, user_email))
+            self._record_payment(conn, user_email, row[0], "renewal", periods, amount, paid_at)
+        
+        logger.info(f"Subscription renewed: {user_email} (+{periods} periods)")
+        return self.get_subscription(user_email)
+    
+    def _record_payment(self, conn, user_email: str, plan_type: str, kind: str, periods: int,
+                        amount: float, paid_at: datetime):
+        """Log one charge inside the caller's subscription write transaction."""
+        if amount <= 0:
+            return
+        conn.execute('''
+            INSERT INTO subscription_payments (user_email, plan_type, kind, periods, amount, paid_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (user_email, plan_type, kind, periods, amount, paid_at.strftime(TIMESTAMP_FORMAT)))
+    
+    def cancel_subscription(self, user_email: str) -> bool:
+        """Cancel an active subscription immediately. Returns False if none was active."""
+        cursor = self.storage.execute('''
+            UPDATE subscriptions SET status = 'canceled', end_date = ?
+            WHERE user_email = ? AND status = 'active'
+        ''', (datetime.utcnow().strftime(TIMESTAMP_FORMAT), user_email))
+        
+        if cursor.rowcount:
+            logger.info(f"Subscription canceled: {user_email}")
+        return cursor.rowcount == 1
+    
+    def expire_subscriptions(self) -> int:
+        """Flip every active subscription past its end_date to 'expired' in one UPDATE."""
+        cursor = self.storage.execute(HOT_QUERIES["expire_subscriptions"][0],
+                                      (datetime.utcnow().strftime(TIMESTAMP_FORMAT),))
+        if cursor.rowcount:
+            logger.info(f"Expired {cursor.rowcount} subscriptions")
+        return cursor.rowcount
+    
+    def start_expiry_scheduler(self, max_interval: float = EXPIRY_CHECK_INTERVAL_SECONDS):
+        """Expire subscriptions on a daemon thread.
+        
+        The thread sleeps until the earliest active end_date (read from the
+        (status, end_date) index), but never longer than max_interval so renewals
+        and new subscriptions made elsewhere are noticed.
+        """
+        if self._expiry_thread and self._expiry_thread.is_alive():
+            return
+        
+        def expiry_loop():
+            delay = 0
+            while not self._expiry_stop.wait(delay):
+                delay = max_interval
+                try:
+                    self.expire_subscriptions()
+                    next_expiry = self.storage.fetchone(HOT_QUERIES["next_expiry"][0])[0]
+                    if next_expiry:
+                        seconds = (datetime.strptime(next_expiry[:19], TIMESTAMP_FORMAT) - datetime.utcnow()).total_seconds()
+                        delay = min(max_interval, max(seconds, 0) + 1)
+                except Exception as e:
+                    logger.error(f"Error expiring subscriptions: {e}")
+        
+        self._expiry_thread = threading.Thread(target=expiry_loop, name="subscription-expiry", daemon=True)
+        self._expiry_thread.start()
+    
+    def stop_expiry_scheduler(self):
+        self._expiry_stop.set()
+    
     def track_feature_usage(self, user_email: str, feature_name: str, revenue: float = 0) -> bool:
-        """Track AI feature usage for monetization analytics."""
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Check if user already used this feature
-        cursor.execute('''
-            SELECT usage_count FROM feature_usage 
-            WHERE user_email = ? AND feature_name = ?
-        ''', (user_email, feature_name))
+        """Track AI feature usage for monetization analytics (feature_name from ai_cost_ledger.FEATURES).
         
-        result = cursor.fetchone()
-        
-        if result:
-            # Update existing usage
-            cursor.execute('''
-                UPDATE feature_usage 
-                SET usage_count = usage_count + 1, 
-                    last_used = CURRENT_TIMESTAMP,
-                    revenue_generated = revenue_generated + ?
-                WHERE user_email = ? AND feature_name = ?
-            ''', (revenue, user_email, feature_name))
-        else:
-            # Create new usage record
-            cursor.execute('''
-                INSERT INTO feature_usage (user_email, feature_name, revenue_generated)
-                VALUES (?, ?, ?)
-            ''', (user_email, feature_name, revenue))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Tracked usage: {user_email} - {feature_name}")
+        Events are buffered in memory and written in batches; call flush_usage()
+        when the database must reflect every event (reports do this themselves).
+        """
+        self.usage_buffer.add(user_email, feature_name, revenue)
+        logger.debug(f"Tracked usage: {user_email} - {feature_name}")
         return True
     
+    def flush_usage(self) -> int:
+        """Write buffered usage events to the database."""
+        return self.usage_buffer.flush()
+    
     def generate_revenue_report(self, days: int = 30) -> Dict:
         """Generate revenue and usage analytics report."""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.flush_usage()
+        cursor = self.storage.connection().cursor()
         
-        # Get subscription revenue
-        cursor.execute('''
-            SELECT plan_type, COUNT(*), SUM(revenue) 
-            FROM subscriptions 
-            WHERE status = 'active' AND start_date >= date('now', '-{} days')
-            GROUP BY plan_type
-        '''.format(days))
+        # Statement texts are constants so every window reuses the same prepared statement
+        window = (f'-{int(days)} days',)
+        
+        # Get subscription revenue: charges made inside the window, new and renewals alike
+        cursor.execute(HOT_QUERIES["revenue_subscriptions"][0], window)
         
         subscription_data = cursor.fetchall()
         
-        # Get feature usage revenue
-        cursor.execute('''
-            SELECT feature_name, SUM(revenue_generated), COUNT(DISTINCT user_email)
-            FROM feature_usage 
-            WHERE last_used >= date('now', '-{} days')
-            GROUP BY feature_name
-        '''.format(days))
+        # Get feature usage revenue (range read over the daily rollup)
+        cursor.execute(HOT_QUERIES["revenue_features"][0], window)
         
         feature_data = cursor.fetchall()
         
         # Calculate total revenue
-        total_revenue = sum([row[2] for row in subscription_data]) + sum([row[1] for row in feature_data])
-        
-        conn.close()
+        total_revenue = sum([row[2] or 0 for row in subscription_data]) + sum([row[1] or 0 for row in feature_data])
         
         return {
             "period_days": days,
@@ -210,88 +510,138 @@ class GPUMonetizationEngine:
             "generated_at": datetime.now().isoformat()
         }
     
+    def get_usage_timeseries(self, hours: int = 24, feature_name: str = None) -> List[Dict]:
+        """Hourly event counts and revenue for the last N hours, from the hourly rollup."""
+        
+        self.flush_usage()
+        
+        rows = self.storage.fetchall(HOT_QUERIES["usage_timeseries"][0],
+                                     (f'-{int(hours)} hours', feature_name, feature_name))
+        return [
+            {"hour": row[0], "feature": row[1], "count": row[2], "revenue": row[3]}
+            for row in rows
+        ]
+    
+    def prune_usage_events(self, keep_days: int = 90) -> List[str]:
+        """Drop raw event partitions older than keep_days. Rollups are kept."""
+        
+        self.flush_usage()
+        cutoff = (datetime.utcnow() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+        dropped = self.usage_buffer.drop_partitions_before(cutoff)
+        
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} usage event partitions older than {keep_days} days")
+        return dropped
+    
     def create_premium_content(self, content_type: str, title: str, content: str, price: float) -> int:
         """Create premium content for monetization."""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        cursor = self.storage.execute('''
             INSERT INTO premium_content (content_type, title, content, price, access_level)
             VALUES (?, ?, ?, ?, 'premium')
         ''', (content_type, title, content, price))
         
         content_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
         
         logger.info(f"Created premium content: {title} - ${price}")
         return content_id
     
+    def _upsell_recommendation(self, rule: Dict) -> Dict:
+        return {key: rule[key] for key in ("upgrade_to", "reason", "benefit", "price")}
+    
+    def evaluate_upsell_candidates(self) -> Dict:
+        """Recompute upsell candidates for every user in one grouped pass (run nightly).
+        
+        The GROUP BY walks the (user_email, feature_name) index in order, computing
+        one match flag per rule; the plan check and bit packing happen in the same
+        statement, so no per-user Python runs. The table is replaced atomically:
+        readers see the previous run until this one commits.
+        """
+        self.flush_usage()
+        started_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        
+        flags = ",\n".join(
+            f"MAX(instr(feature_name, ?) > 0) AS rule_{bit}" for bit in range(len(UPSELL_RULES))
+        )
+        mask = " | ".join(
+            f"(CASE WHEN IFNULL(s.plan_type, 'free') = ? AND rule_{bit} THEN {1 << bit} ELSE 0 END)"
+            for bit in range(len(UPSELL_RULES))
+        )
+        # Placeholders in statement order: plan per rule (mask), then feature per rule (flags)
+        params = [rule["current_plan"] for rule in UPSELL_RULES] + [rule["feature"] for rule in UPSELL_RULES]
+        
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM upsell_candidates')
+            cursor.execute(f'''
+                INSERT INTO upsell_candidates (user_email, plan_type, rule_mask)
+                SELECT user_email, plan_type, rule_mask FROM (
+                    SELECT usage.user_email, IFNULL(s.plan_type, 'free') AS plan_type, {mask} AS rule_mask
+                    FROM (SELECT user_email, {flags} FROM feature_usage GROUP BY user_email) AS usage
+                    LEFT JOIN subscriptions s ON s.user_email = usage.user_email AND s.status = 'active'
+                ) WHERE rule_mask != 0
+            ''', params)
+            candidates = cursor.rowcount
+            users_evaluated = cursor.execute(
+                'SELECT COUNT(DISTINCT user_email) FROM feature_usage'
+            ).fetchone()[0]
+            cursor.execute('''
+                INSERT INTO upsell_runs (started_at, finished_at, users_evaluated, candidates)
+                VALUES (?, ?, ?, ?)
+            ''', (started_at, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'), users_evaluated, candidates))
+        
+        logger.info(f"Upsell evaluation: {candidates} candidates among {users_evaluated} users")
+        return {"users_evaluated": users_evaluated, "candidates": candidates, "started_at": started_at}
+    
     def implement_ai_upselling(self, user_email: str, current_plan: str) -> List[Dict]:
-        """Implement AI-powered upselling based on user behavior."""
+        """Implement AI-powered upselling based on user behavior.
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Reads the latest evaluate_upsell_candidates() run; until one has run,
+        the user's usage is evaluated live.
+        """
         
-        # Analyze user's AI feature usage
-        cursor.execute('''
-            SELECT feature_name, usage_count, revenue_generated
-            FROM feature_usage 
-            WHERE user_email = ?
-            ORDER BY usage_count DESC
-        ''', (user_email,))
+        if self.storage.fetchone('SELECT 1 FROM upsell_runs LIMIT 1'):
+            row = self.storage.fetchone(HOT_QUERIES["upsell_candidates"][0], (user_email,))
+            rule_mask = row[0] if row else 0
+            return [
+                self._upsell_recommendation(rule) for bit, rule in enumerate(UPSELL_RULES)
+                if rule_mask & (1 << bit) and rule["current_plan"] == current_plan
+            ]
         
-        usage_data = cursor.fetchall()
-        conn.close()
+        self.flush_usage()
+        
+        # Analyze user's AI feature usage
+        usage_data = self.storage.fetchall(HOT_QUERIES["upsell_usage"][0], (user_email,))
         
         # Generate upselling recommendations based on usage patterns
-        recommendations = []
-        
-        if current_plan == "free":
-            if any("advanced_analysis" in row[0] for row in usage_data):
-                recommendations.append({
-                    "upgrade_to": "pro",
-                    "reason": "You're using advanced analysis features frequently",
-                    "benefit": "Unlimited advanced analysis and priority support",
-                    "price": 19.99
-                })
-        
-        if current_plan == "pro":
-            if any("content_generation" in row[0] for row in usage_data):
-                recommendations.append({
-                    "upgrade_to": "enterprise",
-                    "reason": "You're generating content regularly",
-                    "benefit": "Unlimited content generation and API access",
-                    "price": 99.99
-                })
-        
-        return recommendations
+        return [
+            self._upsell_recommendation(rule) for rule in UPSELL_RULES
+            if rule["current_plan"] == current_plan and any(rule["feature"] in row[0] for row in usage_data)
+        ]
     
     def calculate_ai_roi(self, feature_name: str, days: int = 30) -> Dict:
-        """Calculate ROI for specific AI features."""
+        """Calculate ROI for specific AI features (one of ai_cost_ledger.FEATURES)."""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if feature_name not in FEATURES:
+            # Any other name could never match the ledger and would silently fall back to the estimate
+            raise ValueError(f"feature must be one of {', '.join(FEATURES)}")
+        self.flush_usage()
         
         # Get usage and revenue data
-        cursor.execute('''
-            SELECT COUNT(*), SUM(revenue_generated), COUNT(DISTINCT user_email)
-            FROM feature_usage 
-            WHERE feature_name = ? AND last_used >= date('now', '-{} days')
-        '''.format(days), (feature_name,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        result = self.storage.fetchone(HOT_QUERIES["feature_roi"][0], (f'-{int(days)} days', feature_name))
         
-        if result[0] == 0:
+        if not result[0]:
             return {"error": "No usage data found"}
         
         total_usage, total_revenue, unique_users = result
         
-        # Estimate costs (this would be actual API costs in production)
-        estimated_cost_per_use = 0.05  # $0.05 per AI API call
-        total_costs = total_usage * estimated_cost_per_use
+        # Real model spend from the cost ledger; flat estimate only for features it has never seen
+        ai_calls, total_costs = get_ledger().feature_cost(feature_name, days)
+        cost_source = "ledger"
+        if not ai_calls:
+            estimated_cost_per_use = 0.05  # $0.05 per AI API call
+            total_costs = total_usage * estimated_cost_per_use
+            cost_source = "estimate"
         
         roi = ((total_revenue - total_costs) / total_costs * 100) if total_costs > 0 else 0
         
@@ -302,6 +652,8 @@ class GPUMonetizationEngine:
             "unique_users": unique_users,
             "total_revenue": total_revenue,
             "estimated_costs": total_costs,
+            "cost_source": cost_source,
+            "ai_calls": ai_calls,
             "roi_percentage": round(roi, 2),
             "profit": total_revenue - total_costs,
             "avg_revenue_per_user": round(total_revenue / unique_users, 2) if unique_users > 0 else 0
@@ -319,8 +671,8 @@ if __name__ == "__main__":
         print(f"- {plan['name']}: ${plan['price']}/month")
     
     # Track feature usage
-    monetization.track_feature_usage("user@example.com", "ai_gpu_analysis", 5.00)
-    monetization.track_feature_usage("user@example.com", "ai_content_generation", 10.00)
+    monetization.track_feature_usage("user@example.com", FEATURE_ADVANCED_ANALYSIS, 5.00)
+    monetization.track_feature_usage("user@example.com", FEATURE_CONTENT_GENERATION, 10.00)
     
     # Generate revenue report
     report = monetization.generate_revenue_report(30)
@@ -328,7 +680,7 @@ if __name__ == "__main__":
     print(f"Total Revenue: ${report['total_revenue']}")
     
     # Calculate AI ROI
-    roi = monetization.calculate_ai_roi("ai_gpu_analysis", 30)
+    roi = monetization.calculate_ai_roi(FEATURE_ADVANCED_ANALYSIS, 30)
     print(f"\nAI Analysis ROI: {roi.get('roi_percentage', 0)}%")
     
     # Create premium content
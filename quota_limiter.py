@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+AI Quota Enforcement
+Token-bucket rate limiting for AI features, driven by the monetization plan limits.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import logging
+
+from ai_cost_ledger import FEATURE_AI_RECOMMENDATIONS
+from monetization_strategy import GPUMonetizationEngine, HOT_QUERIES as MONETIZATION_QUERIES
+from storage import get_storage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Plan ai_limits are monthly allowances; buckets refill continuously over this window.
+QUOTA_PERIOD_SECONDS = 30 * 24 * 3600
+PLAN_SYNC_INTERVAL_SECONDS = 5
+
+# Queries on the request path; check_query_plans.py asserts none of them scans a table
+HOT_QUERIES = {
+    "quota_bucket": ('SELECT tokens, updated_at FROM quota_buckets WHERE bucket_key = ?', ("user|feature",)),
+}
+
+class GPUQuotaLimiter:
+    def __init__(self, engine: Optional[GPUMonetizationEngine] = None):
+        """Initialize the quota limiter on top of the monetization database."""
+        self.engine = engine or GPUMonetizationEngine()
+        self.db_path = self.engine.db_path
+        self.storage = get_storage(self.db_path)
+        self.plans = self.engine.create_subscription_plans()
+        self._lock = threading.Lock()
+        # user_email -> (plan, end of subscription as epoch seconds); mirrors active subscriptions
+        self._plan_cache: Dict[str, Tuple[str, float]] = {}
+        self._plan_seq = 0
+        self._sync_lock = threading.Lock()
+        self._sync_stop = threading.Event()
+        self._sync_thread = None
+        self._denied_until: Dict[str, float] = {}
+        self.init_database()
+        self.sync_plans()
+
+    def init_database(self):
+        """Create the shared token bucket table."""
+        self.storage.execute('''
+            CREATE TABLE IF NOT EXISTS quota_buckets (
+                bucket_key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        logger.info("Quota buckets initialized")
+
+    def sync_plans(self) -> int:
+        """Apply subscription changes committed since the last sync to the in-memory plan map.
+
+        Reads only rows whose change_seq is newer than the last one seen, so a sync
+        costs nothing when no subscription changed. Returns the number of rows applied.
+        """
+        with self._sync_lock:
+            rows = self.storage.fetchall(
+                MONETIZATION_QUERIES["subscription_changes"][0], (self._plan_seq,)
+            )
+            for user_email, plan, status, end_epoch, change_seq in rows:
+                if status == 'active' and plan in self.plans:
+                    # Subscriptions without an end date never lapse
+                    end = float(end_epoch) if end_epoch is not None else float("inf")
+                    self._plan_cache[user_email] = (plan, end)
+                else:
+                    self._plan_cache.pop(user_email, None)
+                self._plan_seq = change_seq
+                # Limits may have changed; let the next attempt re-check the bucket
+                if self._denied_until:
+                    with self._lock:
+                        for feature_name in self.plans["free"]["ai_limits"]:
+                            self._denied_until.pop(f"{user_email}|{feature_name}", None)
+
+        if rows:
+            logger.debug(f"Synced {len(rows)} subscription changes")
+        return len(rows)
+
+    def start_plan_sync(self, interval: float = PLAN_SYNC_INTERVAL_SECONDS):
+        """Keep the plan map current on a daemon thread."""
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+
+        def sync_loop():
+            while not self._sync_stop.wait(interval):
+                try:
+                    self.sync_plans()
+                except Exception as e:
+                    logger.error(f"Error syncing subscription plans: {e}")
+
+        self._sync_thread = threading.Thread(target=sync_loop, name="quota-plan-sync", daemon=True)
+        self._sync_thread.start()
+
+    def stop(self):
+        self._sync_stop.set()
+
+    def get_user_plan(self, user_email: str) -> str:
+        """The user's active plan, answered from memory (see sync_plans)."""
+        cached = self._plan_cache.get(user_email)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        return "free"
+
+    def get_limit(self, plan: str, feature_name: str) -> Optional[int]:
+        """Monthly allowance for a feature; None if the feature is not metered, -1 if unlimited."""
+        limit = self.plans.get(plan, self.plans["free"])["ai_limits"].get(feature_name)
+        if limit is None or isinstance(limit, bool):
+            return None
+        return limit
+
+    def consume(self, user_email: str, feature_name: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take tokens from the user's bucket for a feature.
+
+        Returns (allowed, retry_after_seconds). Unlimited plans and buckets already
+        known to be empty are answered from memory; otherwise a single atomic UPSERT
+        decides, so the limit holds across every worker sharing the database.
+        """
+        plan = self.get_user_plan(user_email)
+        limit = self.get_limit(plan, feature_name)
+        if limit is None or limit < 0:
+            return True, 0.0
+        if limit == 0 or cost > limit:
+            # A bucket never holds more than the limit, so this request can never fit
+            return False, float(QUOTA_PERIOD_SECONDS)
+
+        bucket_key = f"{user_email}|{feature_name}"
+        now = time.time()
+        denied_until = self._denied_until.get(bucket_key)
+        if denied_until is not None:
+            if now < denied_until:
+                return False, denied_until - now
+            with self._lock:
+                self._denied_until.pop(bucket_key, None)
+
+        capacity = float(limit)
+        rate = capacity / QUOTA_PERIOD_SECONDS
+        conn = self.storage.connection()
+        cursor = conn.execute('''
+            INSERT INTO quota_buckets (bucket_key, tokens, updated_at)
+            VALUES (:key, :capacity - :cost, :now)
+            ON CONFLICT(bucket_key) DO UPDATE
+            SET tokens = MIN(:capacity, tokens + (:now - updated_at) * :rate) - :cost,
+                updated_at = :now
+            WHERE MIN(:capacity, tokens + (:now - updated_at) * :rate) >= :cost
+        ''', {"key": bucket_key, "capacity": capacity, "cost": cost, "now": now, "rate": rate})
+
+        if cursor.rowcount == 1:
+            return True, 0.0
+
+        # Bucket is empty: remember when the next token arrives so repeat
+        # attempts are rejected without touching the database.
+        tokens, updated_at = conn.execute(
+            'SELECT tokens, updated_at FROM quota_buckets WHERE bucket_key = ?', (bucket_key,)
+        ).fetchone()
+        available = min(capacity, tokens + (now - updated_at) * rate)
+        retry_after = max((cost - available) / rate, 0.0)
+        with self._lock:
+            self._denied_until[bucket_key] = now + retry_after
+
+        logger.info(f"Quota exceeded: {user_email} - {feature_name} ({plan} plan)")
+        return False, retry_after
+
+    def get_remaining(self, user_email: str, feature_name: str) -> Optional[float]:
+        """Tokens currently available to the user for a feature (None if unlimited or unmetered)."""
+        limit = self.get_limit(self.get_user_plan(user_email), feature_name)
+        if limit is None or limit < 0:
+            return None
+
+        row = self.storage.fetchone(
+            'SELECT tokens, updated_at FROM quota_buckets WHERE bucket_key = ?',
+            (f"{user_email}|{feature_name}",)
+        )
+        if not row:
+            return float(limit)
+
+        tokens, updated_at = row
+        rate = limit / QUOTA_PERIOD_SECONDS
+        return min(float(limit), tokens + (time.time() - updated_at) * rate)
+
+# Example usage
+if __name__ == "__main__":
+    limiter = GPUQuotaLimiter()
+
+    for attempt in range(7):
+        allowed, retry_after = limiter.consume("user@example.com", FEATURE_AI_RECOMMENDATIONS)
+        print(f"Attempt {attempt + 1}: allowed={allowed}, retry_after={retry_after:.0f}s")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        limiter.consume("user@example.com", FEATURE_AI_RECOMMENDATIONS)
+    elapsed_us = (time.perf_counter() - start) / 10000 * 1e6
+    print(f"Average check cost (exhausted bucket): {elapsed_us:.2f}us")
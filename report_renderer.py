@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Stress-Test Report Renderer
+Renders stored stress-test results as self-contained PDF and HTML reports, cached on disk and built on a worker pool.
+"""
+
+import argparse
+import html
+import os
+import sys
+import textwrap
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from downsample import chart_series
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Part of every cache key; bump whenever the report layout or wording changes
+TEMPLATE_VERSION = 1
+
+REPORT_FORMATS = {"pdf": "application/pdf", "html": "text/html; charset=utf-8"}
+MAX_BATCH_REPORTS = 500
+CHART_POINTS = 400
+
+# (field, title, RGB 0-1) for the charts drawn in every report; same colors as the results page
+CHARTS = (
+    ("gpu_util_pct", "GPU Utilization (%)", (0.40, 0.49, 0.92)),
+    ("temp_c", "Temperature (C)", (1.00, 0.42, 0.42)),
+    ("power_w", "Power Usage (W)", (0.31, 0.80, 0.77)),
+)
+
+def _fmt(value, digits: int = 1, unit: str = "") -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return "n/a"
+    return f"{value:.{digits}f}{unit}"
+
+def _tier_recommendation(score) -> List[str]:
+    if not isinstance(score, (int, float)):
+        return []
+    if score < 40:
+        return ["CRITICAL: GPU should not be used for production workloads",
+                "Consider replacement or professional repair"]
+    if score < 55:
+        return ["DEGRADED: Limit usage to inference or light compute tasks",
+                "Monitor closely and consider maintenance"]
+    if score < 70:
+        return ["GOOD: Suitable for most workloads with minor optimization"]
+    return ["EXCELLENT: Safe for all workloads including AI training"]
+
+def _stress_test_rows(stress: Dict) -> List[Tuple[str, str]]:
+    rows = []
+    mm = stress.get("matrix_multiply") or {}
+    if mm:
+        per_iter = mm.get("avg_time_per_iter")
+        rows += [("Matrix multiply", f"{_fmt(mm.get('tflops'), 2)} TFLOPS"),
+                 ("  Matrix size", f"{mm.get('matrix_size')}x{mm.get('matrix_size')}"),
+                 ("  Avg time per iteration",
+                  _fmt(per_iter * 1000 if isinstance(per_iter, (int, float)) else None, 2, "ms"))]
+    mb = stress.get("memory_bandwidth") or {}
+    if mb:
+        rows += [("Memory bandwidth", _fmt(mb.get("bandwidth_gbps"), 2, " GB/s")),
+                 ("  Test size", f"{mb.get('size_mb')} MB")]
+    vram = stress.get("vram_stress") or {}
+    if vram:
+        rows += [("VRAM allocated", _fmt(vram.get("actual_allocated_gb"), 2, " GB")),
+                 ("  Target usage", f"{vram.get('target_usage_pct')}%"),
+                 ("  Stability", "Stable" if vram.get("stable") else "Unstable")]
+    mp = stress.get("mixed_precision") or {}
+    if mp:
+        for precision in ("fp32", "fp16", "bf16", "int8"):
+            if isinstance(mp.get(precision), dict):
+                speedup = mp.get(f"{precision}_speedup")
+                rows.append((f"{precision.upper()} TFLOPS", _fmt(mp[precision].get("tflops"), 2)
+                             + (f" ({_fmt(speedup, 2)}x speedup)" if speedup is not None else "")))
+        rows.append(("Mixed precision ready", "Yes" if mp.get("mixed_precision_ready") else "No"))
+    return rows
+
+def build_report(result: Dict, series: Dict[str, Dict]) -> Dict:
+    """Report content shared by both renderers: per GPU, titled sections of (label, value) rows.
+
+    series maps gpu key -> downsample.chart_series output for the run's telemetry.
+    """
+    gpus = []
+    for gpu_key in sorted(result["results"], key=lambda key: int(key[4:])):
+        run = result["results"][gpu_key]
+        info = run.get("gpu_info") or {}
+        metrics = run.get("metrics") or {}
+        health = run.get("health_score") or {}
+        analysis = run.get("analysis") or {}
+        stability = metrics.get("temperature_stability") or {}
+        throttle_events = [e for e in metrics.get("throttle_events") or [] if isinstance(e, dict)]
+
+        sections = [
+            ("GPU Information", [
+                ("GPU name", info.get("name") or "Unknown"),
+                ("Temperature at start", _fmt(info.get("Temperature (C)"), 0, " C")),
+                ("Power at start", _fmt(info.get("Power Usage (W)"), 1, " W")),
+                ("Memory used", f"{info.get('Memory Used (MB)', 'n/a')} MB / {info.get('Memory Total (MB)', 'n/a')} MB"),
+                ("Fan speed", _fmt(info.get("Fan Speed (%)"), 0, "%")),
+                ("Test duration", _fmt((run.get("metadata") or {}).get("duration"), 0, " s")),
+            ]),
+            ("Health Assessment", [
+                ("Health score", f"{_fmt(health.get('score'), 0)}/100"),
+                ("Status", str(health.get("status", "n/a"))),
+                ("Recommendation", str(health.get("recommendation", "n/a"))),
+            ] + ([("Server-side score", f"{analysis['health_score']['score']}/100 "
+                                        f"({analysis['health_score']['status']})")]
+                 if analysis.get("health_score") else [])),
+            ("Performance Metrics", [
+                ("Average utilization", _fmt(metrics.get("avg_utilization"), 1, "%")),
+                ("Maximum temperature", _fmt(metrics.get("max_temp"), 1, " C")),
+                ("Maximum power", _fmt(metrics.get("max_power"), 1, " W")),
+                ("Baseline temperature", _fmt(metrics.get("baseline_temp"), 1, " C")),
+                ("Baseline power", _fmt(metrics.get("baseline_power"), 1, " W")),
+            ] + ([("95th percentile temperature", _fmt(analysis["percentiles"]["temp_c"].get("p95"), 1, " C")),
+                  ("Energy used", _fmt(analysis.get("energy_wh"), 2, " Wh"))]
+                 if analysis.get("percentiles") else [])),
+            ("Temperature Stability", [
+                ("Stability score", f"{_fmt(stability.get('stability_score'), 1)}/100"),
+                ("Standard deviation", _fmt(stability.get("std_dev"), 2, " C")),
+                ("Maximum temperature delta", _fmt(stability.get("max_delta"), 1, " C")),
+                ("Average rate of change", _fmt(stability.get("avg_rate_of_change"), 3, " C/sample")),
+            ]),
+            ("Throttling", [
+                ("Throttling events", str(len(throttle_events))),
+                ("Software power cap events",
+                 str(sum("SW Power Cap" in (e.get("reasons") or ()) for e in throttle_events))),
+                ("Hardware slowdown events",
+                 str(sum("HW Slowdown" in (e.get("reasons") or ()) for e in throttle_events))),
+            ] + ([("Time throttled", _fmt(analysis["throttling"]["duty_cycle"] * 100, 2, "%")),
+                  ("Longest throttle", _fmt(analysis["throttling"]["longest_s"], 1, " s"))]
+                 if analysis.get("throttling") else [])),
+        ]
+        stress_rows = _stress_test_rows(run.get("stress_test_results") or {})
+        if stress_rows:
+            sections.append(("Stress Test Performance", stress_rows))
+
+        recommendations = _tier_recommendation(health.get("score"))
+        if throttle_events or (analysis.get("throttling") or {}).get("duty_cycle"):
+            recommendations.append("Throttling detected - consider improving cooling or power delivery")
+        if isinstance(metrics.get("max_temp"), (int, float)) and metrics["max_temp"] > 80:
+            recommendations.append("High temperature detected - improve cooling system")
+        if ((run.get("stress_test_results") or {}).get("mixed_precision") or {}).get("mixed_precision_ready"):
+            recommendations.append("GPU supports mixed precision - consider using FP16/BF16 for AI workloads")
+        recommendations += (health.get("details") or {}).get("specific_recommendations") or []
+
+        charts = []
+        run_series = (series.get(gpu_key) or {}).get("series") or {}
+        for field, title, color in CHARTS:
+            if run_series.get(field, {}).get("v"):
+                charts.append((title, color, run_series[field]["t"], run_series[field]["v"]))
+
+        gpus.append({
+            "heading": f"GPU {gpu_key[4:]}: {info.get('name') or 'Unknown'}",
+            "sections": sections,
+            "recommendations": recommendations,
+            "charts": charts,
+        })
+
+    return {
+        "title": "GPU Stress Test Report",
+        "subtitle": f"Result {result['id']} - {result['device_count']} GPU(s) - "
+                    f"tested {result.get('test_timestamp') or 'n/a'}",
+        "footer": f"Generated {datetime.now(timezone.utc):%Y-%m-%d %H:%M} UTC by GPU Benchmark Tool "
+                  f"(report template v{TEMPLATE_VERSION})",
+        "gpus": gpus,
+    }
+
+class PdfDocument:
+    """Just enough PDF 1.4 for text reports with line charts: built-in Helvetica, A4 pages."""
+
+    WIDTH, HEIGHT, MARGIN = 595, 842, 50
+
+    def __init__(self):
+        self.pages: List[List[str]] = []
+        self.new_page()
+
+    def new_page(self):
+        self.pages.append([])
+        self.y = self.HEIGHT - self.MARGIN
+
+    def ensure(self, height: float):
+        if self.y - height < self.MARGIN:
+            self.new_page()
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        # Built-in fonts use WinAnsi; anything outside it prints as '?'
+        raw = text.encode("cp1252", "replace").decode("latin-1")
+        return raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False,
+             color: Tuple[float, float, float] = (0, 0, 0)):
+        self.pages[-1].append(f"BT {color[0]:.2f} {color[1]:.2f} {color[2]:.2f} rg /F{2 if bold else 1} {size} Tf "
+                              f"1 0 0 1 {x:.1f} {y:.1f} Tm ({self._escape(text)}) Tj ET")
+
+    def paragraph(self, text: str, size: float = 10, bold: bool = False, indent: float = 0,
+                  spacing: float = 1.4, color: Tuple[float, float, float] = (0, 0, 0)):
+        """Wrapped text at the cursor, moving it down (and onto a new page when full)."""
+        # Helvetica averages about half an em per character
+        chars = max(20, int((self.WIDTH - 2 * self.MARGIN - indent) / (size * 0.5)))
+        for line in textwrap.wrap(text, chars) or [""]:
+            self.ensure(size * spacing)
+            self.y -= size * spacing
+            self.text(self.MARGIN + indent, self.y, line, size, bold, color)
+
+    def row(self, label: str, value: str, size: float = 10):
+        self.ensure(size * 1.4)
+        self.y -= size * 1.4
+        self.text(self.MARGIN + 10, self.y, label, size, color=(0.35, 0.35, 0.35))
+        self.text(self.MARGIN + 200, self.y, value[:70], size)
+
+    def chart(self, title: str, color: Tuple[float, float, float], xs: List[float], ys: List[float],
+              height: float = 110):
+        """Line chart across the page width, scaled to the data's range."""
+        self.ensure(height + 40)
+        self.y -= 16
+        self.text(self.MARGIN, self.y, title, 10, bold=True)
+        left, width = self.MARGIN + 40, self.WIDTH - 2 * self.MARGIN - 40
+        bottom = self.y - 8 - height
+        x_min, x_max = min(xs), max(xs)
+        y_min, y_max = min(ys), max(ys)
+        if y_max - y_min < 1e-9:
+            y_min, y_max = y_min - 1, y_max + 1
+        x_span = (x_max - x_min) or 1.0
+
+        ops = self.pages[-1]
+        ops.append(f"0.85 0.85 0.85 RG 0.5 w {left:.1f} {bottom:.1f} {width:.1f} {height:.1f} re S")
+        path = " ".join(
+            f"{left + (x - x_min) / x_span * width:.1f} {bottom + (y - y_min) / (y_max - y_min) * height:.1f} "
+            + ("m" if i == 0 else "l")
+            for i, (x, y) in enumerate(zip(xs, ys)))
+        ops.append(f"{color[0]:.2f} {color[1]:.2f} {color[2]:.2f} RG 1 w 1 j {path} S")
+        grey = (0.4, 0.4, 0.4)
+        self.text(self.MARGIN, bottom + height - 7, f"{y_max:.0f}", 7, color=grey)
+        self.text(self.MARGIN, bottom, f"{y_min:.0f}", 7, color=grey)
+        self.text(left, bottom - 10, f"{x_min:.0f}s", 7, color=grey)
+        self.text(left + width - 20, bottom - 10, f"{x_max:.0f}s", 7, color=grey)
+        self.y = bottom - 16
+
+    def to_bytes(self) -> bytes:
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # page tree, filled in once the page object numbers are known
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        page_ids = []
+        for ops in self.pages:
+            stream = zlib.compress("\n".join(ops).encode("latin-1"))
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            page_ids.append(len(objects) + 1)
+            objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+                            "/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>"
+                            % (self.WIDTH, self.HEIGHT, len(objects))).encode())
+        objects[1] = ("<< /Type /Pages /Kids [%s] /Count %d >>"
+                      % (" ".join(f"{i} 0 R" for i in page_ids), len(page_ids))).encode()
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+def render_pdf(report: Dict) -> bytes:
+    pdf = PdfDocument()
+    pdf.paragraph(report["title"], 22, bold=True)
+    pdf.paragraph(report["subtitle"], 10, color=(0.4, 0.4, 0.4))
+    for index, gpu in enumerate(report["gpus"]):
+        if index:
+            pdf.new_page()
+        pdf.y -= 10
+        pdf.paragraph(gpu["heading"], 16, bold=True)
+        for title, rows in gpu["sections"]:
+            pdf.y -= 6
+            pdf.paragraph(title, 13, bold=True)
+            for label, value in rows:
+                pdf.row(label, value)
+        if gpu["recommendations"]:
+            pdf.y -= 6
+            pdf.paragraph("Recommendations", 13, bold=True)
+            for line in gpu["recommendations"]:
+                pdf.paragraph(f"• {line}", 10, indent=10)
+        if gpu["charts"]:
+            pdf.y -= 6
+            pdf.paragraph("Performance Charts", 13, bold=True)
+            for title, color, xs, ys in gpu["charts"]:
+                pdf.chart(title, color, xs, ys)
+    pdf.y -= 10
+    pdf.paragraph(report["footer"], 8, color=(0.4, 0.4, 0.4))
+    return pdf.to_bytes()
+
+def _svg_chart(title: str, color: Tuple[float, float, float], xs: List[float], ys: List[float]) -> str:
+    width, height = 700, 160
+    x_min, x_max = min(xs), max(xs)
+    y_min, y_max = min(ys), max(ys)
+    if y_max - y_min < 1e-9:
+        y_min, y_max = y_min - 1, y_max + 1
+    x_span = (x_max - x_min) or 1.0
+    points = " ".join(f"{(x - x_min) / x_span * width:.1f},{height - (y - y_min) / (y_max - y_min) * height:.1f}"
+                      for x, y in zip(xs, ys))
+    stroke = "#%02x%02x%02x" % tuple(round(c * 255) for c in color)
+    return (f'<figure><figcaption>{html.escape(title)} <small>{y_min:.0f}&ndash;{y_max:.0f} over '
+            f'{x_max - x_min:.0f}s</small></figcaption>'
+            f'<svg viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+            f'<polyline fill="none" stroke="{stroke}" stroke-width="1.5" vector-effect="non-scaling-stroke" '
+            f'points="{points}"/></svg></figure>')
+
+def render_html(report: Dict) -> bytes:
+    parts = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<title>{html.escape(report['title'])}</title><style>",
+        "body{font-family:Helvetica,Arial,sans-serif;max-width:820px;margin:2rem auto;color:#333;padding:0 1rem}",
+        "h1{margin-bottom:.2rem}.sub,footer{color:#777;font-size:.85rem}h2{border-bottom:2px solid #667eea;"
+        "padding-bottom:.3rem;margin-top:2.5rem}table{border-collapse:collapse;width:100%}"
+        "td{padding:.25rem .5rem;border-bottom:1px solid #eee}td:first-child{color:#666;width:40%}"
+        "figure{margin:1rem 0}svg{width:100%;height:160px;background:#fafafa;border:1px solid #ddd}",
+        "</style></head><body>",
+        f"<h1>{html.escape(report['title'])}</h1><p class=\"sub\">{html.escape(report['subtitle'])}</p>",
+    ]
+    for gpu in report["gpus"]:
+        parts.append(f"<h2>{html.escape(gpu['heading'])}</h2>")
+        for title, rows in gpu["sections"]:
+            parts.append(f"<h3>{html.escape(title)}</h3><table>")
+            parts += [f"<tr><td>{html.escape(label)}</td><td>{html.escape(value)}</td></tr>" for label, value in rows]
+            parts.append("</table>")
+        if gpu["recommendations"]:
+            parts.append("<h3>Recommendations</h3><ul>")
+            parts += [f"<li>{html.escape(line)}</li>" for line in gpu["recommendations"]]
+            parts.append("</ul>")
+        if gpu["charts"]:
+            parts.append("<h3>Performance Charts</h3>")
+            parts += [_svg_chart(*chart) for chart in gpu["charts"]]
+    parts.append(f"<footer>{html.escape(report['footer'])}</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+RENDERERS = {"pdf": render_pdf, "html": render_html}
+
+class ReportRenderer:
+    def __init__(self, store, cache_dir: str = "report_cache", max_workers: int = 2):
+        """Reports for results in a StressResultStore.
+
+        Files are cached as <result hash>-v<TEMPLATE_VERSION>.<format>: stored
+        results never change, so a cached report is valid until the template is
+        bumped. Rendering runs on a thread pool and concurrent requests for the
+        same report share one job.
+        """
+        self.store = store
+        self.cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def cache_path(self, result_hash: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{result_hash}-v{TEMPLATE_VERSION}.{fmt}")
+
+    def cached(self, result_id: int, fmt: str) -> Optional[str]:
+        """Path of an already rendered report, or None."""
+        result_hash = self.store.get_result_hash(result_id)
+        if result_hash is None:
+            return None
+        path = self.cache_path(result_hash, fmt)
+        return path if os.path.exists(path) else None
+
+    def submit(self, result_id: int, fmt: str) -> Optional[Future]:
+        """Queue a report; the future resolves to its path. None if the result does not exist."""
+        if fmt not in RENDERERS:
+            raise ValueError(f"format must be one of {', '.join(RENDERERS)}")
+        result_hash = self.store.get_result_hash(result_id)
+        if result_hash is None:
+            return None
+        path = self.cache_path(result_hash, fmt)
+        if os.path.exists(path):
+            done = Future()
+            done.set_result(path)
+            return done
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = self._executor.submit(self._render_to, result_id, fmt, path)
+                self._pending[path] = future
+                future.add_done_callback(lambda _, key=path: self._forget(key))
+            return future
+
+    def _forget(self, path: str):
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def submit_batch(self, result_ids: Iterable[int], fmt: str) -> Dict:
+        """Queue reports for many results (e.g. a whole fleet) without waiting for them."""
+        summary = {"queued": 0, "cached": 0, "missing": []}
+        for result_id in result_ids:
+            future = self.submit(result_id, fmt)
+            if future is None:
+                summary["missing"].append(result_id)
+            elif future.done():
+                summary["cached"] += 1
+            else:
+                summary["queued"] += 1
+        return summary
+
+    def render(self, result_id: int, fmt: str) -> Optional[bytes]:
+        """Render a report synchronously, bypassing the cache."""
+        result = self.store.get_result(result_id)
+        if result is None:
+            return None
+        series = {}
+        for gpu_key, run in result["results"].items():
+            columns = self.store.get_telemetry_columns(run["run_id"])
+            if columns is not None and len(columns["timestamp"]):
+                series[gpu_key] = chart_series(columns, CHART_POINTS, [field for field, _, _ in CHARTS])
+        return RENDERERS[fmt](build_report(result, series))
+
+    def _render_to(self, result_id: int, fmt: str, path: str) -> str:
+        data = self.render(result_id, fmt)
+        # Write under a private name and rename so readers never see a partial file,
+        # even with several server processes rendering the same report
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        logger.info(f"Rendered {fmt} report for result {result_id} ({len(data)} bytes)")
+        return path
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Render stored stress-test results as PDF/HTML reports")
+    parser.add_argument("result_ids", nargs="*", type=int, help="Result ids to render")
+    parser.add_argument("--all", action="store_true", help=f"Render the newest {MAX_BATCH_REPORTS} results")
+    parser.add_argument("--format", choices=sorted(RENDERERS) + ["both"], default="pdf")
+    parser.add_argument("--db", default="stress_results.db", help="Result store database")
+    parser.add_argument("--cache-dir", default="report_cache", help="Report cache directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Rendering threads")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    import time
+    from stress_results import StressResultStore
+
+    args = parse_args()
+    store = StressResultStore(args.db)
+    ids = list(args.result_ids)
+    if args.all:
+        ids += [row["id"] for row in store.list_results(MAX_BATCH_REPORTS)["results"]]
+    if not ids:
+        print("No results given; pass result ids or --all")
+        sys.exit(1)
+
+    renderer = ReportRenderer(store, args.cache_dir, args.workers)
+    formats = sorted(RENDERERS) if args.format == "both" else [args.format]
+    start = time.perf_counter()
+    jobs = [(result_id, fmt, renderer.submit(result_id, fmt)) for result_id in ids for fmt in formats]
+    for result_id, fmt, future in jobs:
+        print(f"Result {result_id} ({fmt}): {future.result() if future else 'not found'}")
+    renderer.shutdown()
+    print(f"\n{len(jobs)} reports in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Revenue and Cost Reporting
+Read-only report endpoint over the monetization database, cached per (report, window).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from flask import Blueprint, request, jsonify
+import logging
+
+from ai_cost_ledger import get_ledger
+from api_auth import require_role
+from monetization_strategy import GPUMonetizationEngine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_TTL_SECONDS = 60
+REPORT_CACHE_MAX_ENTRIES = 256
+MAX_WINDOW_DAYS = 365
+
+class ReportService:
+    def __init__(self, engine: Optional[GPUMonetizationEngine] = None,
+                 ttl: float = REPORT_CACHE_TTL_SECONDS, max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        """Named reports over the engine's parameterized queries, with a small TTL cache."""
+        self.engine = engine or GPUMonetizationEngine()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        # name -> (builder(days, feature), whether a feature is required)
+        self.reports: Dict[str, Tuple[Callable[[int, Optional[str]], object], bool]] = {
+            "revenue": (lambda days, feature: self.engine.generate_revenue_report(days), False),
+            "roi": (lambda days, feature: self.engine.calculate_ai_roi(feature, days), True),
+            "usage": (lambda days, feature: self.engine.get_usage_timeseries(days * 24, feature), False),
+            "ai_costs": (lambda days, feature: get_ledger().cost_by_endpoint(days * 24), False),
+        }
+
+    def run(self, name: str, days: int = 30, feature: Optional[str] = None) -> Tuple[object, bool]:
+        """Return (report, served_from_cache). Raises KeyError/ValueError for bad input."""
+        if name not in self.reports:
+            raise KeyError(name)
+        builder, needs_feature = self.reports[name]
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ValueError("days must be an integer")
+        if not 1 <= days <= MAX_WINDOW_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_WINDOW_DAYS}")
+        if needs_feature and not feature:
+            raise ValueError(f"the {name} report requires a feature")
+
+        key = (name, days, feature if needs_feature or name == "usage" else None)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self._cache.move_to_end(key)
+                return cached[1], True
+
+        report = builder(days, feature)
+        with self._lock:
+            self._cache[key] = (now + self.ttl, report)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return report, False
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+reports_api = Blueprint('reports_api', __name__)
+# Revenue and AI spend are internal figures: admins only, on every backend that mounts this
+reports_api.before_request(require_role("admin"))
+
+_service: Optional[ReportService] = None
+_service_lock = threading.Lock()
+
+def configure_reports(engine: GPUMonetizationEngine):
+    """Serve reports from an existing engine so its buffered usage is flushed before each report."""
+    global _service
+    with _service_lock:
+        _service = ReportService(engine)
+
+def get_report_service() -> ReportService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ReportService()
+        return _service
+
+@reports_api.route('/api/reports/<name>', methods=['GET'])
+def get_report(name):
+    """Run a named report: ?days=30 (and &feature= for roi / usage)."""
+    service = get_report_service()
+    try:
+        report, cached = service.run(name, request.args.get('days', 30), request.args.get('feature') or None)
+    except KeyError:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown report '{name}'. Available: {', '.join(sorted(service.reports))}"
+        }), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    response = jsonify({'success': True, 'report': name, 'data': report})
+    response.headers['Cache-Control'] = f"private, max-age={int(service.ttl)}"
+    response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+    return response
+
+# Example usage
+if __name__ == "__main__":
+    service = get_report_service()
+    for report_name in ("revenue", "usage", "ai_costs"):
+        start = time.perf_counter()
+        service.run(report_name, 30)
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        service.run(report_name, 30)
+        warm_ms = (time.perf_counter() - start) * 1000
+        print(f"{report_name}: {cold_ms:.2f}ms cold, {warm_ms:.3f}ms cached")
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Streaming Result Parser
+Incremental JSON parser that reads stress-test uploads chunk by chunk and writes telemetry straight into column arrays.
+"""
+
+import codecs
+import hashlib
+import json
+import math
+import re
+from array import array
+from typing import Dict, List, Optional
+import logging
+
+from stress_results import GPU_KEY, MAX_ERRORS, MAX_SAMPLES_PER_GPU, TELEMETRY_FIELDS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A token that has not ended after this many characters is malformed input, not a slow client
+MAX_TOKEN_CHARS = 1024 * 1024
+
+_WS = r'[ \t\n\r]*'
+_NUMBER = r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?'
+# Groups: punctuation, string body, number, literal
+TOKEN = re.compile(rf'{_WS}(?:([{{}}\[\]:,])|"((?:[^"\\]|\\.)*)"|({_NUMBER})|(true|false|null))')
+TRAILING_WS = re.compile(rf'{_WS}\Z')
+# Characters that mean a number cut at a chunk boundary is not finished yet ("12" of "12.5")
+NUMBER_CONTINUATION = frozenset(".eE+-")
+
+# A telemetry sample with plain keys and scalar values, e.g. {"timestamp": 1.5, "throttling": false},
+# plus the comma after it
+_PAIR_BODY = rf'"[A-Za-z_]+"{_WS}:{_WS}(?:{_NUMBER}|true|false|null)'
+FLAT_SAMPLE = re.compile(rf'{_WS}\{{{_WS}(?:{_PAIR_BODY}(?:{_WS},{_WS}{_PAIR_BODY})*)?{_WS}\}}{_WS}(,)?')
+SAMPLE_PAIR = re.compile(rf'"([A-Za-z_]+)"{_WS}:{_WS}(?:({_NUMBER})|(true|false|null))')
+
+LITERALS = {"true": True, "false": False, "null": None}
+FIELD_SLOTS = {name: slot for slot, name in enumerate(TELEMETRY_FIELDS)}
+THROTTLING_SLOT = FIELD_SLOTS["throttling"]
+REQUIRED_SLOTS = 3  # timestamp, temp_c, power_w
+
+# Frame kinds
+OBJECT, ARRAY, SAMPLES, SAMPLE = range(4)
+# Parser states: what the next token may be
+VALUE, VALUE_OR_END, KEY, KEY_OR_END, COLON, COMMA_OR_END, DONE = range(7)
+
+class StreamingResultParser:
+    """Push parser for stress-test result documents.
+
+    Feed the upload with feed(chunk) as it arrives and call close() at the end.
+    Everything except results.gpu_N.metrics.telemetry_sample is built as usual
+    (those parts are small). Samples are never materialised as dicts: each one is
+    checked and appended to per-GPU float64 arrays, one per TELEMETRY_FIELDS
+    entry, so a run costs 8 bytes per field per sample no matter how the client
+    formatted it. Missing values are NaN and throttling is stored as 0.0 / 1.0.
+
+    After close():
+      doc        -- the document, with telemetry_sample removed from each run's metrics
+      telemetry  -- gpu key -> {field: array('d')}
+      errors     -- sample-level problems, in validate_result's wording
+      sha256     -- hex digest of the raw bytes, for deduplication
+      size       -- number of raw bytes read
+    """
+
+    def __init__(self):
+        self.doc = None
+        self.telemetry: Dict[str, Dict[str, array]] = {}
+        self.errors: List[str] = []
+        self.size = 0
+        self._sha = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._offset = 0
+        # Frames are [kind, container, pending key, name under which the parent holds it];
+        # SAMPLES frames hold the gpu key as container and add the column arrays in field order
+        self._stack: List[list] = []
+        self._state = VALUE
+        self._closed = False
+        self._overflowed = set()
+        self._shape_match = None
+        self._shape_slots = ()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha.hexdigest()
+
+    def feed(self, chunk: bytes):
+        """Parse as much of the document as the bytes received so far allow."""
+        if self._closed:
+            raise ValueError("parser is closed")
+        self.size += len(chunk)
+        self._sha.update(chunk)
+        self._buf += self._decoder.decode(chunk)
+        self._parse(final=False)
+
+    def close(self):
+        """Finish parsing and return the document. Raises ValueError if it is not valid JSON."""
+        if not self._closed:
+            self._closed = True
+            self._buf += self._decoder.decode(b"", final=True)
+            self._parse(final=True)
+            if self._state != DONE or self._stack:
+                raise ValueError(f"Unexpected end of document at byte {self.size}")
+        return self.doc
+
+    def _error(self, pos: int, message: str):
+        raise ValueError(f"{message} at character {self._offset + pos}")
+
+    def _parse(self, final: bool):
+        buf = self._buf
+        end = len(buf)
+        pos = 0
+        stack = self._stack
+        match_token = TOKEN.match
+        match_sample = FLAT_SAMPLE.match
+        find_pairs = SAMPLE_PAIR.findall
+        slot_of = FIELD_SLOTS.get
+        add_sample = self._add_sample
+        width = len(TELEMETRY_FIELDS)
+
+        while pos < end:
+            if self._state == DONE:
+                if not TRAILING_WS.match(buf, pos):
+                    self._error(pos, "Extra data after document")
+                pos = end
+                break
+
+            # Fast path: whole flat sample objects (and their separating commas) inside a
+            # telemetry_sample array, read without going through the token loop. Writers emit
+            # every sample with the same keys in the same order, so once one sample has been
+            # split into pairs its key order becomes a single regex with one group per value.
+            if stack and stack[-1][0] == SAMPLES and self._state <= VALUE_OR_END:
+                frame = stack[-1]
+                start = pos
+                while True:
+                    match = self._shape_match(buf, pos) if self._shape_match else None
+                    if match:
+                        texts = match.groups()
+                        row = [None] * width
+                        for slot, text in zip(self._shape_slots, texts):
+                            if slot is not None:
+                                row[slot] = LITERALS[text] if text in LITERALS else float(text)
+                        comma = texts[-1]
+                    else:
+                        match = match_sample(buf, pos)
+                        if match is None:
+                            break
+                        row = [None] * width
+                        keys = []
+                        for key, number, literal in find_pairs(buf, match.start(), match.end()):
+                            keys.append(key)
+                            slot = slot_of(key)
+                            if slot is not None:
+                                row[slot] = float(number) if number else LITERALS[literal]
+                        self._learn_shape(keys)
+                        comma = match.group(1)
+                    add_sample(frame, row)
+                    pos = match.end()
+                    if comma is None:
+                        self._state = COMMA_OR_END
+                        break
+                    self._state = VALUE
+                if pos != start:
+                    continue
+
+            match = match_token(buf, pos)
+            if match is None or (not final and match.lastindex == 3
+                                 and (match.end() == end or buf[match.end()] in NUMBER_CONTINUATION)):
+                # Token incomplete, or a number that may continue in the next chunk
+                if final:
+                    if match is None:
+                        self._error(pos, "Invalid JSON")
+                elif end - pos > MAX_TOKEN_CHARS:
+                    self._error(pos, "Token too long")
+                else:
+                    break
+
+            punct, string, number, literal = match.groups()
+            pos = match.end()
+            state = self._state
+
+            if punct is not None:
+                if punct == ",":
+                    if state != COMMA_OR_END:
+                        self._error(pos, "Unexpected ','")
+                    self._state = KEY if stack[-1][0] in (OBJECT, SAMPLE) else VALUE
+                elif punct == ":":
+                    if state != COLON:
+                        self._error(pos, "Unexpected ':'")
+                    self._state = VALUE
+                elif punct == "{":
+                    if state > VALUE_OR_END:
+                        self._error(pos, "Unexpected '{'")
+                    name = stack[-1][2] if stack else None
+                    if stack and stack[-1][0] == SAMPLES:
+                        stack.append([SAMPLE, [None] * len(TELEMETRY_FIELDS), None, None])
+                    else:
+                        stack.append([OBJECT, {}, None, name])
+                    self._state = KEY_OR_END
+                elif punct == "[":
+                    if state > VALUE_OR_END:
+                        self._error(pos, "Unexpected '['")
+                    gpu_key = self._telemetry_target()
+                    if gpu_key is not None:
+                        columns = self.telemetry[gpu_key]
+                        stack.append([SAMPLES, gpu_key, None, "telemetry_sample",
+                                      [columns[name] for name in TELEMETRY_FIELDS]])
+                    else:
+                        stack.append([ARRAY, [], None, stack[-1][2] if stack else None])
+                    self._state = VALUE_OR_END
+                elif punct == "}":
+                    if state not in (KEY_OR_END, COMMA_OR_END) or stack[-1][0] not in (OBJECT, SAMPLE):
+                        self._error(pos, "Unexpected '}'")
+                    frame = stack.pop()
+                    if frame[0] == SAMPLE:
+                        self._add_sample(stack[-1], frame[1])
+                        self._state = COMMA_OR_END
+                    else:
+                        self._value(frame[1])
+                else:
+                    if state not in (VALUE_OR_END, COMMA_OR_END) or stack[-1][0] not in (ARRAY, SAMPLES):
+                        self._error(pos, "Unexpected ']'")
+                    frame = stack.pop()
+                    if frame[0] == SAMPLES:
+                        # The samples went to self.telemetry; the key stays out of the metrics dict
+                        stack[-1][2] = None
+                        self._state = COMMA_OR_END
+                    else:
+                        self._value(frame[1])
+                continue
+
+            if string is not None:
+                if "\\" in string:
+                    try:
+                        string = json.loads(f'"{string}"')
+                    except ValueError:
+                        self._error(pos, "Invalid string escape")
+                if state in (KEY, KEY_OR_END):
+                    stack[-1][2] = string
+                    self._state = COLON
+                    continue
+                value = string
+            elif number is not None:
+                value = int(number) if number.lstrip("-").isdigit() else float(number)
+            else:
+                value = LITERALS[literal]
+
+            if state > VALUE_OR_END:
+                self._error(pos, "Unexpected value")
+            self._value(value)
+
+        self._offset += pos
+        self._buf = buf[pos:]
+
+    def _learn_shape(self, keys: List[str]):
+        """Compile a regex for samples with exactly these keys in this order."""
+        if len(set(keys)) != len(keys):
+            return
+        pairs = f"{_WS},{_WS}".join(f'"{re.escape(key)}"{_WS}:{_WS}({_NUMBER}|true|false|null)' for key in keys)
+        self._shape_match = re.compile(rf'{_WS}\{{{_WS}{pairs}{_WS}\}}{_WS}(,)?').match
+        self._shape_slots = tuple(FIELD_SLOTS.get(key) for key in keys)
+
+    def _telemetry_target(self) -> Optional[str]:
+        """The gpu key if the array about to open is results.gpu_N.metrics.telemetry_sample."""
+        stack = self._stack
+        if (len(stack) == 4 and stack[-1][0] == OBJECT and stack[-1][2] == "telemetry_sample"
+                and stack[1][3] == "results" and stack[3][3] == "metrics" and stack[2][3] is not None
+                and GPU_KEY.match(stack[2][3])):
+            gpu_key = stack[2][3]
+            if gpu_key in self.telemetry:
+                self._report(f"results.{gpu_key}.metrics.telemetry_sample appears more than once")
+            self.telemetry[gpu_key] = {name: array("d") for name in TELEMETRY_FIELDS}
+            return gpu_key
+        return None
+
+    def _value(self, value):
+        stack = self._stack
+        self._state = COMMA_OR_END
+        if not stack:
+            self.doc = value
+            self._state = DONE
+            return
+
+        frame = stack[-1]
+        kind = frame[0]
+        if kind == OBJECT:
+            frame[1][frame[2]] = value
+            frame[2] = None
+        elif kind == ARRAY:
+            frame[1].append(value)
+        elif kind == SAMPLE:
+            slot = FIELD_SLOTS.get(frame[2])
+            if slot is not None:
+                frame[1][slot] = float(value) if type(value) is int else value
+            frame[2] = None
+        else:
+            index = len(frame[4][0])
+            self._report(f"results.{frame[1]}.metrics.telemetry_sample[{index}] must be an object")
+
+    def _add_sample(self, frame: list, row: list):
+        """Check one sample (numbers as floats) and append it to its GPU's columns."""
+        columns = frame[4]
+        index = len(columns[0])
+        if index >= MAX_SAMPLES_PER_GPU:
+            # Keep memory bounded: the document is rejected, so stop collecting
+            if frame[1] not in self._overflowed:
+                self._overflowed.add(frame[1])
+                self._report(f"results.{frame[1]}.metrics.telemetry_sample has more than "
+                             f"{MAX_SAMPLES_PER_GPU} samples")
+            return
+
+        for slot in range(THROTTLING_SLOT):
+            value = row[slot]
+            if type(value) is not float:
+                if value is not None or slot < REQUIRED_SLOTS:
+                    self._report(f"results.{frame[1]}.metrics.telemetry_sample[{index}]."
+                                 f"{TELEMETRY_FIELDS[slot]} must be a number")
+                value = math.nan
+            columns[slot].append(value)
+
+        throttling = row[THROTTLING_SLOT]
+        if type(throttling) is bool:
+            columns[THROTTLING_SLOT].append(1.0 if throttling else 0.0)
+        else:
+            if throttling is not None:
+                self._report(f"results.{frame[1]}.metrics.telemetry_sample[{index}].throttling must be a boolean")
+            columns[THROTTLING_SLOT].append(math.nan)
+
+    def _report(self, problem: str):
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(problem)
+
+def parse_result_stream(read, chunk_size: int = 64 * 1024) -> StreamingResultParser:
+    """Parse a document from a read(n) callable (a file or request stream) and return the closed parser."""
+    parser = StreamingResultParser()
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    parser.close()
+    return parser
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    samples = ",".join(
+        f'{{"timestamp": {1700000000 + i * 0.1:.1f}, "temp_c": {60 + i % 20}, "power_w": 350.5, '
+        f'"gpu_util_pct": 99, "mem_util_pct": 61, "mem_bandwidth_pct": 48, "throttling": {"true" if i % 97 == 0 else "false"}}}'
+        for i in range(200_000)
+    )
+    document = ('{"device_count": 1, "results": {"gpu_0": {"metadata": {"timestamp": "2024-01-01T00:00:00Z", '
+                '"duration": 20000}, "gpu_info": {"name": "Example GPU"}, "metrics": {"max_temp": 79, '
+                f'"telemetry_sample": [{samples}]}}, "health_score": {{"score": 90}}}}}}, "summary": {{}}}}').encode()
+
+    start = time.perf_counter()
+    data = memoryview(document)
+    parser = StreamingResultParser()
+    for offset in range(0, len(data), 64 * 1024):
+        parser.feed(bytes(data[offset:offset + 64 * 1024]))
+    parser.close()
+    elapsed = time.perf_counter() - start
+    columns = parser.telemetry["gpu_0"]
+    print(f"Parsed {len(document) / 1e6:.1f} MB, {len(columns['timestamp'])} samples in {elapsed:.2f}s; "
+          f"errors={parser.errors}")
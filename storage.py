@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite Storage Layer
+Per-thread pooled connections in WAL mode for the support and monetization databases.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",       # readers never block the writer
+    "synchronous": "NORMAL",     # fsync at checkpoints only; safe with WAL
+    "cache_size": -20000,        # ~20 MB page cache per connection
+    "temp_store": "MEMORY",
+    "mmap_size": 64 * 1024 * 1024,
+    "foreign_keys": "ON",
+}
+
+# A migration is one SQL statement, a list of statements, or a callable taking a cursor
+Migration = Union[str, Sequence[str], Callable[[sqlite3.Cursor], None]]
+
+class SQLiteStorage:
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000,
+                 cached_statements: int = 256, pragmas: Optional[Dict] = None):
+        """Connection pool handing each thread its own long-lived connection.
+
+        Connections run in autocommit mode; group writes with transaction().
+        Because connections persist, sqlite3's per-connection statement cache
+        (sized by cached_statements) reuses prepared statements across calls.
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening one on first use (and after a fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """Run a block of statements in one transaction.
+
+        BEGIN IMMEDIATE takes the write lock up front so concurrent writers wait
+        on busy_timeout instead of failing with "database is locked" mid-way.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]) -> sqlite3.Cursor:
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows)
+
+    def fetchone(self, sql: str, params: Sequence = ()):
+        return self.connection().execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence = ()) -> List:
+        return self.connection().execute(sql, params).fetchall()
+
+    def migrate(self, component: str, migrations: Sequence[Migration]) -> int:
+        """Apply a component's pending schema migrations and return its schema version.
+
+        Several components share one database file, so versions are tracked per
+        component in schema_migrations rather than in PRAGMA user_version.
+        Migration lists are append-only: entry N brings the component to version
+        N + 1. Each step commits on its own and is re-checked under the write
+        lock, so concurrent workers starting up apply it exactly once.
+        """
+        self.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                component TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        version = 0
+        for target, migration in enumerate(migrations, start=1):
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                row = cursor.execute('SELECT version FROM schema_migrations WHERE component = ?',
+                                     (component,)).fetchone()
+                version = row[0] if row else 0
+                if version >= target:
+                    continue
+                if callable(migration):
+                    migration(cursor)
+                else:
+                    for statement in ([migration] if isinstance(migration, str) else migration):
+                        cursor.execute(statement)
+                cursor.execute('''
+                    INSERT INTO schema_migrations (component, version) VALUES (?, ?)
+                    ON CONFLICT(component) DO UPDATE SET version = excluded.version,
+                                                         applied_at = CURRENT_TIMESTAMP
+                ''', (component, target))
+                version = target
+                logger.info(f"Applied {component} schema migration {target}")
+        return version
+
+    def explain(self, sql: str, params: Sequence = ()) -> List[str]:
+        """EXPLAIN QUERY PLAN details for a statement, one line per plan step."""
+        return [row[3] for row in self.fetchall(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def check_query_plans(self, queries: Dict[str, Tuple[str, Sequence]]) -> Dict[str, List[str]]:
+        """Return the plan steps of each named query that read a whole table or sort its result.
+
+        Full scans of a covering index are allowed: they are how GROUP BY over
+        an entire table is answered without touching table pages. Sorting for
+        ORDER BY is not, since it defeats LIMIT and keyset pagination.
+        """
+        failures = {}
+        for name, (sql, params) in queries.items():
+            scans = [step for step in self.explain(sql, params)
+                     if (step.startswith("SCAN ") and "COVERING INDEX" not in step)
+                     or step == "USE TEMP B-TREE FOR ORDER BY"]
+            if scans:
+                failures[name] = scans
+        return failures
+
+    def close_all(self):
+        """Close every pooled connection (e.g. at shutdown or in tests)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+_storages: Dict[str, SQLiteStorage] = {}
+_storages_lock = threading.Lock()
+
+def get_storage(db_path: str) -> SQLiteStorage:
+    """Process-wide shared storage for a database file."""
+    key = os.path.abspath(db_path)
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is None:
+            storage = SQLiteStorage(db_path)
+            _storages[key] = storage
+        return storage
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Stress-Test Analysis
+Recomputes stress-test metrics and the health score from raw telemetry with vectorized NumPy kernels.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when a formula or threshold changes so stored analyses can be told apart
+ANALYSIS_VERSION = 1
+
+PERCENTILES = (50, 95, 99)
+
+# Health score components: name -> maximum points. They sum to 100.
+HEALTH_WEIGHTS = {
+    "temperature": 20,
+    "baseline_temp": 10,
+    "power_efficiency": 15,
+    "utilization": 15,
+    "throttling": 15,
+    "errors": 15,
+    "temperature_stability": 10,
+}
+
+# (upper bound, points) tiers, checked in order; values beyond the last tier score 0
+TEMPERATURE_TIERS = ((65, 20), (75, 15), (83, 8))          # max temperature under load, C
+BASELINE_TEMP_TIERS = ((40, 10), (50, 5))                   # idle temperature, C
+POWER_VARIATION_TIERS = ((0.05, 15), (0.10, 10), (0.20, 5)) # std/mean of power under load
+THROTTLE_DUTY_TIERS = ((0.0, 15), (0.01, 10), (0.05, 5))    # fraction of run spent throttled
+# Utilization is scored the other way round: (lower bound, points)
+UTILIZATION_TIERS = ((95, 15), (85, 10), (70, 5))           # average GPU utilization, %
+STABILITY_TIERS = ((80, 10), (60, 5))                       # stability_score, lower bound
+
+# Same bands as the results page
+STATUS_BANDS = ((70, "healthy", "Safe for all workloads including AI training."),
+                (55, "good", "Suitable for most workloads with minor optimization."),
+                (40, "degraded", "GPU showing signs of stress. Limit to inference or light compute."),
+                (0, "critical", "GPU should not be used for production workloads."))
+
+def _tier(value: float, tiers, higher_is_better: bool = False) -> int:
+    for bound, points in tiers:
+        if (value >= bound) if higher_is_better else (value <= bound):
+            return points
+    return 0
+
+def _as_array(values) -> np.ndarray:
+    # array('d') columns are wrapped without copying
+    return np.frombuffer(values, dtype=np.float64) if not isinstance(values, np.ndarray) else values
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {}
+    return {f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+def _nanmean(values: np.ndarray) -> Optional[float]:
+    present = values[~np.isnan(values)]
+    return float(present.mean()) if present.size else None
+
+def analyze_columns(columns: Dict, baseline_temp: Optional[float] = None,
+                    baseline_power: Optional[float] = None) -> Optional[Dict]:
+    """Recompute a run's metrics from its telemetry columns.
+
+    columns maps telemetry field -> float64 array (array('d') or ndarray, NaN =
+    missing), as produced by stress_results.telemetry_columns, the streaming
+    parser or telemetry_codec. Baselines are measured before the load starts and
+    so are not in the telemetry; when the client did not send them the first
+    sample stands in. Returns None for a run without samples.
+    """
+    timestamps = _as_array(columns["timestamp"])
+    n = timestamps.size
+    if n == 0:
+        return None
+    temps = _as_array(columns["temp_c"])
+    power = _as_array(columns["power_w"])
+    missing = np.full(n, np.nan)
+    util = _as_array(columns.get("gpu_util_pct", missing))
+    mem_util = _as_array(columns.get("mem_util_pct", missing))
+    bandwidth = _as_array(columns.get("mem_bandwidth_pct", missing))
+    throttling = _as_array(columns.get("throttling", missing)) == 1.0
+
+    if baseline_temp is None:
+        baseline_temp = float(temps[0])
+    if baseline_power is None:
+        baseline_power = float(power[0])
+
+    # Per-interval quantities; each interval is attributed to the state at its start
+    duration = float(timestamps[-1] - timestamps[0])
+    intervals = np.diff(timestamps)
+    temp_steps = np.abs(np.diff(temps))
+
+    max_temp = float(temps.max())
+    std_dev = float(temps.std())
+    avg_rate_of_change = float(temp_steps.mean()) if n > 1 else 0.0
+    stability_score = float(np.clip(100.0 - 10.0 * std_dev - 20.0 * avg_rate_of_change, 0.0, 100.0))
+
+    throttled_intervals = throttling[:-1]
+    if duration > 0:
+        duty_cycle = float(intervals[throttled_intervals].sum() / duration)
+    else:
+        duty_cycle = float(throttling.mean())
+    # Rising edges, counting a run that starts throttled
+    throttle_events = int(throttling[0]) + int(np.count_nonzero(throttling[1:] & ~throttling[:-1]))
+    longest_throttle = 0.0
+    if throttle_events:
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], throttling, [False])).astype(np.int8)))
+        starts, ends = edges[0::2], edges[1::2]
+        # A streak lasts until the first unthrottled sample (or the end of the run)
+        longest_throttle = float((timestamps[np.minimum(ends, n - 1)] - timestamps[starts]).max())
+
+    power_mean = float(power.mean())
+    power_variation = float(power.std() / power_mean) if power_mean > 0 else 0.0
+    energy_wh = float(((power[1:] + power[:-1]) * 0.5 * intervals).sum() / 3600.0)
+    avg_utilization = _nanmean(util)
+
+    metrics = {
+        "analysis_version": ANALYSIS_VERSION,
+        "sample_count": int(n),
+        "duration_s": duration,
+        "sample_interval_s": float(np.median(intervals)) if n > 1 else 0.0,
+        "baseline_temp": baseline_temp,
+        "baseline_power": baseline_power,
+        "max_temp": max_temp,
+        "min_temp": float(temps.min()),
+        "avg_temp": float(temps.mean()),
+        "max_power": float(power.max()),
+        "avg_power": power_mean,
+        "energy_wh": energy_wh,
+        "avg_utilization": avg_utilization,
+        "avg_mem_util": _nanmean(mem_util),
+        "avg_mem_bandwidth": _nanmean(bandwidth),
+        "temperature_stability": {
+            "stability_score": stability_score,
+            "std_dev": std_dev,
+            "max_delta": max_temp - baseline_temp,
+            "avg_rate_of_change": avg_rate_of_change,
+        },
+        "throttling": {
+            "duty_cycle": duty_cycle,
+            "events": throttle_events,
+            "longest_s": longest_throttle,
+        },
+        "percentiles": {
+            "temp_c": _percentiles(temps),
+            "power_w": _percentiles(power),
+            "gpu_util_pct": _percentiles(util),
+        },
+    }
+    metrics["health_score"] = score_health(metrics, power_variation)
+    return metrics
+
+def score_health(metrics: Dict, power_variation: float) -> Dict:
+    """Health score in the shape the stress-test tool reports (score, status, details.breakdown)."""
+    throttle_duty = metrics["throttling"]["duty_cycle"]
+    breakdown = {
+        "temperature": _tier(metrics["max_temp"], TEMPERATURE_TIERS),
+        "baseline_temp": _tier(metrics["baseline_temp"], BASELINE_TEMP_TIERS),
+        "power_efficiency": _tier(power_variation, POWER_VARIATION_TIERS),
+        "utilization": _tier(metrics["avg_utilization"] or 0.0, UTILIZATION_TIERS, higher_is_better=True),
+        "throttling": _tier(throttle_duty, THROTTLE_DUTY_TIERS),
+        # Telemetry carries no error counters, so this component is not penalized
+        "errors": HEALTH_WEIGHTS["errors"],
+        "temperature_stability": _tier(metrics["temperature_stability"]["stability_score"],
+                                       STABILITY_TIERS, higher_is_better=True),
+    }
+    score = sum(breakdown.values())
+    status, recommendation = next((name, text) for bound, name, text in STATUS_BANDS if score >= bound)
+
+    specific = []
+    if throttle_duty > 0:
+        specific.append(f"Throttled {throttle_duty:.1%} of the run. May need better cooling or power delivery.")
+    if metrics["max_temp"] > TEMPERATURE_TIERS[1][0]:
+        specific.append(f"Peak temperature {metrics['max_temp']:.0f}C. Check airflow and thermal paste.")
+    if breakdown["power_efficiency"] < HEALTH_WEIGHTS["power_efficiency"]:
+        specific.append(f"Power draw varies {power_variation:.0%} under constant load.")
+
+    return {
+        "score": score,
+        "status": status,
+        "recommendation": recommendation,
+        "details": {
+            "breakdown": breakdown,
+            "specific_recommendations": specific,
+            "max_score": sum(HEALTH_WEIGHTS.values()),
+        },
+    }
+
+def analyze_result(doc: Dict, telemetry: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """Analyze every GPU of a result document.
+
+    telemetry maps gpu key -> columns; when omitted, each run's telemetry_sample
+    is transposed first.
+    """
+    from stress_results import telemetry_columns
+
+    analyses = {}
+    for gpu_key, run in doc.get("results", {}).items():
+        metrics = run.get("metrics") or {}
+        columns = (telemetry or {}).get(gpu_key)
+        if columns is None:
+            columns = telemetry_columns(metrics.get("telemetry_sample") or [])
+        analysis = analyze_columns(columns, _reported(metrics, "baseline_temp"), _reported(metrics, "baseline_power"))
+        if analysis is not None:
+            analyses[gpu_key] = analysis
+    return analyses
+
+def _reported(metrics: Dict, key: str) -> Optional[float]:
+    value = metrics.get(key)
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def load_result(path: str):
+    """(document, telemetry columns) from a .json or .gput result file."""
+    from result_stream import parse_result_stream
+    from telemetry_codec import MAGIC, decode_result
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            f.seek(0)
+            return decode_result(f.read())
+        f.seek(0)
+        parser = parse_result_stream(f.read)
+        return parser.doc, parser.telemetry
+
+def print_analysis(gpu_key: str, analysis: Dict, reported: Dict):
+    stability = analysis["temperature_stability"]
+    health = analysis["health_score"]
+    reported_health = reported.get("health_score") or {}
+    print(f"{gpu_key}: {analysis['sample_count']} samples over {analysis['duration_s']:.1f}s")
+    print(f"  Health score     {health['score']:>6} ({health['status']})"
+          f"   reported: {reported_health.get('score', '-')} ({reported_health.get('status', '-')})")
+    print(f"  Max temp         {analysis['max_temp']:>6.1f}C   p95 {analysis['percentiles']['temp_c']['p95']:.1f}C"
+          f"   reported: {(reported.get('metrics') or {}).get('max_temp', '-')}")
+    print(f"  Max power        {analysis['max_power']:>6.1f}W   avg {analysis['avg_power']:.1f}W"
+          f"   energy {analysis['energy_wh']:.2f}Wh")
+    if analysis["avg_utilization"] is not None:
+        print(f"  Avg utilization  {analysis['avg_utilization']:>6.1f}%")
+    print(f"  Stability        {stability['stability_score']:>6.1f}    std {stability['std_dev']:.2f}C, "
+          f"max delta {stability['max_delta']:.1f}C, {stability['avg_rate_of_change']:.3f}C/sample")
+    print(f"  Throttling       {analysis['throttling']['duty_cycle']:>6.1%}    "
+          f"{analysis['throttling']['events']} events, longest {analysis['throttling']['longest_s']:.1f}s")
+    for name, points in health["details"]["breakdown"].items():
+        print(f"    {name:<22}{points:>3} / {HEALTH_WEIGHTS[name]}")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recompute stress-test metrics from a result file's telemetry")
+    parser.add_argument("path", help="Result file (.json or .gput)")
+    parser.add_argument("--gpu", action="append", help="GPU key to analyze (repeatable); defaults to all")
+    parser.add_argument("--json", action="store_true", help="Print the analysis as JSON")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    import time
+
+    args = parse_args()
+    document, columns_by_gpu = load_result(args.path)
+    if args.gpu:
+        columns_by_gpu = {key: columns_by_gpu[key] for key in args.gpu if key in columns_by_gpu}
+        document = dict(document, results={key: document["results"][key] for key in columns_by_gpu})
+
+    start = time.perf_counter()
+    results = analyze_result(document, columns_by_gpu)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, result in results.items():
+            print_analysis(key, result, document["results"].get(key, {}))
+        print(f"\nAnalyzed {sum(r['sample_count'] for r in results.values())} samples in {elapsed_ms:.1f}ms")
+    sys.exit(0 if results else 1)
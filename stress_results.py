@@ -0,0 +1,955 @@
+#!/usr/bin/env python3
+"""
+Stress-Test Result Storage
+Validates uploaded stress-test result documents and stores every GPU run, with telemetry kept column by column.
+"""
+
+import hashlib
+import json
+import math
+import re
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from storage import get_storage
+from telemetry_codec import decode_columns, encode_blocks, encode_columns
+
+try:
+    from stress_analysis import ANALYSIS_VERSION, analyze_columns
+    ANALYSIS_AVAILABLE = True
+except ImportError:
+    ANALYSIS_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_GPUS = 64
+MAX_SAMPLES_PER_GPU = 1_000_000
+MAX_ERRORS = 20
+MAX_PAGE_SIZE = 200
+
+GPU_KEY = re.compile(r"gpu_(\d+)\Z")
+
+# telemetry_sample fields, in column order. timestamp, temp_c and power_w are required.
+TELEMETRY_FIELDS = ("timestamp", "temp_c", "power_w", "gpu_util_pct", "mem_util_pct",
+                    "mem_bandwidth_pct", "throttling")
+REQUIRED_SAMPLE_FIELDS = ("timestamp", "temp_c", "power_w")
+# Inclusive bounds for each reading. Anything outside is a broken sensor or a forged
+# upload, and would not fit the 64-bit quantized integers of the binary codec.
+TELEMETRY_RANGES = {
+    "timestamp": (0.0, 1e10),
+    "temp_c": (-50.0, 200.0),
+    "power_w": (0.0, 10000.0),
+    "gpu_util_pct": (0.0, 100.0),
+    "mem_util_pct": (0.0, 100.0),
+    "mem_bandwidth_pct": (0.0, 100.0),
+}
+# Scalar metrics copied into gpu_runs columns so fleet queries never parse JSON
+RUN_METRICS = ("max_temp", "max_power", "avg_utilization", "baseline_temp", "baseline_power")
+
+# Vendor prefixes dropped from GPU names so "NVIDIA RTX 5000 Ada Generation" and
+# "RTX 5000 Ada Generation" count as one model
+MODEL_VENDOR_PREFIXES = ("NVIDIA ",)
+# Resolution of the per-model max_temp histogram used for medians and percentiles, in C
+TEMP_BUCKET_C = 1
+
+def gpu_model(name) -> str:
+    """Fleet model key for a reported GPU name."""
+    model = " ".join(str(name or "").split())
+    for prefix in MODEL_VENDOR_PREFIXES:
+        if model.startswith(prefix):
+            model = model[len(prefix):]
+    return model or "Unknown"
+
+def parse_timestamp(value, default: Optional[float] = None) -> Optional[float]:
+    """Unix time of an ISO-8601 timestamp (naive times are UTC), or default if it does not parse."""
+    if not isinstance(value, str):
+        return default
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return default
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def _temp_bucket(max_temp: float) -> int:
+    return int(math.floor(max_temp / TEMP_BUCKET_C))
+
+def _index_fleet(cursor):
+    """Add the fleet columns, backfill them for stored runs and build the per-model aggregates."""
+    cursor.execute('ALTER TABLE gpu_runs ADD COLUMN model TEXT COLLATE NOCASE')
+    cursor.execute('ALTER TABLE gpu_runs ADD COLUMN tested_at REAL')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_stats (
+            model TEXT COLLATE NOCASE PRIMARY KEY,
+            run_count INTEGER NOT NULL,
+            health_sum REAL NOT NULL,
+            health_count INTEGER NOT NULL,
+            max_temp_sum REAL NOT NULL,
+            max_temp_count INTEGER NOT NULL,
+            max_power_sum REAL NOT NULL,
+            max_power_count INTEGER NOT NULL,
+            throttled_count INTEGER NOT NULL,
+            first_tested_at REAL,
+            last_tested_at REAL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_status_counts (
+            model TEXT COLLATE NOCASE NOT NULL,
+            status TEXT NOT NULL,
+            run_count INTEGER NOT NULL,
+            PRIMARY KEY (model, status)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_temp_histogram (
+            model TEXT COLLATE NOCASE NOT NULL,
+            bucket INTEGER NOT NULL,
+            run_count INTEGER NOT NULL,
+            PRIMARY KEY (model, bucket)
+        ) WITHOUT ROWID
+    ''')
+    runs = cursor.execute('''
+        SELECT r.id, r.name, r.test_timestamp, s.uploaded_at, r.health_score, r.health_status,
+               r.max_temp, r.max_power, r.throttled
+        FROM gpu_runs r JOIN stress_results s ON s.id = r.result_id
+    ''').fetchall()
+    for run in runs:
+        values = {
+            "model": gpu_model(run[1]),
+            "tested_at": parse_timestamp(run[2], parse_timestamp(run[3], time.time())),
+            "health_score": run[4], "health_status": run[5], "max_temp": run[6], "max_power": run[7],
+            "throttled": run[8],
+        }
+        cursor.execute('UPDATE gpu_runs SET model = ?, tested_at = ? WHERE id = ?',
+                       (values["model"], values["tested_at"], run[0]))
+        _count_run(cursor, values)
+    # Created after the backfill so it does not pay for index maintenance row by row
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_gpu_runs_model_tested ON gpu_runs(model, tested_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_gpu_runs_status_tested ON gpu_runs(health_status, tested_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_gpu_runs_tested ON gpu_runs(tested_at)')
+
+def _count_run(conn, values: Dict):
+    """Fold one stored run into the per-model aggregates (same transaction as the insert)."""
+    health, max_temp, max_power = values["health_score"], values["max_temp"], values["max_power"]
+    conn.execute('''
+        INSERT INTO model_stats (model, run_count, health_sum, health_count, max_temp_sum, max_temp_count,
+                                 max_power_sum, max_power_count, throttled_count, first_tested_at,
+                                 last_tested_at)
+        VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(model) DO UPDATE SET
+            run_count = run_count + 1,
+            health_sum = health_sum + excluded.health_sum,
+            health_count = health_count + excluded.health_count,
+            max_temp_sum = max_temp_sum + excluded.max_temp_sum,
+            max_temp_count = max_temp_count + excluded.max_temp_count,
+            max_power_sum = max_power_sum + excluded.max_power_sum,
+            max_power_count = max_power_count + excluded.max_power_count,
+            throttled_count = throttled_count + excluded.throttled_count,
+            first_tested_at = MIN(first_tested_at, excluded.first_tested_at),
+            last_tested_at = MAX(last_tested_at, excluded.last_tested_at)
+    ''', (values["model"], health or 0.0, int(health is not None), max_temp or 0.0, int(max_temp is not None),
+          max_power or 0.0, int(max_power is not None), int(bool(values["throttled"])),
+          values["tested_at"], values["tested_at"]))
+    if values["health_status"]:
+        conn.execute('''
+            INSERT INTO model_status_counts (model, status, run_count) VALUES (?, ?, 1)
+            ON CONFLICT(model, status) DO UPDATE SET run_count = run_count + 1
+        ''', (values["model"], values["health_status"]))
+    if max_temp is not None:
+        conn.execute('''
+            INSERT INTO model_temp_histogram (model, bucket, run_count) VALUES (?, ?, 1)
+            ON CONFLICT(model, bucket) DO UPDATE SET run_count = run_count + 1
+        ''', (values["model"], _temp_bucket(max_temp)))
+
+# gpu_info keys that identify a physical GPU, strongest first. A bus ID is only unique
+# within one machine, so it counts only when the upload names the host: every
+# 0000:01:00.0 of one model across the fleet is not one device.
+DEVICE_ID_KEYS = (
+    ("uuid", ("uuid", "UUID", "gpu_uuid")),
+    ("serial", ("serial", "Serial", "Serial Number")),
+    ("bus", ("pci_bus_id", "bus_id", "PCI Bus ID")),
+)
+# Per-device metrics tracked for drift, with the smallest standard deviation assumed
+# so a device whose first runs happened to agree exactly is not flagged for noise
+DRIFT_METRICS = {"baseline_temp": 1.0, "baseline_power": 2.0, "max_temp": 1.0}
+DRIFT_MIN_HISTORY = 3
+DRIFT_SIGMA = 3.0
+DRIFT_EWMA_ALPHA = 0.3
+
+DEVICE_STATS_COLUMNS = ("device_key", "model", "run_count", "first_tested_at", "last_tested_at") + tuple(
+    f"{metric}_{part}" for metric in DRIFT_METRICS for part in ("n", "mean", "m2", "ewma"))
+
+def device_key(gpu_info: Dict, metadata: Optional[Dict] = None) -> Optional[str]:
+    """Stable identity of the physical GPU a run was made on, or None if the upload has none."""
+    for kind, keys in DEVICE_ID_KEYS:
+        value = next((str(gpu_info[key]).strip() for key in keys if gpu_info.get(key)), None)
+        if not value or value.upper() in ("N/A", "UNKNOWN", "NOT SUPPORTED"):
+            continue
+        if kind == "bus":
+            hostname = gpu_info.get("hostname") or (metadata or {}).get("hostname")
+            if not hostname:
+                continue
+            return f"bus:{hostname}/{value.lower()}"
+        return f"{kind}:{value}"
+    return None
+
+def _track_device(conn, values: Dict) -> Optional[Dict]:
+    """Check a run against its device's history, then fold it in. Returns the drift report.
+
+    One primary-key read and one upsert per run: the history is kept as a running
+    mean/variance (Welford) and an EWMA per metric, never recomputed from old runs.
+    A metric drifts when it is more than DRIFT_SIGMA standard deviations from
+    either the device's long-run mean or its recent level (the EWMA).
+    """
+    key = values["device_key"]
+    if key is None:
+        return None
+    row = conn.execute(HOT_QUERIES["device_stats"][0], (key,)).fetchone()
+    stats = dict(zip(DEVICE_STATS_COLUMNS, row)) if row else {
+        "device_key": key, "model": values["model"], "run_count": 0,
+        "first_tested_at": values["tested_at"], "last_tested_at": values["tested_at"],
+        **{f"{metric}_{part}": 0.0 for metric in DRIFT_METRICS for part in ("n", "mean", "m2", "ewma")},
+    }
+
+    flags = []
+    for metric, min_std in DRIFT_METRICS.items():
+        value = values.get(metric)
+        if value is None:
+            continue
+        n, mean, m2, ewma = (stats[f"{metric}_{part}"] for part in ("n", "mean", "m2", "ewma"))
+        if n >= DRIFT_MIN_HISTORY:
+            std = max(math.sqrt(m2 / (n - 1)), min_std)
+            deviation = max(abs(value - mean), abs(value - ewma))
+            if deviation > DRIFT_SIGMA * std:
+                flags.append({"metric": metric, "value": value, "mean": mean, "ewma": ewma, "std": std,
+                              "sigma": deviation / std})
+        n += 1
+        delta = value - mean
+        mean += delta / n
+        stats.update({f"{metric}_n": n, f"{metric}_mean": mean, f"{metric}_m2": m2 + delta * (value - mean),
+                      f"{metric}_ewma": value if n == 1 else DRIFT_EWMA_ALPHA * value + (1 - DRIFT_EWMA_ALPHA) * ewma})
+
+    stats["run_count"] += 1
+    stats["model"] = values["model"]
+    stats["first_tested_at"] = min(stats["first_tested_at"], values["tested_at"])
+    stats["last_tested_at"] = max(stats["last_tested_at"], values["tested_at"])
+    conn.execute(f'''
+        INSERT INTO device_stats ({", ".join(DEVICE_STATS_COLUMNS)})
+        VALUES ({", ".join(":" + column for column in DEVICE_STATS_COLUMNS)})
+        ON CONFLICT(device_key) DO UPDATE SET
+            {", ".join(f"{column} = excluded.{column}" for column in DEVICE_STATS_COLUMNS[1:])}
+    ''', stats)
+    return {"device_key": key, "history_runs": stats["run_count"] - 1, "drifted": bool(flags), "flags": flags}
+
+def _track_devices(cursor):
+    """Add device identity and drift columns, then replay stored runs (oldest first) into device_stats."""
+    cursor.execute('ALTER TABLE gpu_runs ADD COLUMN device_key TEXT')
+    cursor.execute('ALTER TABLE gpu_runs ADD COLUMN drift_json TEXT')
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS device_stats (
+            device_key TEXT PRIMARY KEY,
+            model TEXT,
+            run_count INTEGER NOT NULL,
+            first_tested_at REAL,
+            last_tested_at REAL,
+            {", ".join(f"{column} REAL NOT NULL" for column in DEVICE_STATS_COLUMNS[5:])}
+        ) WITHOUT ROWID
+    ''')
+    runs = cursor.execute(f'''
+        SELECT id, gpu_info_json, test_timestamp, model, tested_at, {", ".join(DRIFT_METRICS)}
+        FROM gpu_runs ORDER BY tested_at, id
+    ''').fetchall()
+    for run in runs:
+        values = dict(zip(("model", "tested_at") + tuple(DRIFT_METRICS), run[3:]))
+        values["device_key"] = device_key(json.loads(run[1] or "{}"))
+        drift = _track_device(cursor, values)
+        if drift is not None:
+            cursor.execute('UPDATE gpu_runs SET device_key = ?, drift_json = ? WHERE id = ?',
+                           (values["device_key"], json.dumps(drift), run[0]))
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_gpu_runs_device_tested ON gpu_runs(device_key, tested_at)')
+
+SCHEMA_MIGRATIONS = [
+    [
+        '''CREATE TABLE IF NOT EXISTS stress_results (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               result_hash TEXT NOT NULL UNIQUE,
+               uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+               device_count INTEGER NOT NULL,
+               test_timestamp TEXT,
+               version TEXT,
+               raw_size INTEGER NOT NULL,
+               summary_json TEXT
+           )''',
+        '''CREATE TABLE IF NOT EXISTS gpu_runs (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               result_id INTEGER NOT NULL REFERENCES stress_results(id) ON DELETE CASCADE,
+               gpu_index INTEGER NOT NULL,
+               name TEXT,
+               test_timestamp TEXT,
+               duration REAL,
+               enhanced_mode INTEGER,
+               health_score REAL,
+               health_status TEXT,
+               max_temp REAL,
+               max_power REAL,
+               avg_utilization REAL,
+               baseline_temp REAL,
+               baseline_power REAL,
+               stability_score REAL,
+               throttled INTEGER NOT NULL DEFAULT 0,
+               sample_count INTEGER NOT NULL DEFAULT 0,
+               gpu_info_json TEXT,
+               metrics_json TEXT,
+               health_json TEXT,
+               UNIQUE (result_id, gpu_index)
+           )''',
+        # One row per run; each telemetry field is a packed little-endian float64 array
+        '''CREATE TABLE IF NOT EXISTS gpu_telemetry (
+               run_id INTEGER PRIMARY KEY REFERENCES gpu_runs(id) ON DELETE CASCADE,
+               sample_count INTEGER NOT NULL,
+               timestamp BLOB NOT NULL,
+               temp_c BLOB NOT NULL,
+               power_w BLOB NOT NULL,
+               gpu_util_pct BLOB NOT NULL,
+               mem_util_pct BLOB NOT NULL,
+               mem_bandwidth_pct BLOB NOT NULL,
+               throttling BLOB NOT NULL
+           )''',
+    ],
+    # Telemetry as one telemetry_codec block per run (about 1/25 of the float64 columns);
+    # gpu_telemetry is only read for runs stored before this table existed
+    '''CREATE TABLE IF NOT EXISTS telemetry_blocks (
+           run_id INTEGER PRIMARY KEY REFERENCES gpu_runs(id) ON DELETE CASCADE,
+           sample_count INTEGER NOT NULL,
+           block BLOB NOT NULL
+       )''',
+    # Server-side recomputation (stress_analysis); the client's own figures stay in
+    # metrics_json/health_json
+    [
+        'ALTER TABLE gpu_runs ADD COLUMN throttle_duty_cycle REAL',
+        'ALTER TABLE gpu_runs ADD COLUMN analysis_version INTEGER',
+        'ALTER TABLE gpu_runs ADD COLUMN analysis_json TEXT',
+    ],
+    # Benchmark section of the upload (matrix multiply, bandwidth, VRAM, mixed precision)
+    'ALTER TABLE gpu_runs ADD COLUMN stress_test_json TEXT',
+    # Fleet queries: model/time/health indexes and per-model aggregates kept current at ingest
+    _index_fleet,
+    # Per-device identity and incremental baseline statistics for drift detection
+    _track_devices,
+    # Runs sampled from modelled CPU telemetry: stored and viewable, but kept out of
+    # fleet listings, per-model aggregates and device drift tracking
+    'ALTER TABLE gpu_runs ADD COLUMN simulated INTEGER NOT NULL DEFAULT 0',
+]
+
+# Fleet run queries, newest first and keyset-paginated on (tested_at, id). Each variant
+# is driven by a different index; the remaining filters are checked on the index range.
+FLEET_RUN_SQL = '''
+    SELECT id, result_id, gpu_index, name, model, test_timestamp, tested_at, health_score,
+           health_status, max_temp, max_power, avg_utilization, throttled
+    FROM gpu_runs
+    WHERE {driver}tested_at >= ? AND tested_at <= ?
+      AND (? IS NULL OR tested_at < ? OR id < ?)
+      AND (? IS NULL OR health_status = ?)
+      AND (? IS NULL OR health_score < ?)
+      AND (? IS NULL OR health_score >= ?)
+      AND simulated = 0
+    ORDER BY tested_at DESC, id DESC LIMIT ?
+'''
+FLEET_RUN_SAMPLE = (0.0, 1e12, None, None, None, None, None, 55.0, 55.0, None, None, 50)
+
+# Queries on the request path; check_query_plans.py asserts none of them scans a table
+HOT_QUERIES = {
+    "result_by_hash": ('SELECT id FROM stress_results WHERE result_hash = ?', ("0" * 64,)),
+    "result_hash": ('SELECT result_hash FROM stress_results WHERE id = ?', (1,)),
+    "list_results": ('''
+        SELECT id, uploaded_at, device_count, test_timestamp, version, summary_json
+        FROM stress_results WHERE id < ? ORDER BY id DESC LIMIT ?
+    ''', (2 ** 63 - 1, 50)),
+    "result_runs": ('''
+        SELECT id, gpu_index, name, test_timestamp, duration, enhanced_mode, health_score,
+               health_status, max_temp, max_power, avg_utilization, baseline_temp, baseline_power,
+               stability_score, throttled, sample_count, gpu_info_json, metrics_json, health_json,
+               analysis_json, stress_test_json, device_key, drift_json, simulated
+        FROM gpu_runs WHERE result_id = ? ORDER BY gpu_index
+    ''', (1,)),
+    "run_telemetry": ('SELECT * FROM gpu_telemetry WHERE run_id = ?', (1,)),
+    "run_telemetry_block": ('SELECT block FROM telemetry_blocks WHERE run_id = ?', (1,)),
+    "fleet_runs_by_model": (FLEET_RUN_SQL.format(driver="model = ? AND "), ("RTX 5000 Ada Generation",) + FLEET_RUN_SAMPLE),
+    "fleet_runs_by_status": (FLEET_RUN_SQL.format(driver="health_status = ? AND "), ("degraded",) + FLEET_RUN_SAMPLE),
+    "fleet_runs": (FLEET_RUN_SQL.format(driver=""), FLEET_RUN_SAMPLE),
+    "device_stats": (f'SELECT {", ".join(DEVICE_STATS_COLUMNS)} FROM device_stats WHERE device_key = ?',
+                     ("uuid:GPU-0",)),
+    "device_runs": ('''
+        SELECT id, result_id, gpu_index, test_timestamp, tested_at, health_score, health_status,
+               baseline_temp, baseline_power, max_temp, drift_json
+        FROM gpu_runs WHERE device_key = ? ORDER BY tested_at DESC, id DESC LIMIT ?
+    ''', ("uuid:GPU-0", 50)),
+    "model_stats": ('''
+        SELECT model, run_count, health_sum, health_count, max_temp_sum, max_temp_count, max_power_sum,
+               max_power_count, throttled_count, first_tested_at, last_tested_at
+        FROM model_stats WHERE model >= ? AND model < ? ORDER BY model LIMIT ?
+    ''', ("", "\U0010ffff", 50)),
+    "model_status_counts": ('''
+        SELECT model, status, run_count FROM model_status_counts
+        WHERE model >= ? AND model <= ? ORDER BY model
+    ''', ("A", "Z")),
+    "model_temp_histogram": ('''
+        SELECT model, bucket, run_count FROM model_temp_histogram
+        WHERE model >= ? AND model <= ? ORDER BY model, bucket
+    ''', ("A", "Z")),
+}
+
+def _is_number(value) -> bool:
+    # bool is an int subclass but never a valid measurement
+    return (type(value) is float and math.isfinite(value)) or type(value) is int
+
+def _check_number(errors: List[str], obj: Dict, key: str, path: str, required: bool = False):
+    value = obj.get(key)
+    if value is None:
+        if required:
+            errors.append(f"{path}.{key} is required")
+    elif not _is_number(value):
+        errors.append(f"{path}.{key} must be a number")
+
+def _check_object(errors: List[str], obj: Dict, key: str, path: str, required: bool = True) -> Optional[Dict]:
+    value = obj.get(key)
+    if isinstance(value, dict):
+        return value
+    if value is not None or required:
+        errors.append(f"{path}.{key} must be an object")
+    return None
+
+def validate_result(doc) -> List[str]:
+    """Check a stress-test result document and return a list of problems (empty if valid).
+
+    Hand-written isinstance checks rather than a schema library: a document is
+    walked once, sample rows are checked with direct dict lookups, and checking
+    stops after MAX_ERRORS problems so a malformed upload is rejected cheaply.
+    """
+    errors: List[str] = []
+    if not isinstance(doc, dict):
+        return ["document must be a JSON object"]
+
+    results = doc.get("results")
+    if not isinstance(results, dict) or not results:
+        return ["results must be a non-empty object of gpu_N entries"]
+    if len(results) > MAX_GPUS:
+        return [f"at most {MAX_GPUS} GPUs per document"]
+    if "device_count" in doc and type(doc["device_count"]) is not int:
+        errors.append("device_count must be an integer")
+    _check_object(errors, doc, "summary", "$", required=False)
+
+    for gpu_key, run in results.items():
+        path = f"results.{gpu_key}"
+        if not GPU_KEY.match(gpu_key):
+            errors.append(f"{path}: key must look like gpu_0, gpu_1, ...")
+            continue
+        if not isinstance(run, dict):
+            errors.append(f"{path} must be an object")
+            continue
+
+        metadata = _check_object(errors, run, "metadata", path)
+        if metadata is not None:
+            if not isinstance(metadata.get("timestamp"), str):
+                errors.append(f"{path}.metadata.timestamp must be a string")
+            _check_number(errors, metadata, "duration", f"{path}.metadata")
+        _check_object(errors, run, "gpu_info", path)
+
+        health = _check_object(errors, run, "health_score", path, required=False)
+        if health is not None:
+            _check_number(errors, health, "score", f"{path}.health_score", required=True)
+
+        metrics = _check_object(errors, run, "metrics", path)
+        if metrics is not None:
+            for key in RUN_METRICS:
+                _check_number(errors, metrics, key, f"{path}.metrics")
+            samples = metrics.get("telemetry_sample", [])
+            if not isinstance(samples, list):
+                errors.append(f"{path}.metrics.telemetry_sample must be an array")
+            elif len(samples) > MAX_SAMPLES_PER_GPU:
+                errors.append(f"{path}.metrics.telemetry_sample has more than {MAX_SAMPLES_PER_GPU} samples")
+            else:
+                _validate_samples(errors, samples, f"{path}.metrics.telemetry_sample")
+
+        if len(errors) >= MAX_ERRORS:
+            break
+    return errors[:MAX_ERRORS]
+
+def _validate_samples(errors: List[str], samples: List, path: str):
+    for index, sample in enumerate(samples):
+        if not isinstance(sample, dict):
+            errors.append(f"{path}[{index}] must be an object")
+        else:
+            for key in REQUIRED_SAMPLE_FIELDS:
+                if not _is_number(sample.get(key)):
+                    errors.append(f"{path}[{index}].{key} must be a number")
+            for key in TELEMETRY_FIELDS[3:-1]:
+                value = sample.get(key)
+                if value is not None and not _is_number(value):
+                    errors.append(f"{path}[{index}].{key} must be a number")
+            for key, (low, high) in TELEMETRY_RANGES.items():
+                value = sample.get(key)
+                if _is_number(value) and not low <= value <= high:
+                    errors.append(f"{path}[{index}].{key} must be between {low:g} and {high:g}")
+            throttling = sample.get("throttling")
+            if throttling is not None and type(throttling) is not bool:
+                errors.append(f"{path}[{index}].throttling must be a boolean")
+        if len(errors) >= MAX_ERRORS:
+            return
+
+def _unpack(blob: bytes) -> array:
+    column = array("d")
+    column.frombytes(blob)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+def telemetry_columns(samples: List[Dict]) -> Dict[str, array]:
+    """Transpose telemetry rows into one float64 array per field; missing values become NaN."""
+    nan = math.nan
+    columns = {}
+    for key in TELEMETRY_FIELDS:
+        values = [sample.get(key) for sample in samples]
+        columns[key] = array("d", [nan if value is None else float(value) for value in values])
+    return columns
+
+def telemetry_samples(columns: Dict[str, array]) -> List[Dict]:
+    """Columns back in telemetry_sample row form (the inverse of telemetry_columns)."""
+    names = [key for key in TELEMETRY_FIELDS if key in columns]
+    samples = []
+    for values in zip(*(columns[key] for key in names)):
+        sample = {key: value for key, value in zip(names, values) if not math.isnan(value)}
+        if "throttling" in sample:
+            sample["throttling"] = sample["throttling"] == 1.0
+        samples.append(sample)
+    return samples
+
+def validate_columns(gpu_key: str, columns: Dict[str, array]) -> List[str]:
+    """Problems with telemetry that arrived already in column form (streamed or binary uploads)."""
+    path = f"results.{gpu_key}.metrics.telemetry_sample"
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        return [f"{path}: columns have different lengths"]
+    if next(iter(lengths), 0) > MAX_SAMPLES_PER_GPU:
+        return [f"{path} has more than {MAX_SAMPLES_PER_GPU} samples"]
+    if columns and any(key not in columns for key in REQUIRED_SAMPLE_FIELDS):
+        return [f"{path}: {', '.join(REQUIRED_SAMPLE_FIELDS)} are required"]
+
+    errors = []
+    for key in REQUIRED_SAMPLE_FIELDS:
+        values = columns.get(key)
+        if values is not None and any(map(math.isnan, values)):
+            errors.append(f"{path}: every sample needs a numeric {key}")
+    for key, values in columns.items():
+        bounds = TELEMETRY_RANGES.get(key)
+        if bounds is None:
+            if any(map(math.isinf, values)):
+                errors.append(f"{path}: {key} must be finite")
+            continue
+        # NaN (missing) compares false both ways, so only real readings are checked
+        low, high = bounds
+        if any(value < low or value > high for value in values):
+            errors.append(f"{path}: {key} must be between {low:g} and {high:g}")
+    return errors
+
+def _opt_float(value) -> Optional[float]:
+    return float(value) if _is_number(value) else None
+
+class StressResultStore:
+    def __init__(self, db_path: str = "stress_results.db"):
+        """SQLite store for uploaded stress-test results."""
+        self.db_path = db_path
+        self.storage = get_storage(db_path)
+        self.storage.migrate("stress_results", SCHEMA_MIGRATIONS)
+
+    def ingest(self, doc: Dict, raw: Optional[bytes] = None) -> Tuple[int, bool]:
+        """Store a validated result document. Returns (result_id, duplicate).
+
+        Documents are deduplicated by the SHA-256 of their raw upload (or of the
+        canonical JSON), so a client retrying an upload does not double count.
+        """
+        if raw is None:
+            raw = json.dumps(doc, sort_keys=True, separators=(",", ":")).encode()
+        telemetry = {
+            gpu_key: telemetry_columns(run.get("metrics", {}).get("telemetry_sample") or [])
+            for gpu_key, run in doc["results"].items()
+        }
+        return self.ingest_columns(doc, telemetry, hashlib.sha256(raw).hexdigest(), len(raw))
+
+    def ingest_columns(self, doc: Dict, telemetry: Dict[str, Dict[str, array]],
+                       result_hash: str, raw_size: int) -> Tuple[int, bool]:
+        """Store a validated document whose telemetry is already in column form.
+
+        This is what streamed uploads use (see result_stream), so samples never
+        exist as per-row dicts on the way in.
+        """
+        results = doc["results"]
+
+        # Build every row, and encode every telemetry block, before taking the write lock
+        runs = []
+        for gpu_key, run in sorted(results.items(), key=lambda item: int(item[0][4:])):
+            values, columns = self._run_row(int(gpu_key[4:]), run, telemetry.get(gpu_key))
+            runs.append((values, encode_columns({key: columns[key] for key in TELEMETRY_FIELDS
+                                                 if key in columns})))
+        first_run = runs[0][0]
+        version = (results[f"gpu_{first_run['gpu_index']}"].get("metadata") or {}).get("version")
+
+        with self.storage.transaction() as conn:
+            row = conn.execute(HOT_QUERIES["result_by_hash"][0], (result_hash,)).fetchone()
+            if row:
+                return row[0], True
+
+            result_id = conn.execute('''
+                INSERT INTO stress_results (result_hash, device_count, test_timestamp, version,
+                                            raw_size, summary_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (result_hash, doc.get("device_count", len(results)), first_run["test_timestamp"],
+                  version, raw_size,
+                  json.dumps(doc["summary"]) if isinstance(doc.get("summary"), dict) else None)).lastrowid
+
+            for values, block in runs:
+                drift = None if values["simulated"] else _track_device(conn, values)
+                if drift and drift["drifted"]:
+                    logger.warning(f"{values['device_key']} drifted: "
+                                   f"{', '.join(flag['metric'] for flag in drift['flags'])}")
+                run_id = conn.execute('''
+                    INSERT INTO gpu_runs (result_id, gpu_index, name, test_timestamp, duration,
+                                          enhanced_mode, health_score, health_status, max_temp,
+                                          max_power, avg_utilization, baseline_temp, baseline_power,
+                                          stability_score, throttled, sample_count, gpu_info_json,
+                                          metrics_json, health_json, throttle_duty_cycle,
+                                          analysis_version, analysis_json, stress_test_json, model,
+                                          tested_at, device_key, drift_json, simulated)
+                    VALUES (:result_id, :gpu_index, :name, :test_timestamp, :duration, :enhanced_mode,
+                            :health_score, :health_status, :max_temp, :max_power, :avg_utilization,
+                            :baseline_temp, :baseline_power, :stability_score, :throttled,
+                            :sample_count, :gpu_info_json, :metrics_json, :health_json,
+                            :throttle_duty_cycle, :analysis_version, :analysis_json,
+                            :stress_test_json, :model, :tested_at, :device_key, :drift_json,
+                            :simulated)
+                ''', dict(values, result_id=result_id, drift_json=json.dumps(drift) if drift else None)).lastrowid
+                conn.execute('''
+                    INSERT INTO telemetry_blocks (run_id, sample_count, block) VALUES (?, ?, ?)
+                ''', (run_id, values["sample_count"], block))
+                if not values["simulated"]:
+                    _count_run(conn, values)
+
+        logger.info(f"Stored stress result {result_id} ({len(runs)} GPUs, {raw_size} bytes)")
+        return result_id, False
+
+    def _run_row(self, gpu_index: int, run: Dict,
+                 columns: Optional[Dict[str, array]]) -> Tuple[Dict, Dict[str, array]]:
+        metadata = run.get("metadata") or {}
+        metrics = dict(run.get("metrics") or {})
+        metrics.pop("telemetry_sample", None)
+        health = run.get("health_score") or {}
+        if columns is None:
+            columns = telemetry_columns([])
+        count = len(columns["timestamp"]) if "timestamp" in columns else 0
+        stability = metrics.get("temperature_stability") or {}
+
+        values = {
+            "gpu_index": gpu_index,
+            "name": (run.get("gpu_info") or {}).get("name"),
+            "model": gpu_model((run.get("gpu_info") or {}).get("name")),
+            "test_timestamp": metadata.get("timestamp"),
+            # Runs with an unreadable timestamp are filed under their upload time
+            "tested_at": parse_timestamp(metadata.get("timestamp"), time.time()),
+            "simulated": int(bool(metadata.get("simulated_telemetry"))),
+            # A simulated run says nothing about the physical GPU
+            "device_key": None if metadata.get("simulated_telemetry")
+            else device_key(run.get("gpu_info") or {}, metadata),
+            "duration": _opt_float(metadata.get("duration")),
+            "enhanced_mode": int(bool(metadata.get("enhanced_mode"))),
+            "health_score": _opt_float(health.get("score")),
+            "health_status": health.get("status"),
+            "stability_score": _opt_float(stability.get("stability_score") if isinstance(stability, dict) else None),
+            "throttled": int(1.0 in columns.get("throttling", ())),
+            "sample_count": count,
+            "gpu_info_json": json.dumps(run.get("gpu_info") or {}),
+            # Samples live in telemetry_blocks; keep the remaining metrics as JSON
+            "metrics_json": json.dumps(metrics),
+            "health_json": json.dumps(health),
+            "throttle_duty_cycle": None,
+            "analysis_version": None,
+            "analysis_json": None,
+            "stress_test_json": json.dumps(run["stress_test_results"])
+            if isinstance(run.get("stress_test_results"), dict) else None,
+        }
+        for key in RUN_METRICS:
+            values[key] = _opt_float(metrics.get(key))
+
+        # Summary columns come from the telemetry itself when it can be analyzed, so
+        # fleet queries do not depend on whichever client version produced the upload
+        analysis = analyze_columns(columns, values["baseline_temp"], values["baseline_power"]) \
+            if ANALYSIS_AVAILABLE and count else None
+        if analysis:
+            health = analysis["health_score"]
+            values.update({
+                "max_temp": analysis["max_temp"],
+                "max_power": analysis["max_power"],
+                "avg_utilization": analysis["avg_utilization"],
+                "baseline_temp": analysis["baseline_temp"],
+                "baseline_power": analysis["baseline_power"],
+                "stability_score": analysis["temperature_stability"]["stability_score"],
+                "health_score": float(health["score"]),
+                "health_status": health["status"],
+                "throttle_duty_cycle": analysis["throttling"]["duty_cycle"],
+                "analysis_version": ANALYSIS_VERSION,
+                "analysis_json": json.dumps(analysis),
+            })
+        return values, columns
+
+    def list_results(self, limit: int = 50, cursor: Optional[int] = None) -> Dict:
+        """Newest results first, keyset-paginated on id. Pass next_cursor back as cursor."""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        rows = self.storage.fetchall(HOT_QUERIES["list_results"][0],
+                                     (cursor if cursor is not None else 2 ** 63 - 1, limit))
+        results = [
+            {
+                "id": row[0], "uploaded_at": row[1], "device_count": row[2], "test_timestamp": row[3],
+                "version": row[4], "summary": json.loads(row[5]) if row[5] else None
+            }
+            for row in rows
+        ]
+        next_cursor = results[-1]["id"] if len(results) == limit else None
+        return {"results": results, "next_cursor": next_cursor}
+
+    def get_result(self, result_id: int, include_telemetry: bool = False) -> Optional[Dict]:
+        """A stored result in the upload's shape, with per-run ids and summary columns."""
+        row = self.storage.fetchone('''
+            SELECT id, uploaded_at, device_count, test_timestamp, version, summary_json
+            FROM stress_results WHERE id = ?
+        ''', (result_id,))
+        if not row:
+            return None
+
+        runs = {}
+        for run in self.storage.fetchall(HOT_QUERIES["result_runs"][0], (result_id,)):
+            metrics = json.loads(run[17])
+            if include_telemetry:
+                metrics["telemetry_sample"] = self.get_telemetry(run[0])
+            runs[f"gpu_{run[1]}"] = {
+                "run_id": run[0],
+                "metadata": {"timestamp": run[3], "duration": run[4], "enhanced_mode": bool(run[5])},
+                "gpu_info": json.loads(run[16]),
+                "metrics": metrics,
+                "health_score": json.loads(run[18]),
+                "throttled": bool(run[14]),
+                "sample_count": run[15],
+                "analysis": json.loads(run[19]) if run[19] else None,
+            }
+            if run[23]:
+                runs[f"gpu_{run[1]}"]["metadata"]["simulated_telemetry"] = True
+            if run[20]:
+                runs[f"gpu_{run[1]}"]["stress_test_results"] = json.loads(run[20])
+            if run[21]:
+                runs[f"gpu_{run[1]}"]["device_key"] = run[21]
+                runs[f"gpu_{run[1]}"]["drift"] = json.loads(run[22]) if run[22] else None
+        return {
+            "id": row[0], "uploaded_at": row[1], "device_count": row[2], "test_timestamp": row[3],
+            "version": row[4], "summary": json.loads(row[5]) if row[5] else None, "results": runs
+        }
+
+    def get_result_hash(self, result_id: int) -> Optional[str]:
+        """SHA-256 the result was deduplicated by; stable for the life of the result."""
+        row = self.storage.fetchone(HOT_QUERIES["result_hash"][0], (result_id,))
+        return row[0] if row else None
+
+    def get_telemetry_block(self, run_id: int) -> Optional[bytes]:
+        """A run's telemetry as a telemetry_codec block, ready to send as-is."""
+        row = self.storage.fetchone(HOT_QUERIES["run_telemetry_block"][0], (run_id,))
+        if row:
+            return row[0]
+        columns = self._legacy_columns(run_id)
+        return encode_columns(columns) if columns is not None else None
+
+    def get_telemetry_columns(self, run_id: int) -> Optional[Dict[str, array]]:
+        """A run's telemetry as one float64 array per field (NaN where a sample had no value)."""
+        row = self.storage.fetchone(HOT_QUERIES["run_telemetry_block"][0], (run_id,))
+        if not row:
+            return self._legacy_columns(run_id)
+        columns = decode_columns(row[0])
+        count = len(next(iter(columns.values()))) if columns else 0
+        return {key: columns.get(key) or array("d", [math.nan]) * count for key in TELEMETRY_FIELDS}
+
+    def _legacy_columns(self, run_id: int) -> Optional[Dict[str, array]]:
+        row = self.storage.fetchone(
+            f'SELECT {", ".join(TELEMETRY_FIELDS)} FROM gpu_telemetry WHERE run_id = ?', (run_id,)
+        )
+        if not row:
+            return None
+        return {key: _unpack(blob) for key, blob in zip(TELEMETRY_FIELDS, row)}
+
+    def get_telemetry(self, run_id: int) -> List[Dict]:
+        """A run's telemetry back in telemetry_sample row form."""
+        columns = self.get_telemetry_columns(run_id)
+        return telemetry_samples(columns) if columns is not None else []
+
+    def export_result(self, result_id: int) -> Optional[bytes]:
+        """A stored result as a telemetry_codec file, built from the stored blocks without re-encoding."""
+        result = self.get_result(result_id)
+        if result is None:
+            return None
+        blocks = {}
+        for gpu_key, run in result["results"].items():
+            block = self.get_telemetry_block(run["run_id"])
+            if block is not None:
+                blocks[gpu_key] = block
+        return encode_blocks(result, blocks)
+
+    def query_runs(self, model: Optional[str] = None, status: Optional[str] = None,
+                   below: Optional[float] = None, min_health: Optional[float] = None,
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """GPU runs across all results, newest test first.
+
+        model matches gpu_model() keys case-insensitively; since/until are unix
+        times on the test timestamp; below/min_health bound the health score.
+        Pass next_cursor back as cursor for the next page.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        cursor_at = cursor_id = None
+        if cursor:
+            at, _, run_id = cursor.partition(":")
+            cursor_at, cursor_id = float(at), int(run_id)
+
+        if model is not None:
+            name, driver = "fleet_runs_by_model", (model,)
+        elif status is not None:
+            name, driver = "fleet_runs_by_status", (status,)
+        else:
+            name, driver = "fleet_runs", ()
+        params = driver + (
+            since if since is not None else float("-inf"),
+            min(until if until is not None else float("inf"), cursor_at if cursor_at is not None else float("inf")),
+            cursor_at, cursor_at, cursor_id,
+            status, status, below, below, min_health, min_health, limit,
+        )
+        runs = [
+            {
+                "run_id": row[0], "result_id": row[1], "gpu_key": f"gpu_{row[2]}", "name": row[3],
+                "model": row[4], "test_timestamp": row[5], "tested_at": row[6], "health_score": row[7],
+                "health_status": row[8], "max_temp": row[9], "max_power": row[10], "avg_utilization": row[11],
+                "throttled": bool(row[12]),
+            }
+            for row in self.storage.fetchall(HOT_QUERIES[name][0], params)
+        ]
+        next_cursor = f"{runs[-1]['tested_at']!r}:{runs[-1]['run_id']}" if len(runs) == limit else None
+        return {"runs": runs, "next_cursor": next_cursor}
+
+    def get_device(self, key: str, limit: int = 50) -> Optional[Dict]:
+        """A device's running statistics and its newest runs with their drift reports."""
+        row = self.storage.fetchone(HOT_QUERIES["device_stats"][0], (key,))
+        if not row:
+            return None
+        stats = dict(zip(DEVICE_STATS_COLUMNS, row))
+        metrics = {}
+        for metric in DRIFT_METRICS:
+            n, mean, m2, ewma = (stats.pop(f"{metric}_{part}") for part in ("n", "mean", "m2", "ewma"))
+            metrics[metric] = {"runs": int(n), "mean": mean if n else None, "ewma": ewma if n else None,
+                               "std": math.sqrt(m2 / (n - 1)) if n > 1 else None}
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        runs = [
+            {
+                "run_id": run[0], "result_id": run[1], "gpu_key": f"gpu_{run[2]}", "test_timestamp": run[3],
+                "tested_at": run[4], "health_score": run[5], "health_status": run[6], "baseline_temp": run[7],
+                "baseline_power": run[8], "max_temp": run[9], "drift": json.loads(run[10]) if run[10] else None,
+            }
+            for run in self.storage.fetchall(HOT_QUERIES["device_runs"][0], (key, limit))
+        ]
+        return dict(stats, metrics=metrics, runs=runs)
+
+    def model_stats(self, prefix: str = "", limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """Per-model fleet statistics from the pre-aggregated tables, in model order.
+
+        Cost depends on the number of models returned, not on the number of runs:
+        averages come from running sums and max_temp percentiles from a
+        TEMP_BUCKET_C histogram. Pass next_cursor back as cursor for the next page.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        # cursor + NUL sorts just after cursor; U+10FFFF sorts after every model with the prefix
+        lower = cursor + "\x00" if cursor else prefix
+        rows = self.storage.fetchall(HOT_QUERIES["model_stats"][0], (lower, prefix + "\U0010ffff", limit))
+        if not rows:
+            return {"models": [], "next_cursor": None}
+
+        span = (rows[0][0], rows[-1][0])
+        statuses: Dict[str, Dict[str, int]] = {}
+        for model, status, count in self.storage.fetchall(HOT_QUERIES["model_status_counts"][0], span):
+            statuses.setdefault(model.lower(), {})[status] = count
+        histograms: Dict[str, List[Tuple[int, int]]] = {}
+        for model, bucket, count in self.storage.fetchall(HOT_QUERIES["model_temp_histogram"][0], span):
+            histograms.setdefault(model.lower(), []).append((bucket, count))
+
+        models = []
+        for row in rows:
+            histogram = histograms.get(row[0].lower(), [])
+            models.append({
+                "model": row[0],
+                "runs": row[1],
+                "avg_health": row[2] / row[3] if row[3] else None,
+                "avg_max_temp": row[4] / row[5] if row[5] else None,
+                "median_max_temp": _histogram_percentile(histogram, 0.5),
+                "p90_max_temp": _histogram_percentile(histogram, 0.9),
+                "avg_max_power": row[6] / row[7] if row[7] else None,
+                "throttled_runs": row[8],
+                "throttle_rate": row[8] / row[1],
+                "status_counts": statuses.get(row[0].lower(), {}),
+                "first_tested_at": row[9],
+                "last_tested_at": row[10],
+            })
+        return {"models": models, "next_cursor": rows[-1][0] if len(rows) == limit else None}
+
+def _histogram_percentile(histogram: List[Tuple[int, int]], q: float) -> Optional[float]:
+    """Quantile q of a (bucket, count) histogram sorted by bucket, interpolated within its bucket."""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    target, seen = q * total, 0
+    for bucket, count in histogram:
+        if seen + count >= target:
+            return (bucket + (target - seen) / count) * TEMP_BUCKET_C
+        seen += count
+    return float((histogram[-1][0] + 1) * TEMP_BUCKET_C)
+
+# Example usage
+if __name__ == "__main__":
+    store = StressResultStore()
+    now = datetime.now(timezone.utc).timestamp()
+    example = {
+        "device_count": 1,
+        "results": {
+            "gpu_0": {
+                "metadata": {"timestamp": datetime.now(timezone.utc).isoformat(), "version": "2.0",
+                             "duration": 60, "enhanced_mode": True},
+                "gpu_info": {"name": "NVIDIA GeForce RTX 4090"},
+                "metrics": {
+                    "max_temp": 78, "max_power": 445, "avg_utilization": 97.5,
+                    "telemetry_sample": [
+                        {"timestamp": now + i, "temp_c": 60 + i * 0.3, "power_w": 400 + i,
+                         "gpu_util_pct": 98, "throttling": False}
+                        for i in range(60)
+                    ]
+                },
+                "health_score": {"score": 92, "status": "healthy"}
+            }
+        },
+        "summary": {"total_gpus": 1, "healthy_gpus": 1}
+    }
+
+    problems = validate_result(example)
+    print(f"Validation problems: {problems}")
+    result_id, duplicate = store.ingest(example)
+    print(f"Stored result {result_id} (duplicate={duplicate})")
+    stored = store.get_result(result_id)
+    print(f"GPU runs: {list(stored['results'])}, samples: {stored['results']['gpu_0']['sample_count']}")
+    print(f"Fleet: {json.dumps(store.model_stats(prefix='GeForce')['models'], indent=2)}")
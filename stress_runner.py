@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+GPU Stress Test Runner
+Loads every GPU with compute and memory kernels while sampling telemetry, and writes the result schema the results page reads.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+
+from stress_analysis import analyze_columns
+from stress_results import TELEMETRY_FIELDS, telemetry_samples, validate_result
+import telemetry_codec
+
+# Try to import the GPU compute backends and telemetry
+try:
+    import torch
+    TORCH_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    import cupy
+    CUPY_AVAILABLE = cupy.cuda.runtime.getDeviceCount() > 0
+except Exception:  # ImportError, or a CUDA runtime error when no driver is loaded
+    CUPY_AVAILABLE = False
+
+try:
+    import pynvml
+    PYNVML_AVAILABLE = True
+except ImportError:
+    PYNVML_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RUNNER_VERSION = "1.0.0"
+BACKENDS = ("auto", "torch", "cupy", "numpy")
+KERNELS = ("compute", "memory")
+DTYPES = ("fp32", "fp16", "bf16")
+
+DEFAULT_DURATION = 60.0
+DEFAULT_BASELINE = 5.0
+DEFAULT_INTERVAL = 0.5
+DEFAULT_MATRIX_SIZE = 4096
+# numpy runs on the CPU, where a 4096 matmul takes seconds per iteration
+CPU_MATRIX_SIZE = 1024
+DEFAULT_MEMORY_MB = 512
+
+# Enhanced mode: benchmark iterations per precision and the share of free VRAM to fill
+BENCHMARK_ITERATIONS = 20
+VRAM_TARGET_PCT = 80
+VRAM_CHUNK_MB = 256
+# fp16/bf16 faster than fp32 by this factor counts as tensor-core ready
+MIXED_PRECISION_SPEEDUP = 1.5
+
+# nvmlDeviceGetCurrentClocksThrottleReasons bits; the named pynvml constants differ between releases
+THROTTLE_REASONS = (
+    (0x1, "GPU Idle"),
+    (0x2, "Applications Clocks Setting"),
+    (0x4, "SW Power Cap"),
+    (0x8, "HW Slowdown"),
+    (0x10, "Sync Boost"),
+    (0x20, "SW Thermal Slowdown"),
+    (0x40, "HW Thermal Slowdown"),
+    (0x80, "HW Power Brake Slowdown"),
+)
+# Reasons that mean the GPU is held back; idle, application clocks and sync boost are not
+THROTTLING_MASK = 0x4 | 0x8 | 0x20 | 0x40 | 0x80
+
+# Simulated sensor used with the numpy backend when NVML is unavailable
+SIM_AMBIENT_C = 35.0
+SIM_LOAD_RISE_C = 30.0
+SIM_TIME_CONSTANT_S = 20.0
+SIM_IDLE_POWER_W = 15.0
+SIM_LOAD_POWER_W = 120.0
+
+class NvmlSensor:
+    """Reads one NVIDIA GPU's telemetry through NVML."""
+
+    simulated = False
+
+    def __init__(self, index: int):
+        self.handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+
+    def read(self) -> Dict:
+        handle = self.handle
+        utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+        memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        try:
+            mask = pynvml.nvmlDeviceGetCurrentClocksThrottleReasons(handle)
+        except pynvml.NVMLError:
+            mask = 0
+        return {
+            "temp_c": float(pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)),
+            "power_w": pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0,
+            "gpu_util_pct": float(utilization.gpu),
+            "mem_util_pct": 100.0 * memory.used / memory.total,
+            # NVML's "memory" utilization is the share of time the memory controller was busy
+            "mem_bandwidth_pct": float(utilization.memory),
+            "throttling": 1.0 if mask & THROTTLING_MASK else 0.0,
+            "reasons": [name for bit, name in THROTTLE_REASONS if mask & bit],
+        }
+
+    def info(self) -> Dict:
+        """gpu_info in the result schema, read before the load starts."""
+        handle = self.handle
+        name = pynvml.nvmlDeviceGetName(handle)
+        memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        info = {
+            "name": name.decode("utf-8") if isinstance(name, bytes) else name,
+            "Temperature (C)": pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU),
+            "Power Usage (W)": pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0,
+            "Memory Used (MB)": memory.used // (1024 ** 2),
+            "Memory Total (MB)": memory.total // (1024 ** 2),
+        }
+        identity = {
+            "Fan Speed (%)": pynvml.nvmlDeviceGetFanSpeed,
+            "uuid": pynvml.nvmlDeviceGetUUID,
+            "serial": pynvml.nvmlDeviceGetSerial,
+            "pci_bus_id": lambda h: pynvml.nvmlDeviceGetPciInfo(h).busId,
+        }
+        for key, query in identity.items():
+            try:
+                value = query(handle)
+                info[key] = value.decode("utf-8") if isinstance(value, bytes) else value
+            except pynvml.NVMLError:
+                pass
+        return info
+
+class SimulatedSensor:
+    """Stand-in telemetry for the CPU fallback: real CPU utilization, modelled temperature and power.
+
+    The temperature follows utilization with a first-order lag, so a test run
+    exercises the same analysis paths as a GPU run. Results from it are marked
+    as simulated in the metadata.
+    """
+
+    simulated = True
+
+    def __init__(self):
+        self.temp = SIM_AMBIENT_C
+        self.last = time.monotonic()
+        if PSUTIL_AVAILABLE:
+            psutil.cpu_percent(None)
+
+    def read(self) -> Dict:
+        now = time.monotonic()
+        elapsed, self.last = now - self.last, now
+        util = psutil.cpu_percent(None) if PSUTIL_AVAILABLE else 0.0
+        load = util / 100.0
+        target = SIM_AMBIENT_C + SIM_LOAD_RISE_C * load
+        self.temp += (target - self.temp) * min(1.0, elapsed / SIM_TIME_CONSTANT_S)
+        memory_pct = psutil.virtual_memory().percent if PSUTIL_AVAILABLE else 0.0
+        return {
+            "temp_c": round(self.temp, 1),
+            "power_w": round(SIM_IDLE_POWER_W + (SIM_LOAD_POWER_W - SIM_IDLE_POWER_W) * load, 3),
+            "gpu_util_pct": util,
+            "mem_util_pct": memory_pct,
+            "throttling": 0.0,
+            "reasons": [],
+        }
+
+    def info(self) -> Dict:
+        reading = self.read()
+        name = platform.processor() or platform.machine()
+        info = {
+            "name": f"{name} (CPU fallback)",
+            "Temperature (C)": reading["temp_c"],
+            "Power Usage (W)": reading["power_w"],
+        }
+        if PSUTIL_AVAILABLE:
+            memory = psutil.virtual_memory()
+            info["Memory Used (MB)"] = memory.used // (1024 ** 2)
+            info["Memory Total (MB)"] = memory.total // (1024 ** 2)
+        return info
+
+class TelemetrySampler(threading.Thread):
+    """Samples a sensor at a fixed cadence into float64 columns.
+
+    Deadlines advance by the interval from the start time rather than from the
+    end of the last read, so sensor latency does not stretch the cadence. When
+    a read overruns, missed ticks are dropped instead of sampled back to back.
+    The thread only waits between reads, so it takes no time from the kernels.
+    """
+
+    def __init__(self, sensor, interval: float, name: str):
+        super().__init__(name=f"telemetry-{name}", daemon=True)
+        self.sensor = sensor
+        self.interval = interval
+        self.columns = {field: array("d") for field in TELEMETRY_FIELDS}
+        self.throttle_events: List[Dict] = []
+        self._reasons: List[str] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        next_at = time.monotonic()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay < 0:
+                next_at = time.monotonic()
+            elif self._stop_event.wait(delay):
+                break
+
+    def sample(self):
+        timestamp = time.time()
+        reading = self.sensor.read()
+        reading["timestamp"] = timestamp
+        for field, column in self.columns.items():
+            column.append(float(reading.get(field, float("nan"))))
+        # One event per change to a new non-empty set of throttle reasons
+        reasons = reading["reasons"]
+        if reasons and reasons != self._reasons:
+            self.throttle_events.append({"timestamp": timestamp, "reasons": reasons})
+        self._reasons = reasons
+
+    def mark(self) -> int:
+        """Number of samples taken so far; phases are split at marks."""
+        return len(self.columns["timestamp"])
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def slice(self, start: int, end: Optional[int] = None) -> Dict[str, array]:
+        return {field: column[start:end] for field, column in self.columns.items()}
+
+class ArrayKernels:
+    """Compute and memory kernels on a numpy (CPU) or cupy (GPU) device."""
+
+    def __init__(self, xp, index: int, matrix_size: int, memory_mb: int, dtype: str):
+        self.xp = xp
+        self.index = index
+        self.gpu = xp is not np
+        self.matrix_size = matrix_size
+        self.memory_mb = memory_mb
+        self.dtype = dtype
+        with self._device():
+            self.a, self.b = self._matrices(dtype)
+            self.src = xp.ones(memory_mb * 1024 * 1024 // 4, dtype=xp.float32)
+            self.dst = xp.empty_like(self.src)
+
+    def _device(self):
+        return self.xp.cuda.Device(self.index) if self.gpu else _NoDevice()
+
+    def _matrices(self, dtype: str):
+        if dtype == "bf16":
+            raise ValueError(f"{'cupy' if self.gpu else 'numpy'} has no bf16 matmul")
+        if dtype == "fp16" and not self.gpu:
+            raise ValueError("numpy has no fp16 BLAS; CPU fp16 matmul would measure the conversion")
+        xp_dtype = {"fp32": self.xp.float32, "fp16": self.xp.float16}[dtype]
+        rng = self.xp.random.default_rng(self.index)
+        shape = (self.matrix_size, self.matrix_size)
+        return rng.random(shape, dtype=self.xp.float32).astype(xp_dtype), \
+            rng.random(shape, dtype=self.xp.float32).astype(xp_dtype)
+
+    def synchronize(self):
+        if self.gpu:
+            self.xp.cuda.Device(self.index).synchronize()
+
+    def compute(self, a=None, b=None):
+        with self._device():
+            self.xp.matmul(self.a if a is None else a, self.b if b is None else b)
+            self.synchronize()
+
+    def memory(self) -> int:
+        with self._device():
+            self.xp.copyto(self.dst, self.src)
+            self.synchronize()
+        return 2 * self.src.nbytes
+
+    def precision_pair(self, dtype: str):
+        with self._device():
+            return self._matrices(dtype)
+
+    def vram_stress(self, target_pct: float) -> Optional[Dict]:
+        if not self.gpu:
+            return None
+        with self._device():
+            free, _ = self.xp.cuda.runtime.memGetInfo()
+            return _fill_vram(free * target_pct / 100.0, target_pct,
+                              lambda count, value: self.xp.full(count, value, dtype=self.xp.float32),
+                              lambda chunk, value: bool((chunk == value).all()),
+                              self.xp.cuda.memory.OutOfMemoryError)
+
+    def close(self):
+        self.a = self.b = self.src = self.dst = None
+        if self.gpu:
+            self.xp.get_default_memory_pool().free_all_blocks()
+
+class TorchKernels:
+    """Compute and memory kernels on a CUDA device through PyTorch."""
+
+    def __init__(self, index: int, matrix_size: int, memory_mb: int, dtype: str):
+        self.device = torch.device(f"cuda:{index}")
+        self.matrix_size = matrix_size
+        self.memory_mb = memory_mb
+        self.dtype = dtype
+        self.a, self.b = self.precision_pair(dtype)
+        self.src = torch.ones(memory_mb * 1024 * 1024 // 4, dtype=torch.float32, device=self.device)
+        self.dst = torch.empty_like(self.src)
+
+    def precision_pair(self, dtype: str):
+        if dtype == "bf16" and not torch.cuda.is_bf16_supported():
+            raise ValueError("bf16 is not supported on this GPU")
+        torch_dtype = {"fp32": torch.float32, "fp16": torch.float16, "bf16": torch.bfloat16}[dtype]
+        shape = (self.matrix_size, self.matrix_size)
+        return torch.rand(shape, dtype=torch_dtype, device=self.device), \
+            torch.rand(shape, dtype=torch_dtype, device=self.device)
+
+    def synchronize(self):
+        torch.cuda.synchronize(self.device)
+
+    def compute(self, a=None, b=None):
+        torch.matmul(self.a if a is None else a, self.b if b is None else b)
+        self.synchronize()
+
+    def memory(self) -> int:
+        self.dst.copy_(self.src)
+        self.synchronize()
+        return 2 * self.src.numel() * self.src.element_size()
+
+    def vram_stress(self, target_pct: float) -> Optional[Dict]:
+        free, _ = torch.cuda.mem_get_info(self.device)
+        return _fill_vram(free * target_pct / 100.0, target_pct,
+                          lambda count, value: torch.full((count,), value, dtype=torch.float32,
+                                                          device=self.device),
+                          lambda chunk, value: bool((chunk == value).all().item()),
+                          torch.cuda.OutOfMemoryError)
+
+    def close(self):
+        self.a = self.b = self.src = self.dst = None
+        torch.cuda.empty_cache()
+
+class _NoDevice:
+    """Context manager standing in for cupy.cuda.Device on the CPU."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def _fill_vram(target_bytes: float, target_pct: float, allocate, verify, out_of_memory) -> Dict:
+    """Allocate VRAM in chunks up to target_bytes, each filled with its index, then read every chunk back.
+
+    allocate(count, value) returns a float32 buffer of count elements set to value.
+    """
+    chunk_bytes = VRAM_CHUNK_MB * 1024 * 1024
+    chunks = []
+    try:
+        while (len(chunks) + 1) * chunk_bytes <= target_bytes:
+            chunks.append(allocate(chunk_bytes // 4, len(chunks)))
+    except out_of_memory:
+        logger.info(f"VRAM stress stopped at {len(chunks)} chunks (out of memory)")
+    stable = all(verify(chunk, value) for value, chunk in enumerate(chunks))
+    num_tensors = len(chunks)
+    chunks.clear()
+    return {
+        "actual_allocated_gb": num_tensors * VRAM_CHUNK_MB / 1024,
+        "target_usage_pct": target_pct,
+        "num_tensors": num_tensors,
+        "stable": stable,
+    }
+
+def select_backend(name: str = "auto") -> str:
+    """Resolve "auto" to the first available backend; raise if a requested one is missing."""
+    available = {"torch": TORCH_AVAILABLE, "cupy": CUPY_AVAILABLE, "numpy": True}
+    if name == "auto":
+        return next(backend for backend, ok in available.items() if ok)
+    if name not in available:
+        raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
+    if not available[name]:
+        raise RuntimeError(f"{name} backend is not available (no CUDA device or package missing)")
+    return name
+
+def device_count(backend: str) -> int:
+    if backend == "torch":
+        return torch.cuda.device_count()
+    if backend == "cupy":
+        return cupy.cuda.runtime.getDeviceCount()
+    return 1
+
+def make_kernels(backend: str, index: int, matrix_size: int, memory_mb: int, dtype: str):
+    if backend == "torch":
+        return TorchKernels(index, matrix_size, memory_mb, dtype)
+    return ArrayKernels(cupy if backend == "cupy" else np, index, matrix_size, memory_mb, dtype)
+
+def benchmark_matmul(kernels, dtype: str, iterations: int) -> Dict:
+    """TFLOPS of `iterations` matmuls at one precision (one warm-up call excluded)."""
+    a, b = kernels.precision_pair(dtype)
+    kernels.compute(a, b)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        kernels.compute(a, b)
+    elapsed = time.perf_counter() - started
+    n = kernels.matrix_size
+    return {"tflops": 2 * n ** 3 * iterations / elapsed / 1e12 if elapsed > 0 else 0.0}
+
+def mixed_precision(kernels, iterations: int = BENCHMARK_ITERATIONS) -> Dict:
+    """fp32/fp16/bf16 matmul throughput and the speedup of each reduced precision over fp32."""
+    results = {}
+    for dtype in DTYPES:
+        try:
+            results[dtype] = benchmark_matmul(kernels, dtype, iterations)
+        except (ValueError, TypeError, RuntimeError) as e:
+            logger.info(f"Skipping {dtype} benchmark: {e}")
+    fp32 = results.get("fp32", {}).get("tflops")
+    ready = False
+    for dtype in ("fp16", "bf16"):
+        if fp32 and dtype in results:
+            speedup = results[dtype]["tflops"] / fp32
+            results[f"{dtype}_speedup"] = speedup
+            ready = ready or speedup >= MIXED_PRECISION_SPEEDUP
+    results["mixed_precision_ready"] = ready
+    return results
+
+def run_load(kernels, kernel_names: List[str], duration: float) -> Dict:
+    """Alternate the selected kernels back to back for `duration` seconds."""
+    matmul_times = []
+    copied_bytes = copies = 0
+    copy_time = 0.0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if "compute" in kernel_names:
+            started = time.perf_counter()
+            kernels.compute()
+            matmul_times.append(time.perf_counter() - started)
+        if "memory" in kernel_names:
+            started = time.perf_counter()
+            copied_bytes += kernels.memory()
+            copy_time += time.perf_counter() - started
+            copies += 1
+
+    results = {}
+    if matmul_times:
+        avg = sum(matmul_times) / len(matmul_times)
+        results["matrix_multiply"] = {
+            "tflops": 2 * kernels.matrix_size ** 3 / avg / 1e12,
+            "matrix_size": kernels.matrix_size,
+            "dtype": kernels.dtype,
+            "iterations": len(matmul_times),
+            "avg_time_per_iter": avg,
+        }
+    if copies:
+        results["memory_bandwidth"] = {
+            "bandwidth_gbps": copied_bytes / copy_time / 1e9 if copy_time > 0 else 0.0,
+            "size_mb": kernels.memory_mb,
+            "iterations": copies,
+        }
+    return results
+
+def run_gpu(backend: str, index: int, sensor, options: Dict, barrier: threading.Barrier) -> Dict:
+    """Baseline, load and (in enhanced mode) benchmark phases for one GPU; returns its result entry.
+
+    Every GPU waits at the barrier after its baseline so the load starts at the
+    same moment across the machine, as it would in a multi-GPU training job.
+    """
+    gpu_info = sensor.info()
+    started_at = datetime.now(timezone.utc).isoformat()
+    sampler = TelemetrySampler(sensor, options["interval"], f"gpu_{index}")
+    kernels = None
+    try:
+        sampler.start()
+        time.sleep(options["baseline"])
+        baseline_end = sampler.mark()
+        kernels = make_kernels(backend, index, options["matrix_size"], options["memory_mb"], options["dtype"])
+        barrier.wait()
+        load_start = sampler.mark()
+        stress_test_results = run_load(kernels, options["kernels"], options["duration"])
+        if options["enhanced"]:
+            stress_test_results["mixed_precision"] = mixed_precision(kernels)
+            vram = kernels.vram_stress(VRAM_TARGET_PCT)
+            if vram is not None:
+                stress_test_results["vram_stress"] = vram
+    finally:
+        sampler.stop()
+        if kernels is not None:
+            kernels.close()
+
+    baseline = sampler.slice(0, baseline_end)
+    load = sampler.slice(load_start)
+    baseline_temp = statistics.median(baseline["temp_c"]) if baseline["temp_c"] else None
+    baseline_power = statistics.median(baseline["power_w"]) if baseline["power_w"] else None
+    analysis = analyze_columns(load, baseline_temp, baseline_power)
+    if analysis is None:
+        raise RuntimeError(f"gpu_{index}: no telemetry sampled during the load phase")
+
+    load_events = [event for event in sampler.throttle_events if event["timestamp"] >= load["timestamp"][0]]
+    metadata = {
+        "timestamp": started_at,
+        "version": RUNNER_VERSION,
+        "duration": analysis["duration_s"],
+        "enhanced_mode": options["enhanced"],
+        "backend": backend,
+        "kernels": list(options["kernels"]),
+        "sample_interval": options["interval"],
+        # Scopes the bus ID that identifies the device when NVML has no UUID or serial
+        "hostname": platform.node(),
+    }
+    if sensor.simulated:
+        metadata["simulated_telemetry"] = True
+    return {
+        "metadata": metadata,
+        "gpu_info": gpu_info,
+        "metrics": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "baseline_temp": analysis["baseline_temp"],
+            "baseline_power": analysis["baseline_power"],
+            "max_temp": analysis["max_temp"],
+            "max_power": analysis["max_power"],
+            "avg_utilization": analysis["avg_utilization"],
+            "temperature_stability": analysis["temperature_stability"],
+            "throttle_events": load_events,
+            "telemetry_sample": telemetry_samples(load),
+        },
+        "stress_test_results": stress_test_results,
+        "health_score": analysis["health_score"],
+    }
+
+def summarize(results: Dict[str, Dict]) -> Dict:
+    """The summary block: healthy GPU count, a warning per unhealthy GPU and their recommendations."""
+    healthy = 0
+    warnings = []
+    recommendations = []
+    for gpu_key, run in results.items():
+        health = run["health_score"]
+        if health["status"] in ("healthy", "good"):
+            healthy += 1
+        else:
+            warnings.append(f"{gpu_key}: {health['status']} - {health['recommendation']}")
+        recommendations.extend(f"{gpu_key}: {text}" for text in health["details"]["specific_recommendations"])
+    return {
+        "total_gpus": len(results),
+        "healthy_gpus": healthy,
+        "warnings": warnings,
+        "recommendations": recommendations,
+        "health_percentage": 100.0 * healthy / len(results) if results else 0.0,
+    }
+
+def run_stress_test(duration: float = DEFAULT_DURATION, baseline: float = DEFAULT_BASELINE,
+                    interval: float = DEFAULT_INTERVAL, kernels: List[str] = KERNELS,
+                    backend: str = "auto", gpus: Optional[List[int]] = None,
+                    matrix_size: Optional[int] = None, memory_mb: int = DEFAULT_MEMORY_MB,
+                    dtype: str = "fp32", enhanced: bool = False) -> Dict:
+    """Stress every selected GPU in parallel and return one result document."""
+    unknown = [name for name in kernels if name not in KERNELS]
+    if unknown or not kernels:
+        raise ValueError(f"kernels must be a non-empty subset of {', '.join(KERNELS)}")
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+    if interval <= 0 or duration <= 0 or baseline < 0:
+        raise ValueError("duration and interval must be positive and baseline non-negative")
+    backend = select_backend(backend)
+    count = device_count(backend)
+    indices = list(range(count)) if gpus is None else gpus
+    if not indices or any(index < 0 or index >= count for index in indices):
+        raise ValueError(f"gpus must be indices below {count}")
+    options = {
+        "duration": duration, "baseline": baseline, "interval": interval, "kernels": list(kernels),
+        "matrix_size": matrix_size or (CPU_MATRIX_SIZE if backend == "numpy" else DEFAULT_MATRIX_SIZE),
+        "memory_mb": memory_mb, "dtype": dtype, "enhanced": enhanced,
+    }
+
+    nvml = False
+    if PYNVML_AVAILABLE and backend != "numpy":
+        pynvml.nvmlInit()
+        nvml = True
+    try:
+        sensors = {index: NvmlSensor(index) if nvml else SimulatedSensor() for index in indices}
+        if not nvml:
+            logger.warning("NVML unavailable: telemetry is simulated from CPU load")
+        barrier = threading.Barrier(len(indices))
+        logger.info(f"Stressing {len(indices)} device(s) with {backend} for {duration:.0f}s")
+        with ThreadPoolExecutor(max_workers=len(indices)) as executor:
+            futures = {f"gpu_{index}": executor.submit(run_gpu, backend, index, sensors[index], options, barrier)
+                       for index in indices}
+            results = {gpu_key: future.result() for gpu_key, future in futures.items()}
+    finally:
+        if nvml:
+            pynvml.nvmlShutdown()
+    return {"device_count": len(results), "results": results, "summary": summarize(results)}
+
+def write_result(doc: Dict, path: str):
+    """Write a result as JSON, or as a binary telemetry file when the path ends in .gput."""
+    if path.endswith(telemetry_codec.FILE_EXTENSION):
+        telemetry = {gpu_key: {field: array("d", [float(sample.get(field, float("nan"))) for sample in
+                                                  run["metrics"]["telemetry_sample"]])
+                               for field in TELEMETRY_FIELDS}
+                     for gpu_key, run in doc["results"].items()}
+        data = telemetry_codec.encode_result(doc, telemetry)
+        with open(path, "wb") as f:
+            f.write(data)
+    else:
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=2)
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stress-test GPUs and write a result file for the results page")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="load phase length in seconds")
+    parser.add_argument("--baseline", type=float, default=DEFAULT_BASELINE, help="idle sampling before the load, seconds")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="telemetry sample interval, seconds")
+    parser.add_argument("--kernels", default=",".join(KERNELS), help=f"comma-separated subset of {','.join(KERNELS)}")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto")
+    parser.add_argument("--gpus", help="comma-separated GPU indices (default: all)")
+    parser.add_argument("--matrix-size", type=int, help=f"matmul size (default {DEFAULT_MATRIX_SIZE}, "
+                                                        f"{CPU_MATRIX_SIZE} on numpy)")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB, help="memory copy buffer size")
+    parser.add_argument("--dtype", choices=DTYPES, default="fp32", help="matmul precision under load")
+    parser.add_argument("--enhanced", action="store_true", help="add mixed-precision and VRAM stress tests")
+    parser.add_argument("--output", help=f"result file (.json or {telemetry_codec.FILE_EXTENSION}; "
+                                         "default stress_results_<time>.json)")
+    parser.add_argument("--json", action="store_true", help="print the result document to stdout")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    try:
+        doc = run_stress_test(
+            duration=args.duration, baseline=args.baseline, interval=args.interval,
+            kernels=[name.strip() for name in args.kernels.split(",") if name.strip()],
+            backend=args.backend,
+            gpus=[int(index) for index in args.gpus.split(",")] if args.gpus else None,
+            matrix_size=args.matrix_size, memory_mb=args.memory_mb, dtype=args.dtype, enhanced=args.enhanced,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    problems = validate_result(doc)
+    if problems:
+        # A runner bug, not a user error: keep the file for inspection but say so
+        logger.error(f"Result does not match the schema: {problems[:5]}")
+    output = args.output or f"stress_results_{datetime.now():%Y%m%d_%H%M%S}.json"
+    write_result(doc, os.path.abspath(output))
+
+    if args.json:
+        print(json.dumps(doc, indent=2))
+    else:
+        for gpu_key, run in doc["results"].items():
+            health = run["health_score"]
+            metrics = run["metrics"]
+            print(f"{gpu_key}: {run['gpu_info']['name']}")
+            print(f"  Health: {health['score']}/{health['details']['max_score']} ({health['status']})")
+            print(f"  Temperature: {metrics['baseline_temp']:.0f}C idle, {metrics['max_temp']:.0f}C peak")
+            print(f"  Power: {metrics['baseline_power']:.1f}W idle, {metrics['max_power']:.1f}W peak")
+            for name, result in run["stress_test_results"].items():
+                if "tflops" in result:
+                    print(f"  {name}: {result['tflops']:.2f} TFLOPS")
+                elif "bandwidth_gbps" in result:
+                    print(f"  {name}: {result['bandwidth_gbps']:.1f} GB/s")
+        print(f"Saved {output}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Binary Telemetry Codec
+Compact columnar encoding of stress-test results: delta-coded timestamps, quantized readings and bit-packed flags.
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain
+from typing import Dict, List, Optional, Tuple
+import logging
+
+# numpy makes decoding vectorized; the pure-Python path produces identical values
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GPUT"
+FORMAT_VERSION = 1
+CONTENT_TYPE = "application/x-gpu-telemetry"
+FILE_EXTENSION = ".gput"
+
+# Column encodings
+ENC_DELTA = 1          # quantized integers, first value then successive differences
+ENC_DELTA_OF_DELTA = 2 # first value, first difference, then differences of differences
+ENC_BITS = 3           # one bit per sample, least significant bit first
+
+# field -> (encoding, units per 1.0). Readings are deliberately quantized to 0.1 unit
+# (timestamps to 1 ms), coarser than NVML's milliwatt power or computed ratios but
+# finer than any chart or score uses; regular sampling makes timestamp delta-of-deltas ~0.
+FIELD_CODECS = {
+    "timestamp": (ENC_DELTA_OF_DELTA, 1000),   # milliseconds
+    "temp_c": (ENC_DELTA, 10),                 # 0.1 C
+    "power_w": (ENC_DELTA, 10),                # 0.1 W
+    "gpu_util_pct": (ENC_DELTA, 10),           # 0.1 %
+    "mem_util_pct": (ENC_DELTA, 10),
+    "mem_bandwidth_pct": (ENC_DELTA, 10),
+    "throttling": (ENC_BITS, 1),
+}
+
+# Differences are stored in blocks of fixed-width signed integers, each block as narrow
+# as its largest value allows. On telemetry this is as small as a varint stream but
+# decodes with array/accumulate at C speed instead of a Python loop per byte.
+DELTA_BLOCK = 256
+WIDTH_CODES = {1: "b", 2: "h", 4: "i", 8: "q"}
+WIDTH_LIMITS = ((1, 1 << 7), (2, 1 << 15), (4, 1 << 31), (8, 1 << 63))
+
+# Byte -> its eight bits as floats, for expanding bit-packed columns without a loop per bit
+_BIT_TABLE = [tuple(float((byte >> bit) & 1) for bit in range(8)) for byte in range(256)]
+
+def _native(column: array) -> array:
+    """Convert a little-endian array read from the wire to native order (in place)."""
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+def _pack_bits(flags: List[bool]) -> bytes:
+    packed = bytearray((len(flags) + 7) // 8)
+    for index, flag in enumerate(flags):
+        if flag:
+            packed[index >> 3] |= 1 << (index & 7)
+    return bytes(packed)
+
+def _unpack_bits(packed: bytes, count: int) -> array:
+    return array("d", chain.from_iterable(map(_BIT_TABLE.__getitem__, packed)))[:count]
+
+def _encode_ints(values: List[int], delta_of_delta: bool) -> bytes:
+    """Encode quantized values; raises ValueError if a value or difference needs more than 64 bits."""
+    out = bytearray()
+    if not values:
+        return bytes(out)
+    try:
+        out += struct.pack("<q", values[0])
+        deltas = [b - a for a, b in zip(values, values[1:])]
+        if delta_of_delta and deltas:
+            out += struct.pack("<q", deltas[0])
+            deltas = [b - a for a, b in zip(deltas, deltas[1:])]
+    except struct.error:
+        raise ValueError("telemetry value out of range for encoding")
+
+    for start in range(0, len(deltas), DELTA_BLOCK):
+        chunk = deltas[start:start + DELTA_BLOCK]
+        low, high = min(chunk), max(chunk)
+        width = next((width for width, limit in WIDTH_LIMITS if -limit <= low and high < limit), None)
+        if width is None:
+            raise ValueError("telemetry values too far apart for encoding")
+        out.append(width)
+        out += _little_endian(array(WIDTH_CODES[width], chunk))
+    return bytes(out)
+
+def _decode_scaled(payload: bytes, count: int, delta_of_delta: bool, scale: int) -> array:
+    """Undo _encode_ints and the quantization: count float64 values."""
+    if count == 0:
+        return array("d")
+    first, = struct.unpack_from("<q", payload, 0)
+    offset = 8
+    remaining = count - 1
+    seeds = [first]
+    if delta_of_delta and remaining:
+        seeds.append(struct.unpack_from("<q", payload, offset)[0])
+        offset += 8
+        remaining -= 1
+
+    blocks = []
+    while remaining:
+        width = payload[offset]
+        if width not in WIDTH_CODES:
+            raise ValueError(f"invalid block width {width}")
+        size = min(DELTA_BLOCK, remaining)
+        if offset + 1 + width * size > len(payload):
+            raise ValueError("truncated column")
+        blocks.append((offset + 1, width, size))
+        offset += 1 + width * size
+        remaining -= size
+
+    if NUMPY_AVAILABLE:
+        ints = np.concatenate([np.array(seeds, dtype=np.int64)] + [
+            np.frombuffer(payload, dtype=f"<i{width}", count=size, offset=start).astype(np.int64)
+            for start, width, size in blocks
+        ])
+        if len(seeds) == 2:
+            ints[1:] = np.cumsum(ints[1:])
+        values = array("d")
+        values.frombytes((np.cumsum(ints) / scale).astype("<f8").tobytes())
+        return _native(values)
+
+    deltas: List[int] = seeds[1:]
+    for start, width, size in blocks:
+        chunk = array(WIDTH_CODES[width])
+        chunk.frombytes(payload[start:start + width * size])
+        deltas.extend(_native(chunk))
+    if len(seeds) == 2:
+        deltas = accumulate(deltas)
+    return array("d", [value / scale for value in accumulate(deltas, initial=first)])
+
+def encode_columns(columns: Dict[str, array]) -> bytes:
+    """Encode one GPU's telemetry columns (float64 arrays, NaN = missing) into a block.
+
+    Block layout (little-endian):
+      u32 sample_count, u8 column_count, then per column:
+      u8 name_len, name, u8 encoding, u32 scale, u8 has_validity,
+      [validity bitmap], u32 payload_len, payload
+    Columns with no values at all are left out; readers treat them as all-NaN.
+    """
+    count = len(next(iter(columns.values()))) if columns else 0
+    encoded = []
+    for name, values in columns.items():
+        if len(values) != count:
+            raise ValueError(f"column {name} has {len(values)} values, expected {count}")
+        valid = [value == value for value in values]  # NaN != NaN
+        present = [value for value in values if value == value] if not all(valid) else values
+        if not present:
+            continue
+        encoding, scale = FIELD_CODECS.get(name, (ENC_DELTA, 1000))
+        if encoding == ENC_BITS:
+            payload = _pack_bits([value != 0.0 for value in present])
+        else:
+            payload = _encode_ints([round(value * scale) for value in present],
+                                   encoding == ENC_DELTA_OF_DELTA)
+        raw_name = name.encode()
+        part = bytearray(struct.pack("<B", len(raw_name)) + raw_name + struct.pack("<BIB", encoding, scale, len(present) != count))
+        if len(present) != count:
+            part += _pack_bits(valid)
+        part += struct.pack("<I", len(payload)) + payload
+        encoded.append(bytes(part))
+
+    return struct.pack("<IB", count, len(encoded)) + b"".join(encoded)
+
+def decode_columns(block: bytes, max_samples: Optional[int] = None) -> Dict[str, array]:
+    """Decode a block from encode_columns back into float64 arrays. Raises ValueError if malformed."""
+    try:
+        count, column_count = struct.unpack_from("<IB", block, 0)
+        if max_samples is not None and count > max_samples:
+            raise ValueError(f"block has {count} samples, more than {max_samples}")
+        offset = 5
+        columns = {}
+        for _ in range(column_count):
+            name_len = block[offset]
+            name = block[offset + 1:offset + 1 + name_len].decode()
+            offset += 1 + name_len
+            encoding, scale, has_validity = struct.unpack_from("<BIB", block, offset)
+            offset += 6
+            valid = None
+            present = count
+            if has_validity:
+                size = (count + 7) // 8
+                valid = _unpack_bits(block[offset:offset + size], count)
+                present = int(sum(valid))
+                offset += size
+            payload_len, = struct.unpack_from("<I", block, offset)
+            payload = block[offset + 4:offset + 4 + payload_len]
+            if len(payload) != payload_len:
+                raise ValueError("truncated block")
+            offset += 4 + payload_len
+
+            if encoding == ENC_BITS:
+                values = _unpack_bits(payload, present)
+            elif encoding in (ENC_DELTA, ENC_DELTA_OF_DELTA) and scale > 0:
+                values = _decode_scaled(payload, present, encoding == ENC_DELTA_OF_DELTA, scale)
+            else:
+                raise ValueError(f"unknown encoding {encoding} for column {name}")
+            if len(values) != present:
+                raise ValueError(f"column {name} is truncated")
+
+            if valid is not None:
+                present_values = iter(values)
+                values = array("d", [next(present_values) if flag else math.nan for flag in valid])
+            columns[name] = values
+        return columns
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed telemetry block: {e}")
+
+def encode_result(doc: Dict, telemetry: Dict[str, Dict[str, array]]) -> bytes:
+    """Encode a result document and its per-GPU telemetry columns as one binary file.
+
+    Layout: MAGIC, u8 version, u32 header_len, header JSON (the document without
+    telemetry_sample arrays), u16 gpu_count, then per GPU u16 key_len, key,
+    u32 block_len and an encode_columns block.
+    """
+    header = {key: value for key, value in doc.items() if key != "results"}
+    header["results"] = {}
+    for gpu_key, run in doc.get("results", {}).items():
+        run = dict(run)
+        if isinstance(run.get("metrics"), dict):
+            run["metrics"] = {key: value for key, value in run["metrics"].items() if key != "telemetry_sample"}
+        header["results"][gpu_key] = run
+    return encode_blocks(header, {gpu_key: encode_columns(columns) for gpu_key, columns in telemetry.items()})
+
+def encode_blocks(header: Dict, blocks: Dict[str, bytes]) -> bytes:
+    """Assemble a binary file from a header document and already-encoded GPU blocks."""
+    raw_header = json.dumps(header, separators=(",", ":")).encode()
+    parts = [MAGIC, struct.pack("<BI", FORMAT_VERSION, len(raw_header)), raw_header,
+             struct.pack("<H", len(blocks))]
+    for gpu_key, block in blocks.items():
+        raw_key = gpu_key.encode()
+        parts += [struct.pack("<H", len(raw_key)), raw_key, struct.pack("<I", len(block)), block]
+    return b"".join(parts)
+
+def decode_result(data: bytes, max_samples: Optional[int] = None) -> Tuple[Dict, Dict[str, Dict[str, array]]]:
+    """Split a binary result file into (document without samples, gpu key -> columns)."""
+    if data[:4] != MAGIC:
+        raise ValueError("not a GPU telemetry file")
+    try:
+        version, header_len = struct.unpack_from("<BI", data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported telemetry format version {version}")
+        offset = 9
+        doc = json.loads(data[offset:offset + header_len])
+        offset += header_len
+        gpu_count, = struct.unpack_from("<H", data, offset)
+        offset += 2
+        telemetry = {}
+        for _ in range(gpu_count):
+            key_len, = struct.unpack_from("<H", data, offset)
+            gpu_key = data[offset + 2:offset + 2 + key_len].decode()
+            offset += 2 + key_len
+            block_len, = struct.unpack_from("<I", data, offset)
+            telemetry[gpu_key] = decode_columns(data[offset + 4:offset + 4 + block_len], max_samples)
+            offset += 4 + block_len
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"malformed telemetry file: {e}")
+    if not isinstance(doc, dict):
+        raise ValueError("telemetry file header must be a JSON object")
+    return doc, telemetry
+
+# Example usage: convert between JSON and binary result files
+if __name__ == "__main__":
+    import time
+
+    from stress_results import telemetry_columns, telemetry_samples
+
+    if len(sys.argv) != 3:
+        print(f"usage: {sys.argv[0]} results.json results{FILE_EXTENSION}  (or the reverse)")
+        sys.exit(2)
+    source, target = sys.argv[1:]
+    with open(source, "rb") as f:
+        data = f.read()
+
+    start = time.perf_counter()
+    if data[:4] == MAGIC:
+        document, columns_by_gpu = decode_result(data)
+        for key, columns in columns_by_gpu.items():
+            document["results"].setdefault(key, {}).setdefault("metrics", {})["telemetry_sample"] = \
+                telemetry_samples(columns)
+        output = json.dumps(document).encode()
+    else:
+        document = json.loads(data)
+        output = encode_result(document, {
+            key: telemetry_columns(run.get("metrics", {}).get("telemetry_sample") or [])
+            for key, run in document["results"].items()
+        })
+    elapsed = time.perf_counter() - start
+
+    with open(target, "wb") as f:
+        f.write(output)
+    print(f"{source} ({len(data)} bytes) -> {target} ({len(output)} bytes) in {elapsed * 1000:.1f}ms")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Support Ticket API
+Flask blueprint for the support console: list, inspect, resolve, close, reopen, assign and relabel tickets.
+"""
+
+import os
+import threading
+from flask import Blueprint, request, jsonify
+import logging
+
+from api_auth import require_role
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+tickets_api = Blueprint('tickets_api', __name__)
+# Tickets hold customer emails and messages: every route is for support staff only
+tickets_api.before_request(require_role("support"))
+
+_support = None
+_support_lock = threading.Lock()
+
+def get_support_system():
+    """Build the support system on first use so backends start without the OpenAI SDK."""
+    global _support
+    if _support is None:
+        with _support_lock:
+            if _support is None:
+                from ai_support_system import GPUSupportAI
+                _support = GPUSupportAI(os.getenv('OPENAI_API_KEY') or 'not-configured')
+    return _support
+
+def _error(message, status):
+    return jsonify({'success': False, 'error': message}), status
+
+@tickets_api.errorhandler(ImportError)
+def support_unavailable(e):
+    logger.error(f"Support system unavailable: {e}")
+    return _error('Support system is not available on this server', 503)
+
+@tickets_api.route('/api/tickets', methods=['GET'])
+def list_tickets():
+    """Page through tickets: ?status=&priority=&limit=&cursor= (pass back next_cursor)."""
+    from ai_support_system import TICKET_STATUSES
+
+    status = request.args.get('status') or None
+    if status and status not in TICKET_STATUSES:
+        return _error(f"status must be one of {', '.join(TICKET_STATUSES)}", 400)
+
+    try:
+        limit = int(request.args.get('limit', 50))
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return _error('limit and cursor must be integers', 400)
+
+    page = get_support_system().list_tickets(status=status,
+                                             priority=request.args.get('priority') or None,
+                                             limit=limit, cursor=cursor)
+    return jsonify({'success': True, **page})
+
+@tickets_api.route('/api/tickets/stats', methods=['GET'])
+def ticket_stats():
+    """Category, priority and resolution time statistics."""
+    return jsonify({'success': True, 'stats': get_support_system().get_ticket_stats()})
+
+@tickets_api.route('/api/tickets/<int:ticket_id>', methods=['GET'])
+def get_ticket(ticket_id):
+    """Fetch a single ticket."""
+    ticket = get_support_system().get_ticket(ticket_id)
+    if not ticket:
+        return _error(f"Ticket {ticket_id} not found", 404)
+    return jsonify({'success': True, 'ticket': ticket})
+
+def _transition(ticket_id, changed):
+    """Respond to a lifecycle change: 404 for unknown tickets, 409 if it was already in that state."""
+    support = get_support_system()
+    if changed:
+        return jsonify({'success': True, 'ticket': support.get_ticket(ticket_id)})
+    if support.get_ticket(ticket_id) is None:
+        return _error(f"Ticket {ticket_id} not found", 404)
+    return _error(f"Ticket {ticket_id} cannot make that transition from its current status", 409)
+
+@tickets_api.route('/api/tickets/<int:ticket_id>/resolve', methods=['POST'])
+def resolve_ticket(ticket_id):
+    return _transition(ticket_id, get_support_system().resolve_ticket(ticket_id))
+
+@tickets_api.route('/api/tickets/<int:ticket_id>/close', methods=['POST'])
+def close_ticket(ticket_id):
+    return _transition(ticket_id, get_support_system().close_ticket(ticket_id))
+
+@tickets_api.route('/api/tickets/<int:ticket_id>/reopen', methods=['POST'])
+def reopen_ticket(ticket_id):
+    return _transition(ticket_id, get_support_system().reopen_ticket(ticket_id))
+
+@tickets_api.route('/api/tickets/<int:ticket_id>/assign', methods=['POST'])
+def assign_ticket(ticket_id):
+    """Assign to {"assignee": "agent@example.com"}; a null assignee unassigns."""
+    data = request.get_json(silent=True) or {}
+    if 'assignee' not in data:
+        return _error('assignee is required', 400)
+
+    support = get_support_system()
+    if not support.assign_ticket(ticket_id, data['assignee'] or None):
+        return _error(f"Ticket {ticket_id} not found", 404)
+    return jsonify({'success': True, 'ticket': support.get_ticket(ticket_id)})
+
+@tickets_api.route('/api/tickets/<int:ticket_id>/relabel', methods=['POST'])
+def relabel_ticket(ticket_id):
+    """Correct {"category": ..., "priority": ...} (either may be omitted); the classifier learns from it."""
+    data = request.get_json(silent=True) or {}
+    support = get_support_system()
+    try:
+        relabeled = support.relabel_ticket(ticket_id, data.get('category'), data.get('priority'))
+    except ValueError as e:
+        return _error(str(e), 400)
+    if not relabeled:
+        return _error(f"Ticket {ticket_id} not found", 404)
+    return jsonify({'success': True, 'ticket': support.get_ticket(ticket_id)})
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Semantic Response Cache for Support Tickets
+Reuses answers from near-duplicate past tickets using MinHash LSH candidates and TF-IDF similarity.
+"""
+
+import math
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from storage import get_storage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i im is it its my me of on or our so that the
+their them then there this to was we were with you your can cant could would will not no do
+does did just still been any all get got please help hi hello thanks thank ive isnt dont
+doesnt didnt wont arent wasnt havent ill id
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def _make_permutations(count: int) -> List[Tuple[int, int]]:
+    """Deterministic (a, b) coefficients for universal hashing."""
+    perms, seed = [], 0x5EED
+    for _ in range(count):
+        seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        a = (seed >> 3) % MERSENNE_PRIME or 1
+        seed = (seed * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+        b = (seed >> 3) % MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+PERMUTATIONS = _make_permutations(NUM_PERMUTATIONS)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords (contractions are folded first)."""
+    text = text.lower().replace("'", "").replace("\u2019", "")
+    return [t for t in TOKEN_RE.findall(text) if len(t) > 1 and t not in STOPWORDS]
+
+def shingles(tokens: List[str]) -> set:
+    """Unigram and bigram shingles used for MinHash."""
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return grams
+
+def minhash_signature(grams: set) -> Tuple[int, ...]:
+    """MinHash signature over a shingle set."""
+    if not grams:
+        return tuple([MAX_HASH] * NUM_PERMUTATIONS)
+    hashes = [zlib.crc32(g.encode("utf-8")) for g in grams]
+    return tuple(
+        min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+        for a, b in PERMUTATIONS
+    )
+
+def band_keys(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    """Split a signature into LSH band keys."""
+    return [
+        (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+        for band in range(BANDS)
+    ]
+
+class TicketResponseCache:
+    def __init__(self, db_path: str, threshold: float = 0.8, max_entries: int = 50000):
+        """Load past ticket answers into an in-memory similarity index."""
+        self.db_path = db_path
+        self.storage = get_storage(db_path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], set] = {}
+        self._doc_freq: Counter = Counter()
+        self.init_database()
+        self.load_index()
+
+    def init_database(self):
+        """Create the cache table next to support_tickets."""
+        self.storage.execute('''
+            CREATE TABLE IF NOT EXISTS ticket_response_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticket_id INTEGER,
+                subject TEXT,
+                message TEXT,
+                category TEXT,
+                priority TEXT,
+                ai_response TEXT,
+                hits INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def load_index(self):
+        """Rebuild the in-memory index from the most recent cached answers."""
+        rows = self.storage.fetchall('''
+            SELECT id, subject, message, category, priority, ai_response
+            FROM ticket_response_cache ORDER BY id DESC LIMIT ?
+        ''', (self.max_entries,))
+
+        for row in reversed(rows):
+            self._index_entry(*row)
+        logger.info(f"Ticket response cache loaded with {len(self._entries)} entries")
+
+    def _index_entry(self, entry_id: int, subject: str, message: str,
+                     category: str, priority: str, ai_response: str):
+        tokens = tokenize(f"{subject} {message}")
+        signature = minhash_signature(shingles(tokens))
+        term_freq = Counter(tokens)
+        entry = {
+            "id": entry_id,
+            "subject": subject,
+            "category": category,
+            "priority": priority,
+            "ai_response": ai_response,
+            "term_freq": term_freq,
+            "bands": band_keys(signature),
+        }
+
+        with self._lock:
+            self._entries[entry_id] = entry
+            self._doc_freq.update(term_freq.keys())
+            for key in entry["bands"]:
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._doc_freq.subtract(evicted["term_freq"].keys())
+                for key in evicted["bands"]:
+                    bucket = self._buckets.get(key)
+                    if bucket:
+                        bucket.discard(evicted["id"])
+                        if not bucket:
+                            del self._buckets[key]
+
+    def _tfidf(self, term_freq: Counter) -> Tuple[Dict[str, float], float]:
+        """Sublinear TF-IDF weights and vector norm using current document frequencies."""
+        total_docs = len(self._entries)
+        weights = {
+            term: (1 + math.log(count)) * (math.log((total_docs + 1) / (self._doc_freq.get(term, 0) + 1)) + 1)
+            for term, count in term_freq.items()
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return weights, norm
+
+    def lookup(self, subject: str, message: str) -> Optional[Dict]:
+        """Return the closest cached answer if it is similar enough, adapted to the new ticket."""
+        tokens = tokenize(f"{subject} {message}")
+        if not tokens:
+            return None
+        signature = minhash_signature(shingles(tokens))
+
+        with self._lock:
+            candidate_ids = set()
+            for key in band_keys(signature):
+                candidate_ids.update(self._buckets.get(key, ()))
+            if not candidate_ids:
+                return None
+
+            query_weights, query_norm = self._tfidf(Counter(tokens))
+            best_entry, best_score = None, 0.0
+            for entry_id in candidate_ids:
+                entry = self._entries[entry_id]
+                weights, norm = self._tfidf(entry["term_freq"])
+                if not norm or not query_norm:
+                    continue
+                dot = sum(w * weights.get(term, 0.0) for term, w in query_weights.items())
+                score = dot / (query_norm * norm)
+                if score > best_score:
+                    best_entry, best_score = entry, score
+
+        if best_entry is None or best_score < self.threshold:
+            return None
+
+        self._record_hit(best_entry["id"])
+        return {
+            "cache_id": best_entry["id"],
+            "similarity": round(best_score, 4),
+            "category": best_entry["category"],
+            "priority": best_entry["priority"],
+            "ai_response": self.adapt_response(best_entry, subject),
+        }
+
+    def adapt_response(self, entry: Dict, subject: str) -> str:
+        """Lightly adapt a prior answer: refer to the new ticket's subject instead of the old one."""
+        response = entry["ai_response"]
+        previous_subject = (entry.get("subject") or "").strip()
+        if previous_subject and previous_subject != subject.strip():
+            response = response.replace(previous_subject, subject.strip())
+        return response
+
+    def _record_hit(self, entry_id: int):
+        self.storage.execute('UPDATE ticket_response_cache SET hits = hits + 1 WHERE id = ?', (entry_id,))
+
+    def add(self, ticket_id: int, subject: str, message: str,
+            category: str, priority: str, ai_response: str) -> int:
+        """Store a freshly generated answer so similar future tickets can reuse it."""
+        cursor = self.storage.execute('''
+            INSERT INTO ticket_response_cache
+            (ticket_id, subject, message, category, priority, ai_response)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (ticket_id, subject, message, category, priority, ai_response))
+
+        entry_id = cursor.lastrowid
+
+        self._index_entry(entry_id, subject, message, category, priority, ai_response)
+        return entry_id
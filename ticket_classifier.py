@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Local Support Ticket Classifier
+Multinomial naive Bayes over ticket words, trained from labeled rows in support_tickets.
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from storage import get_storage
+from ticket_cache import tokenize
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["Installation", "Performance", "Compatibility", "Hardware Issues", "Software Bugs", "Billing", "General"]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+
+# Seed vocabulary so the classifier is useful before any tickets are labeled.
+# Each keyword counts as one pseudo-document for its label.
+SEED_KEYWORDS = {
+    "category": {
+        "Installation": "install installation installer setup download pip package path uninstall reinstall",
+        "Performance": "slow fps performance lag stutter benchmark score low speed throttling bottleneck",
+        "Compatibility": "compatible compatibility support supported version macos linux windows amd intel apple",
+        "Hardware Issues": "detected overheating temperature fan artifacts hardware noise power psu card broken",
+        "Software Bugs": "crash error bug exception freeze traceback fails failed broken hangs",
+        "Billing": "billing charged charge refund invoice payment subscription plan price cancel",
+        "General": "question feature request how feedback account information",
+    },
+    "priority": {
+        "Low": "question feedback feature suggestion curious wondering",
+        "Medium": "issue problem help slow error",
+        "High": "crash fails broken urgent detected charged refund",
+        "Critical": "fire smoke burning dead production outage data loss emergency",
+    },
+}
+
+class NaiveBayesModel:
+    def __init__(self, labels: List[str], alpha: float = 1.0):
+        """Multinomial naive Bayes with Laplace smoothing."""
+        self.labels = labels
+        self.alpha = alpha
+        self.doc_counts = Counter()
+        self.token_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.total_tokens = Counter()
+        self.vocabulary = set()
+        self._log_priors: Dict[str, float] = {}
+        self._log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self._log_unseen: Dict[str, float] = {}
+
+    def add(self, label: str, tokens: List[str], weight: int = 1):
+        if label not in self.labels:
+            return
+        self.doc_counts[label] += weight
+        for token in tokens:
+            self.token_counts[label][token] += weight
+            self.total_tokens[label] += weight
+        self.vocabulary.update(tokens)
+
+    def finalize(self):
+        """Precompute log probabilities so prediction is a handful of dict lookups."""
+        total_docs = sum(self.doc_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+        for label in self.labels:
+            self._log_priors[label] = math.log((self.doc_counts[label] + 1) / (total_docs + len(self.labels)))
+            denominator = self.total_tokens[label] + self.alpha * vocab_size
+            self._log_likelihoods[label] = {
+                token: math.log((count + self.alpha) / denominator)
+                for token, count in self.token_counts[label].items()
+            }
+            self._log_unseen[label] = math.log(self.alpha / denominator)
+
+    def predict(self, tokens: List[str]) -> Tuple[str, float]:
+        """Return the most likely label and its posterior probability."""
+        known = [t for t in tokens if t in self.vocabulary]
+        scores = {}
+        for label in self.labels:
+            likelihoods, unseen = self._log_likelihoods[label], self._log_unseen[label]
+            scores[label] = self._log_priors[label] + sum(likelihoods.get(t, unseen) for t in known)
+
+        best = max(scores, key=scores.get)
+        if not known:
+            return best, 0.0
+        top = scores[best]
+        normalizer = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / normalizer
+
+class TicketClassifier:
+    def __init__(self, db_path: str, confidence_threshold: float = 0.75,
+                 retrain_interval: float = 3600.0, min_training_rows: int = 50):
+        """Train from labeled tickets and keep retraining in the background."""
+        self.db_path = db_path
+        self.storage = get_storage(db_path)
+        self.confidence_threshold = confidence_threshold
+        self.retrain_interval = retrain_interval
+        self.min_training_rows = min_training_rows
+        self.training_rows = 0
+        self._models: Optional[Tuple[NaiveBayesModel, NaiveBayesModel]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.train()
+
+    def train(self) -> int:
+        """Rebuild both models from seed keywords plus every labeled ticket."""
+        category_model = NaiveBayesModel(CATEGORIES)
+        priority_model = NaiveBayesModel(PRIORITIES)
+        for label, words in SEED_KEYWORDS["category"].items():
+            for word in words.split():
+                category_model.add(label, [word])
+        for label, words in SEED_KEYWORDS["priority"].items():
+            for word in words.split():
+                priority_model.add(label, [word])
+
+        # Only learn from model- or agent-assigned labels (agents correct them through
+        # GPUSupportAI.relabel_ticket), never from our own guesses
+        cursor = self.storage.execute('''
+            SELECT subject, message, category, priority FROM support_tickets
+            WHERE category IS NOT NULL AND priority IS NOT NULL
+              AND (label_source IS NULL OR label_source IN ('model', 'agent'))
+        ''')
+        rows = 0
+        for subject, message, category, priority in cursor:
+            tokens = tokenize(f"{subject or ''} {message or ''}")
+            category_model.add(category, tokens)
+            priority_model.add(priority, tokens)
+            rows += 1
+
+        category_model.finalize()
+        priority_model.finalize()
+        # Swap in one assignment so concurrent predictions never see a half-built model
+        self._models = (category_model, priority_model)
+        self.training_rows = rows
+        logger.info(f"Ticket classifier trained on {rows} labeled tickets")
+        return rows
+
+    def predict(self, subject: str, message: str) -> Dict:
+        """Predict category and priority with posterior confidences."""
+        category_model, priority_model = self._models
+        tokens = tokenize(f"{subject} {message}")
+        category, category_confidence = category_model.predict(tokens)
+        priority, priority_confidence = priority_model.predict(tokens)
+        return {
+            "category": category,
+            "priority": priority,
+            "category_confidence": category_confidence,
+            "priority_confidence": priority_confidence,
+        }
+
+    def is_confident(self, prediction: Dict) -> bool:
+        """Whether a prediction is trustworthy enough to skip the model round trip."""
+        return (self.training_rows >= self.min_training_rows
+                and prediction["category_confidence"] >= self.confidence_threshold
+                and prediction["priority_confidence"] >= self.confidence_threshold)
+
+    def start_background_retraining(self):
+        """Retrain periodically on a daemon thread so new labels are picked up."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def retrain_loop():
+            while not self._stop.wait(self.retrain_interval):
+                try:
+                    self.train()
+                except Exception as e:
+                    logger.error(f"Error retraining ticket classifier: {e}")
+
+        self._thread = threading.Thread(target=retrain_loop, name="ticket-classifier-retrain", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Buffered Feature Usage Ingestion
+Buffers usage events in memory and flushes them to the append-only event log,
+the hourly/daily rollups and the per-user running totals in one transaction.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Set, Tuple
+import logging
+
+from storage import SQLiteStorage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 5 bound parameters per row; stays under SQLite's historical 999-variable limit
+UPSERT_ROWS_PER_STATEMENT = 150
+
+PARTITION_PREFIX = "usage_events_"
+
+def partition_name(day: str) -> str:
+    """Name of the append-only event table holding one UTC day ('YYYY-MM-DD')."""
+    return PARTITION_PREFIX + day.replace("-", "")
+
+def create_usage_tables(cursor: sqlite3.Cursor):
+    """Rollup tables are keyed by time bucket first, so window scans are range reads."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_rollup_hourly (
+            hour TEXT NOT NULL,
+            feature_name TEXT NOT NULL,
+            event_count INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (hour, feature_name)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_rollup_daily (
+            day TEXT NOT NULL,
+            feature_name TEXT NOT NULL,
+            user_email TEXT NOT NULL,
+            event_count INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (day, feature_name, user_email)
+        ) WITHOUT ROWID
+    ''')
+
+class UsageEventBuffer:
+    def __init__(self, storage: SQLiteStorage, max_events: int = 10000, flush_interval: float = 1.0):
+        """Buffer usage events and flush when max_events accumulate or every flush_interval seconds."""
+        self.storage = storage
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (timestamp, user_email, feature_name, revenue)
+        self._events: List[Tuple[float, str, str, float]] = []
+        self._partitions: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="usage-buffer-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, user_email: str, feature_name: str, revenue: float = 0.0, timestamp: float = None):
+        """Record one usage event."""
+        event = (timestamp or time.time(), user_email, feature_name, revenue)
+        with self._lock:
+            self._events.append(event)
+            should_flush = len(self._events) >= self.max_events
+        if should_flush:
+            self._wake.set()
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing usage events: {e}")
+
+    def _ensure_partition(self, cursor: sqlite3.Cursor, day: str) -> str:
+        table = partition_name(day)
+        if table not in self._partitions:
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    ts REAL NOT NULL,
+                    user_email TEXT,
+                    feature_name TEXT,
+                    revenue REAL DEFAULT 0
+                )
+            ''')
+            self._partitions.add(table)
+        return table
+
+    @staticmethod
+    def _upsert(cursor: sqlite3.Cursor, sql: str, rows: List[Tuple]):
+        """Run a multi-row INSERT ... ON CONFLICT statement, chunked to the parameter limit."""
+        width = len(rows[0])
+        placeholder = "(" + ", ".join(["?"] * width) + ")"
+        per_statement = max(1, (UPSERT_ROWS_PER_STATEMENT * 5) // width)
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            cursor.execute(sql.format(", ".join([placeholder] * len(chunk))),
+                           [value for row in chunk for value in row])
+
+    def flush(self) -> int:
+        """Write all buffered events in one transaction. Returns the number of events written."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+
+            by_partition: Dict[str, List[Tuple]] = defaultdict(list)
+            hourly: Dict[Tuple[str, str], List] = {}
+            daily: Dict[Tuple[str, str, str], List] = {}
+            totals: Dict[Tuple[str, str], List] = {}
+            for ts, user_email, feature_name, revenue in events:
+                stamp = datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                day, hour = stamp[:10], stamp[:13] + ":00"
+                by_partition[day].append((ts, user_email, feature_name, revenue))
+
+                for table, key in ((hourly, (hour, feature_name)),
+                                   (daily, (day, feature_name, user_email)),
+                                   (totals, (user_email, feature_name))):
+                    entry = table.get(key)
+                    if entry is None:
+                        table[key] = [1, revenue, stamp]
+                    else:
+                        entry[0] += 1
+                        entry[1] += revenue
+                        if stamp > entry[2]:
+                            entry[2] = stamp
+
+            try:
+                with self.storage.transaction() as conn:
+                    cursor = conn.cursor()
+                    for day, rows in by_partition.items():
+                        table = self._ensure_partition(cursor, day)
+                        cursor.executemany(
+                            f'INSERT INTO {table} (ts, user_email, feature_name, revenue) VALUES (?, ?, ?, ?)', rows)
+
+                    self._upsert(cursor, '''
+                        INSERT INTO usage_rollup_hourly (hour, feature_name, event_count, revenue)
+                        VALUES {}
+                        ON CONFLICT(hour, feature_name) DO UPDATE SET
+                            event_count = event_count + excluded.event_count,
+                            revenue = revenue + excluded.revenue
+                    ''', [(hour, feature, count, revenue)
+                          for (hour, feature), (count, revenue, _) in hourly.items()])
+
+                    self._upsert(cursor, '''
+                        INSERT INTO usage_rollup_daily (day, feature_name, user_email, event_count, revenue)
+                        VALUES {}
+                        ON CONFLICT(day, feature_name, user_email) DO UPDATE SET
+                            event_count = event_count + excluded.event_count,
+                            revenue = revenue + excluded.revenue
+                    ''', [(day, feature, user, count, revenue)
+                          for (day, feature, user), (count, revenue, _) in daily.items()])
+
+                    self._upsert(cursor, '''
+                        INSERT INTO feature_usage
+                        (user_email, feature_name, usage_count, last_used, revenue_generated)
+                        VALUES {}
+                        ON CONFLICT(user_email, feature_name) DO UPDATE SET
+                            usage_count = usage_count + excluded.usage_count,
+                            last_used = MAX(last_used, excluded.last_used),
+                            revenue_generated = revenue_generated + excluded.revenue_generated
+                    ''', [(user, feature, count, last_used, revenue)
+                          for (user, feature), (count, revenue, last_used) in totals.items()])
+            except Exception:
+                # Forget partitions created inside the rolled-back transaction and retry later
+                self._partitions.clear()
+                with self._lock:
+                    self._events = events + self._events
+                raise
+
+            logger.debug(f"Flushed {len(events)} usage events")
+            return len(events)
+
+    def drop_partitions_before(self, day: str) -> List[str]:
+        """Drop raw event partitions for days before 'YYYY-MM-DD'. Rollups are untouched."""
+        cutoff = partition_name(day)
+        with self._flush_lock:
+            rows = self.storage.fetchall(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND substr(name, 1, ?) = ?",
+                (len(PARTITION_PREFIX), PARTITION_PREFIX)
+            )
+            dropped = sorted(row[0] for row in rows if row[0] < cutoff)
+            with self.storage.transaction() as conn:
+                for table in dropped:
+                    conn.execute(f'DROP TABLE {table}')
+            self._partitions.difference_update(dropped)
+        return dropped
+
+    def close(self):
+        """Stop the flusher and write whatever is still buffered (runs at interpreter exit)."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing usage events at shutdown: {e}")